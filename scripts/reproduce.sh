@@ -2,33 +2,26 @@
 # Full end-to-end pipeline: ingest -> features -> train -> predict -> export.
 # Run from the repository root on a fresh clone.
 #
-# This re-fetches seasonal data from Jikan (with AniList fallback), respects
-# rate limits, and regenerates the committed frontend prediction JSON.
+# Delegates to the incremental runner (src/pipeline.py): stages whose inputs,
+# code and config are unchanged since the last run are skipped. Without
+# --cache, seasonal data is re-fetched from Jikan (with AniList fallback),
+# respecting rate limits, and everything downstream of a change is rebuilt.
 #
 # Usage:
-#   bash scripts/reproduce.sh            # full re-ingest + retrain
-#   bash scripts/reproduce.sh --cache    # reuse cached raw payloads where present
+#   bash scripts/reproduce.sh            # re-ingest, then rebuild whatever changed
+#   bash scripts/reproduce.sh --cache    # reuse cached raw payloads; skip up-to-date stages
+#   bash scripts/reproduce.sh --cache --force train   # extra args go to src.pipeline
 set -euo pipefail
 
-USE_CACHE=""
+ARGS=(--start-year 2018 --end-year 2025 --seasons winter spring summer fall
+      --predict 2026:summer 2025:fall)
 if [[ "${1:-}" == "--cache" ]]; then
-  USE_CACHE="--use-cache"
+  ARGS+=(--use-cache)
+  shift
+else
+  ARGS+=(--force ingest)
 fi
 
-echo "== 1. Ingest historical seasons (2018-2025) =="
-python -m src.ingest --start-year 2018 --end-year 2025 --seasons winter spring summer fall $USE_CACHE
-
-echo "== 2. Build features =="
-python -m src.features.build_features
-
-echo "== 3. Train model (compares RF / HistGBR / Ridge / LightGBM) =="
-python -m src.models.train
-
-echo "== 4. Predict Summer 2026 + Fall 2025 =="
-python -m src.models.predict --season 2026:summer
-python -m src.models.predict --season 2025:fall --no-fetch
-
-echo "== 5. Export predictions to frontend JSON =="
-python -m src.export_predictions
+python -m src.pipeline "${ARGS[@]}" "$@"
 
 echo "== Done. Frontend JSON is in anime-frontend/public/predictions/ =="
@@ -0,0 +1,130 @@
+"""Benchmark tree-ensemble inference: sklearn/LightGBM calls vs the flattened engine.
+
+The "current" path is the library's: ``model.predict`` plus, for a random
+forest, one ``predict`` call per tree for the spread. The engine path
+compiles the model once (timed separately) and evaluates every tree in one
+vectorized traversal. Both must give identical predictions (and spreads); a
+mismatch is reported and fails the run.
+
+The reference predictions for that check come from the model with
+``n_jobs=1``: a multi-threaded forest adds its trees in whatever order the
+threads finish, which can change the last bit. The timing uses the model as
+saved.
+
+    python -m src.bench_inference                      # trained model, feature matrix rows
+    python -m src.bench_inference --rows 20000 --repeat 5 --json bench_inference.json
+"""
+from __future__ import annotations
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+from rich import print as rprint
+from rich.table import Table
+
+
+def _best_of(fn: Callable[[], object], repeat: int) -> tuple[float, object]:
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def _rows(n_rows: int) -> np.ndarray:
+    from .features.matrix import FeatureMatrix
+
+    mat = FeatureMatrix.open()
+    if mat is None:
+        raise SystemExit("matrix.npy missing. Run build_features first.")
+    X = np.asarray(mat.values, dtype=np.float32)
+    if n_rows and n_rows != len(X):
+        X = X[np.arange(n_rows) % len(X)]
+    return X
+
+
+def run_benchmark(model_path: Path, n_rows: int, repeat: int) -> dict:
+    from .models.artifacts import load_model
+    from .models.tree_engine import compile_model
+
+    model = load_model(model_path)
+    X = _rows(n_rows)
+    forest = hasattr(model, "estimators_") and len(getattr(model, "estimators_", [])) > 1
+
+    def current():
+        preds = model.predict(X)
+        spread = np.stack([t.predict(X) for t in model.estimators_]).std(axis=0) if forest else None
+        return preds, spread
+
+    t_current, (ref_pred, ref_spread) = _best_of(current, repeat)
+    if model.get_params().get("n_jobs", 1) != 1:
+        saved = model.get_params()["n_jobs"]
+        model.set_params(n_jobs=1)  # deterministic tree order for the exactness check
+        ref_pred = model.predict(X)
+        model.set_params(n_jobs=saved)
+    t_compile, engine = _best_of(lambda: compile_model(model), 1)
+    result = {
+        "model": type(model).__name__, "rows": len(X), "features": X.shape[1], "repeat": repeat,
+        "current_seconds": t_current, "compile_seconds": t_compile,
+    }
+    if engine is None:
+        result["error"] = "model is not supported by the flat engine"
+        return result
+    t_engine, (pred, spread) = _best_of(lambda: engine.predict_with_spread(X), repeat)
+    result.update({
+        "trees": engine.n_trees, "nodes": len(engine.feature), "max_depth": engine.max_depth,
+        "engine_seconds": t_engine, "speedup": t_current / t_engine if t_engine else float("inf"),
+        "max_abs_diff": float(np.max(np.abs(pred - ref_pred))) if len(X) else 0.0,
+        "exact": bool(np.array_equal(pred, ref_pred)
+                      and (ref_spread is None or np.array_equal(spread, ref_spread))),
+    })
+    return result
+
+
+def _print_report(r: dict) -> None:
+    t = Table(title=f"Inference benchmark: {r['model']} on {r['rows']} rows", show_header=True, header_style="bold")
+    t.add_column("Path")
+    t.add_column("Seconds", justify="right")
+    t.add_column("Rows/s", justify="right")
+    t.add_row("sklearn/LightGBM" + (" + per-tree spread" if r["model"] == "RandomForestRegressor" else ""),
+              f"{r['current_seconds']:.4f}", f"{r['rows'] / max(r['current_seconds'], 1e-12):,.0f}")
+    if "engine_seconds" in r:
+        t.add_row("flat engine", f"{r['engine_seconds']:.4f}", f"{r['rows'] / max(r['engine_seconds'], 1e-12):,.0f}")
+        t.add_row("  compile (once)", f"{r['compile_seconds']:.4f}", "")
+    rprint(t)
+    if "error" in r:
+        rprint(f"[yellow]{r['error']}[/yellow]")
+        return
+    rprint(f"[dim]{r['trees']} trees, {r['nodes']} nodes, depth {r['max_depth']}; "
+           f"speedup x{r['speedup']:.1f}; max |diff| {r['max_abs_diff']:.3g}[/dim]")
+    if r["exact"]:
+        rprint("[green]Predictions identical to the library's.[/green]")
+    else:
+        rprint("[red]Predictions differ from the library's.[/red]")
+
+
+def main():
+    from .models.artifacts import MODEL_PATH
+
+    ap = argparse.ArgumentParser(description="Benchmark flattened tree inference against the library path.")
+    ap.add_argument("--model", type=Path, default=MODEL_PATH, help="Saved model (default: data/models/model.joblib)")
+    ap.add_argument("--rows", type=int, default=0, help="Rows to score (default: every matrix row; tiled if larger)")
+    ap.add_argument("--repeat", type=int, default=3, help="Timed runs per path (best is reported)")
+    ap.add_argument("--json", type=Path, default=None, help="Also write the report as JSON")
+    args = ap.parse_args()
+
+    result = run_benchmark(args.model, args.rows, args.repeat)
+    _print_report(result)
+    if args.json:
+        args.json.write_text(json.dumps(result, indent=2))
+        rprint(f"[green]Wrote report -> {args.json}[/green]")
+    if result.get("exact") is False:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
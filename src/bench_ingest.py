@@ -0,0 +1,181 @@
+"""Benchmark ingest throughput offline against a recorded cassette.
+
+Record a cassette once against the live APIs (the response cache is bypassed
+while recording so every exchange is captured):
+
+    JIKAN_RECORD=cassettes/ingest.jsonl python -m src.ingest --start-year 2024 --end-year 2024
+    JIKAN_RECORD=cassettes/ingest.jsonl python -m src.ingest_details --year-min 2024 --year-max 2024
+
+Then replay it as often as needed, with simulated latency and injected failures:
+
+    python -m src.bench_ingest --cassette cassettes/ingest.jsonl --latency 0.2 --fail-rate 0.05
+    python -m src.bench_ingest --cassette cassettes/ingest.jsonl --no-limit --json bench.json
+
+``run_ingest`` and ``backfill_labels`` run unchanged in a throwaway data
+directory (``MAL_DATA_DIR``), so the real ``data/`` tree is never touched. For
+each stage the report shows requests/s, time spent sleeping in the rate
+limiter, time waiting on (simulated) I/O, and retries.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from rich import print as rprint
+from rich.table import Table
+
+
+def _snapshot(client, adapter) -> dict:
+    aio = client.aio
+    return {
+        "requests": adapter.requests,
+        "injected_failures": adapter.injected_failures,
+        "cassette_misses": adapter.misses,
+        "retries": aio.stats.retries,
+        "io_seconds": aio.stats.io_seconds,
+        "backoff_seconds": aio.stats.backoff_seconds,
+        "limiter_sleep_seconds": aio.jikan_limiter.waited + aio.anilist_limiter.waited,
+    }
+
+
+def _run_stage(name: str, fn, client, adapter) -> dict:
+    before = _snapshot(client, adapter)
+    started = time.perf_counter()
+    error = None
+    try:
+        fn()
+    except (Exception, SystemExit) as exc:  # report, don't abort the other stage
+        error = f"{type(exc).__name__}: {exc}"
+    wall = time.perf_counter() - started
+    after = _snapshot(client, adapter)
+    out = {k: after[k] - before[k] for k in after}
+    out.update(
+        {
+            "stage": name,
+            "wall_seconds": wall,
+            "requests_per_second": out["requests"] / wall if wall > 0 else 0.0,
+            "error": error,
+        }
+    )
+    return out
+
+
+def run_benchmark(
+    cassette_path: Path,
+    seasons: list[tuple[int, str]] | None = None,
+    source: str = "auto",
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    fail_rate: float = 0.0,
+    fail_status: int = 429,
+    retry_after: float = 1.0,
+    workers: int | None = None,
+    no_limit: bool = False,
+) -> list[dict]:
+    # Imported here so MAL_DATA_DIR (set by main) is honoured by utils.io.
+    from .ingest import run_ingest
+    from .ingest_details import DETAILS_WORKERS, backfill_labels
+    from .mal.client import JikanClient, MAX_CONCURRENCY
+    from .mal.ratelimit import RateLimiter, TokenBucket
+    from .mal.replay import Cassette, ReplayAdapter
+
+    cassette = Cassette(cassette_path)
+    if len(cassette) == 0:
+        raise SystemExit(f"Cassette {cassette_path} is empty or missing. Record one with JIKAN_RECORD=...")
+    adapter = ReplayAdapter(
+        cassette, latency=latency, jitter=jitter,
+        fail_rate=fail_rate, fail_status=fail_status, retry_after=retry_after,
+    )
+    workers = workers or max(DETAILS_WORKERS, MAX_CONCURRENCY)
+    limits = {}
+    if no_limit:
+        limits = {"jikan_limiter": RateLimiter(TokenBucket(1e6)), "anilist_limiter": RateLimiter(TokenBucket(1e6))}
+    client = JikanClient(cache=False, transport=adapter, max_concurrency=workers, **limits)
+
+    seasons = seasons or cassette.seasons()
+    if not seasons:
+        raise SystemExit("No Jikan season pages in the cassette; pass --start-year/--end-year.")
+    years = [y for y, _ in seasons]
+    names = sorted({s for _, s in seasons}, key=["winter", "spring", "summer", "fall"].index)
+    rprint(f"[cyan]Replaying {len(cassette)} recorded exchanges for {len(seasons)} seasons...[/cyan]")
+
+    results = [
+        _run_stage(
+            "run_ingest",
+            lambda: run_ingest(min(years), max(years), names, source, client=client),
+            client, adapter,
+        ),
+        _run_stage(
+            "backfill_labels",
+            lambda: backfill_labels(None, None, workers=workers, client=client.aio),
+            client, adapter,
+        ),
+    ]
+    return results
+
+
+def _print_report(results: list[dict]) -> None:
+    t = Table(title="Ingest benchmark (replay)", show_header=True, header_style="bold")
+    for col in ["Stage", "Wall s", "Requests", "Req/s", "Limiter sleep s", "I/O wait s",
+                "Backoff s", "Retries", "Injected", "Misses"]:
+        t.add_column(col, justify="left" if col == "Stage" else "right")
+    for r in results:
+        t.add_row(
+            r["stage"] + (" [red](failed)[/red]" if r["error"] else ""),
+            f"{r['wall_seconds']:.2f}",
+            str(r["requests"]),
+            f"{r['requests_per_second']:.2f}",
+            f"{r['limiter_sleep_seconds']:.2f}",
+            f"{r['io_seconds']:.2f}",
+            f"{r['backoff_seconds']:.2f}",
+            str(r["retries"]),
+            str(r["injected_failures"]),
+            str(r["cassette_misses"]),
+        )
+    rprint(t)
+    for r in results:
+        if r["error"]:
+            rprint(f"[red]{r['stage']}: {r['error']}[/red]")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark ingest against a recorded Jikan/AniList cassette.")
+    ap.add_argument("--cassette", type=Path, required=True, help="JSONL cassette recorded with JIKAN_RECORD")
+    ap.add_argument("--start-year", type=int, default=None)
+    ap.add_argument("--end-year", type=int, default=None)
+    ap.add_argument("--seasons", nargs="*", default=["winter", "spring", "summer", "fall"])
+    ap.add_argument("--source", choices=["auto", "jikan", "anilist"], default="auto")
+    ap.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per response")
+    ap.add_argument("--jitter", type=float, default=0.0, help="+/- uniform jitter on latency")
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with --fail-status")
+    ap.add_argument("--fail-status", type=int, default=429)
+    ap.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on injected failures")
+    ap.add_argument("--workers", type=int, default=None, help="Max concurrent requests")
+    ap.add_argument("--no-limit", action="store_true", help="Disable rate limiting to measure pipeline overhead")
+    ap.add_argument("--json", type=Path, default=None, help="Also write the report as JSON")
+    args = ap.parse_args()
+
+    seasons = None
+    if args.start_year is not None and args.end_year is not None:
+        seasons = [(y, s.lower()) for y in range(args.start_year, args.end_year + 1) for s in args.seasons]
+
+    with tempfile.TemporaryDirectory(prefix="mal-bench-") as tmp:
+        os.environ["MAL_DATA_DIR"] = tmp
+        results = run_benchmark(
+            args.cassette.resolve(), seasons, args.source,
+            latency=args.latency, jitter=args.jitter,
+            fail_rate=args.fail_rate, fail_status=args.fail_status, retry_after=args.retry_after,
+            workers=args.workers, no_limit=args.no_limit,
+        )
+
+    _print_report(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+        rprint(f"[green]Wrote report -> {args.json}[/green]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Leakage-safe rolling target aggregates per studio, source and genre.
+
+For every entity (a studio, a source material, a genre) the index stores the
+cumulative count and sum of labels *after* each season, built in one pass
+over labeled rows sorted by season. A row from season ``t`` looks up the last
+entry strictly before ``t`` (``merge_asof`` with exact matches excluded), so
+its own season - and anything later - never contributes to its features.
+
+Estimates are shrunk toward the global as-of mean:
+``(sum + m * global_mean) / (count + m)`` with ``m = AGG_PRIOR_WEIGHT``, so a
+studio with two prior shows barely moves away from the prior.
+
+The index is persisted with a hash per season of the labels it was built
+from. ``update`` recomputes only from the earliest season whose labels
+changed, so appending a new season of labels touches only that season.
+``update_batches`` does the same from row batches (the DuckDB engine's scan):
+each batch is reduced to per-season hash sums and per-entity label deltas
+before the next one is read.
+"""
+from __future__ import annotations
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ..utils.io import FEATURES
+
+ROLLING_AGGREGATES = os.getenv("ROLLING_AGGREGATES", "on").lower() not in {"0", "off", "false", "no"}
+AGG_PRIOR_WEIGHT = float(os.getenv("AGG_PRIOR_WEIGHT", 10))
+AGGREGATES_PATH = FEATURES / "aggregates.parquet"
+# Prior mean for seasons with no labeled history at all (roughly MAL's overall average).
+DEFAULT_PRIOR_MEAN = 7.0
+
+SEASON_INDEX = {"winter": 0, "spring": 1, "summer": 2, "fall": 3}
+# kind -> normalized column holding the entity (list column or scalar)
+AGG_KINDS = {"studio": "studios", "source": "source", "genre": "genres"}
+AGG_COLUMNS = [f"{kind}_prior_{stat}" for kind in AGG_KINDS for stat in ("mean", "n")]
+_ALL = "__all__"
+
+
+def season_ordinal(df: pd.DataFrame) -> np.ndarray:
+    """``year * 4 + season`` as float; unknown seasons (e.g. 'upcoming') are +inf = after all history."""
+    year = pd.to_numeric(df["year"], errors="coerce").to_numpy(dtype=np.float64)
+    idx = df["season"].astype(str).str.lower().map(SEASON_INDEX).to_numpy(dtype=np.float64)
+    out = year * 4 + idx
+    return np.where(np.isnan(out), np.inf, out)
+
+
+def _entities(df: pd.DataFrame, kind: str) -> pd.DataFrame:
+    """``(row, key)`` pairs for one entity kind; ``row`` is the position in ``df``."""
+    from .build_features import _explode_names
+
+    col = AGG_KINDS[kind]
+    if col not in df.columns:
+        return pd.DataFrame({"row": np.array([], dtype=np.int64), "key": np.array([], dtype=object)})
+    s = df[col]
+    if s.dtype == object and s.map(lambda v: not isinstance(v, str) and v is not None).any():
+        names = _explode_names(s)
+    else:
+        names = pd.Series(s.to_numpy(), index=np.arange(len(s))).dropna().astype(str)
+        names = names[names != ""]
+    pairs = pd.DataFrame({"row": names.index.to_numpy(), "key": names.to_numpy()})
+    return pairs.drop_duplicates()
+
+
+def _labeled(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.assign(_ordinal=season_ordinal(df), _label=pd.to_numeric(df.get("score"), errors="coerce"))
+    return out[np.isfinite(out["_ordinal"]) & out["_label"].notna()].reset_index(drop=True)
+
+
+def _season_sums(lab: pd.DataFrame) -> Dict[int, int]:
+    """Order-independent hash per season (a sum mod 2**64) of everything the index reads from its rows."""
+    cols = ["mal_id", "_label", *[c for c in AGG_KINDS.values() if c in lab.columns]]
+    frame = pd.DataFrame(
+        {c: lab[c].map(lambda v: "|".join(map(str, v)) if isinstance(v, (list, np.ndarray)) else v) for c in cols}
+    )
+    row = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    sums = pd.Series(row).groupby(lab["_ordinal"].astype(int).to_numpy()).sum()  # wraps mod 2**64
+    return {int(o): int(h) for o, h in sums.items()}
+
+
+def _deltas(lab: pd.DataFrame) -> pd.DataFrame:
+    """Label ``n``/``total`` per ``(kind, key, ordinal)`` over ``lab``'s rows."""
+    parts = [pd.DataFrame({"kind": _ALL, "key": _ALL, "ordinal": lab["_ordinal"], "label": lab["_label"]})]
+    for kind in AGG_KINDS:
+        ent = _entities(lab, kind)
+        parts.append(pd.DataFrame({
+            "kind": kind, "key": ent["key"].to_numpy(),
+            "ordinal": lab["_ordinal"].to_numpy()[ent["row"]], "label": lab["_label"].to_numpy()[ent["row"]],
+        }))
+    return (
+        pd.concat(parts, ignore_index=True)
+        .groupby(["kind", "key", "ordinal"], sort=False)["label"].agg(n="count", total="sum")
+        .reset_index()
+    )
+
+
+class AggregateIndex:
+    """Cumulative ``(count, sum)`` of labels per ``(kind, key)`` after each season ordinal."""
+
+    def __init__(self, table: Optional[pd.DataFrame] = None, season_hashes: Optional[Dict[int, str]] = None):
+        self.table = table if table is not None else pd.DataFrame(
+            {"kind": pd.Series(dtype=object), "key": pd.Series(dtype=object),
+             "ordinal": pd.Series(dtype=np.float64), "n": pd.Series(dtype=np.float64),
+             "total": pd.Series(dtype=np.float64)}
+        )
+        self.season_hashes = season_hashes or {}
+
+    @classmethod
+    def load(cls, path: Path = AGGREGATES_PATH) -> Optional["AggregateIndex"]:
+        if not path.exists():
+            return None
+        table = pq.read_table(path)
+        meta = table.schema.metadata or {}
+        hashes = {int(k): v for k, v in json.loads(meta.get(b"season_hashes", b"{}")).items()}
+        return cls(table.to_pandas(), hashes)
+
+    def save(self, path: Path = AGGREGATES_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(self.table, preserve_index=False)
+        meta = {**(table.schema.metadata or {}), b"season_hashes": json.dumps(self.season_hashes).encode()}
+        tmp = path.with_suffix(".parquet.tmp")
+        pq.write_table(table.replace_schema_metadata(meta), tmp)
+        os.replace(tmp, path)
+
+    def update(self, df: pd.DataFrame) -> int:
+        """Bring the index in line with ``df``'s labels; returns the number of seasons recomputed."""
+        return self.update_batches([df])
+
+    def update_batches(self, frames: Iterable[pd.DataFrame]) -> int:
+        """:meth:`update` over a row set given as consecutive batches (held one at a time).
+
+        Per batch only the season hash sums and the per-entity deltas are
+        kept, merged as they arrive. That is at most the size of the index.
+        Merged partial sums can differ from a one-pass sum in the last bit.
+        """
+        sums: Dict[int, int] = {}
+        deltas = None
+        for df in frames:
+            lab = _labeled(df)
+            if not len(lab):
+                continue
+            for o, h in _season_sums(lab).items():
+                sums[o] = (sums.get(o, 0) + h) % (1 << 64)
+            batch = _deltas(lab)
+            if deltas is not None:
+                batch = (
+                    pd.concat([deltas, batch], ignore_index=True)
+                    .groupby(["kind", "key", "ordinal"], sort=False)[["n", "total"]].sum()
+                    .reset_index()
+                )
+            deltas = batch
+        hashes = {o: format(h, "x") for o, h in sums.items()}
+        changed = {o for o in hashes if self.season_hashes.get(o) != hashes[o]}
+        changed |= set(self.season_hashes) - set(hashes)  # seasons that lost all their labels
+        if not changed:
+            return 0
+        start = min(changed)
+
+        base = self.table[self.table["ordinal"] < start]
+        carry = base.sort_values("ordinal").groupby(["kind", "key"], sort=False).tail(1)
+
+        if deltas is None:  # every label is gone
+            deltas = self.table.iloc[:0][["kind", "key", "ordinal", "n", "total"]]
+        deltas = deltas[deltas["ordinal"] >= start].sort_values(["kind", "key", "ordinal"], kind="stable")
+        cum = deltas.groupby(["kind", "key"], sort=False)[["n", "total"]].cumsum()
+        deltas[["n", "total"]] = cum.to_numpy(dtype=np.float64)
+        # Continue each entity's running totals from where the kept prefix left off.
+        prior = deltas[["kind", "key"]].merge(carry[["kind", "key", "n", "total"]], on=["kind", "key"], how="left")
+        deltas["n"] += prior["n"].fillna(0).to_numpy()
+        deltas["total"] += prior["total"].fillna(0).to_numpy()
+
+        self.table = pd.concat([base, deltas], ignore_index=True).sort_values(["ordinal", "kind", "key"], kind="stable")
+        self.table = self.table.reset_index(drop=True)
+        self.season_hashes = hashes
+        return sum(1 for o in hashes if o >= start)
+
+    def _asof(self, kind: str, keys: pd.DataFrame) -> pd.DataFrame:
+        """``n``/``total`` for each ``(pos, key, ordinal)`` as of strictly before ``ordinal``."""
+        right = self.table[self.table["kind"] == kind][["key", "ordinal", "n", "total"]].sort_values("ordinal")
+        right = right.astype({"key": object})
+        left = keys.astype({"key": object}).sort_values("ordinal", kind="stable")
+        if right.empty or left.empty:
+            return left.assign(n=0.0, total=0.0)
+        merged = pd.merge_asof(left, right, on="ordinal", by="key", allow_exact_matches=False, direction="backward")
+        return merged.fillna({"n": 0.0, "total": 0.0})
+
+    def lookup(self, df: pd.DataFrame, prior_weight: float = AGG_PRIOR_WEIGHT) -> pd.DataFrame:
+        """``AGG_COLUMNS`` for ``df``'s rows (same index), using only labels from earlier seasons."""
+        ordinal = season_ordinal(df)
+        rows = pd.DataFrame({"pos": np.arange(len(df)), "key": _ALL, "ordinal": ordinal})
+        glob = self._asof(_ALL, rows).sort_values("pos")
+        gn, gt = glob["n"].to_numpy(), glob["total"].to_numpy()
+        g = np.where(gn > 0, gt / np.maximum(gn, 1), DEFAULT_PRIOR_MEAN)
+
+        out = {}
+        for kind in AGG_KINDS:
+            ent = _entities(df, kind)
+            keys = pd.DataFrame({"pos": ent["row"].to_numpy(), "key": ent["key"].to_numpy(),
+                                 "ordinal": ordinal[ent["row"].to_numpy()] if len(ent) else np.array([])})
+            hit = self._asof(kind, keys)
+            pos = hit["pos"].to_numpy(dtype=np.int64)
+            shrunk = (hit["total"].to_numpy() + prior_weight * g[pos]) / (hit["n"].to_numpy() + prior_weight)
+            mean_sum = np.bincount(pos, weights=shrunk, minlength=len(df))
+            k = np.bincount(pos, minlength=len(df))
+            n = np.bincount(pos, weights=hit["n"].to_numpy(), minlength=len(df))
+            out[f"{kind}_prior_mean"] = np.where(k > 0, mean_sum / np.maximum(k, 1), g)
+            out[f"{kind}_prior_n"] = np.log1p(n)
+        return pd.DataFrame(out, index=df.index)[AGG_COLUMNS].astype(np.float32)
@@ -1,12 +1,25 @@
 from __future__ import annotations
+import argparse
+import hashlib
 import json
+import os
 from pathlib import Path
+from typing import Optional
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from rich import print as rprint
+from scipy import sparse
 
-from ..utils.io import NORMALIZED, FEATURES
+from ..utils.io import FEATURES
+from .aggregates import AGG_COLUMNS, AGG_PRIOR_WEIGHT, ROLLING_AGGREGATES, AggregateIndex
+from .matrix import write_matrix
+from .relations import RELATION_COLUMNS, RELATION_FEATURES, RelationGraph
+from .text import TEXT_FEATURES, HashedTextFeaturizer, text_input
+from ..utils.normalized_store import LABELS_PATH, NormalizedStore
+from ..utils.profiling import profiling, stage
 
 # ---------------------------------------------------------------------------
 # Feature design (leakage-safe for pre-/early-season prediction)
@@ -17,6 +30,8 @@ from ..utils.io import NORMALIZED, FEATURES
 # before a season begins:
 #   - studio, genres, themes, demographics, source, type, rating, season, year
 #   - episode count (announced pre-release), title/synopsis length
+#   - labels of *earlier* seasons only: studio/source/genre averages
+#     (aggregates.py) and the nearest prequel's score (relations.py)
 #
 # `score` is kept ONLY as the training label (`label_score`), never as a feature.
 
@@ -31,52 +46,83 @@ TOP_N_STUDIOS = 30
 TOP_N_DEMOGRAPHICS = 10
 
 
-def _names(cell):
-    """Coerce a list-of-dicts or list-of-strings cell into a list of names."""
-    if cell is None:
-        return []
-    out = []
-    if isinstance(cell, float) and np.isnan(cell):
-        return out
-    if isinstance(cell, str):
-        return [cell]
-    for it in cell:
-        if isinstance(it, dict):
-            n = it.get("name")
-            if n:
-                out.append(n)
-        elif isinstance(it, str):
-            out.append(it)
-    return out
+def _explode_names(series: pd.Series) -> pd.Series:
+    """Flatten a list-cell series into one name per entry, indexed by row position.
+
+    Cells may hold lists/arrays of strings (the normalized store's canonical
+    form), lists of ``{"name": ...}`` dicts (older snapshots), a bare string,
+    or NaN/None. Everything is exploded in one pass; only non-string entries
+    take the per-item fallback.
+    """
+    s = pd.Series(series.to_numpy(), index=np.arange(len(series)), dtype=object).explode()
+    s = s[s.notna()]
+    other = ~s.map(lambda v: isinstance(v, str))
+    if other.any():
+        s = s.copy()
+        s[other] = s[other].map(lambda v: v.get("name") if isinstance(v, dict) else None)
+        s = s[s.notna()]
+    return s[s != ""].astype(str)
 
 
 def _top_value_counts(series: pd.Series, top_n: int) -> list[str]:
     """Return the top-N most frequent individual names across a list-cell series."""
-    counter = {}
-    for cell in series:
-        for n in _names(cell):
-            counter[n] = counter.get(n, 0) + 1
-    return [k for k, _ in sorted(counter.items(), key=lambda kv: (-kv[1], kv[0]))[:top_n]]
+    counts = _explode_names(series).value_counts()
+    if counts.empty:
+        return []
+    ranked = counts.rename_axis("name").reset_index(name="n").sort_values(
+        ["n", "name"], ascending=[False, True], kind="stable"
+    )
+    return ranked["name"].head(top_n).tolist()
+
+
+def multihot_matrix(series: pd.Series, vocab: list[str]) -> sparse.csr_matrix:
+    """Sparse ``rows x len(vocab)`` 0/1 matrix for list-valued cells against ``vocab``.
+
+    Names are mapped to vocab positions with a single index lookup;
+    names outside the vocab (-1) are dropped.
+    """
+    names = _explode_names(series)
+    codes = pd.Index(vocab).get_indexer(names.to_numpy())
+    keep = codes >= 0
+    pairs = np.unique(np.stack([names.index.to_numpy()[keep], codes[keep]]), axis=1)  # one hit per (row, name)
+    data = np.ones(pairs.shape[1], dtype=np.uint8)
+    return sparse.csr_matrix((data, (pairs[0], pairs[1])), shape=(len(series), len(vocab)))
 
 
 def _multihot(series: pd.Series, vocab: list[str]) -> pd.DataFrame:
-    """Build a 0/1 multi-hot DataFrame for list-valued cells against ``vocab``."""
+    """Dense uint8 multi-hot DataFrame (the features parquet stores dense columns)."""
     if not vocab:
         return pd.DataFrame(index=series.index)
-    cols = {f"{series.name}_{v}": [] for v in vocab}
-    for cell in series:
-        names = set(_names(cell))
-        for v in vocab:
-            cols[f"{series.name}_{v}"].append(1 if v in names else 0)
-    return pd.DataFrame(cols, index=series.index).astype(int)
+    return pd.DataFrame(
+        multihot_matrix(series, vocab).toarray(),
+        index=series.index,
+        columns=[f"{series.name}_{v}" for v in vocab],
+    )
 
 
-def load_normalized() -> pd.DataFrame:
-    path = NORMALIZED / "anime.parquet"
-    df = pd.read_parquet(path)
+# pandas (in memory, incremental) | duckdb (out of core, always a full rebuild; see duckdb_engine.py)
+FEATURE_ENGINE = os.getenv("FEATURE_ENGINE", "pandas").lower()
+
+
+def join_labels(df: pd.DataFrame) -> pd.DataFrame:
+    """Take ``score`` from labels.parquet's ``final_score`` where ingest_details fetched one.
+
+    The season snapshot's score is frozen at ingest time; the detail label is
+    the later, settled value. Titles without a label keep the snapshot score.
+    """
+    if not LABELS_PATH.exists() or df.empty:
+        return df
+    lab = pd.read_parquet(LABELS_PATH, columns=["mal_id", "final_score"])
+    lab = lab.dropna().drop_duplicates("mal_id", keep="last")
+    final = df["mal_id"].map(pd.Series(lab["final_score"].to_numpy(), index=lab["mal_id"].to_numpy()))
+    df["score"] = final.astype(np.float64).fillna(pd.to_numeric(df.get("score"), errors="coerce"))
     return df
 
 
+def load_normalized() -> pd.DataFrame:
+    return join_labels(NormalizedStore().read())
+
+
 def _ensure_columns(df: pd.DataFrame) -> pd.DataFrame:
     """Backfill optional columns so old (AniList-only) snapshots still work."""
     n = len(df)
@@ -94,111 +140,413 @@ def _ensure_columns(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def simple_features(df: pd.DataFrame) -> pd.DataFrame:
+# Bump when FeaturePipeline.transform's encoding changes: invalidates every stored feature row.
+FEATURE_VERSION = 2
+FEATURES_PATH = FEATURES / "features.parquet"
+PROFILE_PATH = FEATURES / "build_profile.json"
+
+SEQUEL_PATTERN = r"(?:season\s*[2-9]|part\s*[2-9]|\bii\b|\biii\b|\biv\b|\bv\b|2nd|3rd|4th)"
+# (source column, feature prefix, vocab key, top-N) for multi-hot list columns.
+MULTIHOT_SPECS = [
+    ("genres", "genre", "genres", lambda: TOP_N_GENRES),
+    ("themes", "theme", "themes", lambda: TOP_N_THEMES),
+    ("studios", "studio", "studios", lambda: TOP_N_STUDIOS),
+    ("demographics", "demo", "demographics", lambda: TOP_N_DEMOGRAPHICS),
+]
+BASE_COLUMNS = [
+    "episodes_log", "episodes_missing", "year_filled", "title_len", "synopsis_log",
+    "synopsis_missing", "title_suggests_sequel",
+]
+# Carried from the normalized row into features.parquet for training/export (not features).
+META_COLS = [
+    "title", "type", "source", "rating", "episodes", "synopsis", "studios", "genres", "themes",
+    "demographics", "image_url", "images", "members", "favorites", "status", "source_api",
+]
+
+
+class FeaturePipeline:
+    """Fitted feature encoder: learned once, then applied to any subset of rows.
+
+    ``fit`` learns the fill values, categorical levels and top-N vocabularies
+    from the training store; ``transform`` encodes just the rows it is given
+    against that state, so predicting one season never touches the rest of
+    the history. The state serializes to the ``vocab.json`` layout (plus
+    ``categories`` and ``feature_columns``) and is saved next to the model.
+    """
+
+    def __init__(self, state: Optional[dict] = None):
+        self.state = state
+
+    @property
+    def feature_columns(self) -> list[str]:
+        return self.state["feature_columns"]
+
+    def fit(self, df: pd.DataFrame) -> "FeaturePipeline":
+        df = _ensure_columns(df.copy())
+
+        # episodes: log1p, missing -> median of known values
+        eps = pd.to_numeric(df["episodes"], errors="coerce")
+        eps_known = eps[eps.notna() & (eps > 0)]
+        year_known = pd.to_numeric(df["year"], errors="coerce").dropna()
+        state = {
+            "episodes_fill": float(eps_known.median()) if not eps_known.empty else 12.0,
+            "year_fill": int(year_known.median()) if not year_known.empty else 2020,
+            "categories": {
+                col: sorted(df[col].fillna("unknown").astype(str).unique().tolist()) for col in CATEGORICAL_COLS
+            },
+        }
+        with stage("top_n_vocab"):
+            for col, _, key, top_n in MULTIHOT_SPECS:
+                state[key] = _top_value_counts(df[col], top_n())
+        text = None
+        if TEXT_FEATURES:
+            with stage("text_idf"):
+                text = HashedTextFeaturizer().fit(text_input(df))
+        self.state = self.complete_state(state, text)
+        return self
+
+    @staticmethod
+    def complete_state(state: dict, text: Optional[HashedTextFeaturizer] = None) -> dict:
+        """Add the text/history switches and ``feature_columns`` to fitted fills, levels and vocabs."""
+        text_columns: list[str] = []
+        if text is not None:
+            state["text"] = text.to_dict()
+            text_columns = text.columns
+        if ROLLING_AGGREGATES:
+            state["aggregates"] = {"prior_weight": AGG_PRIOR_WEIGHT}
+        if RELATION_FEATURES:
+            state["relations"] = True
+
+        state["feature_columns"] = [
+            *BASE_COLUMNS,
+            *(f"{col}_{lvl}" for col in CATEGORICAL_COLS for lvl in state["categories"][col]),
+            *(f"{prefix}_{v}" for col, prefix, key, _ in MULTIHOT_SPECS for v in state[key]),
+            *text_columns,
+            *(AGG_COLUMNS if ROLLING_AGGREGATES else []),
+            *(RELATION_COLUMNS if RELATION_FEATURES else []),
+        ]
+        return state
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Feature matrix for ``df``'s rows (same index), columns in ``feature_columns`` order.
+
+        Indicator columns are uint8 and numeric ones float32, so every value
+        is exactly representable in the float32 training matrix.
+        """
+        if self.state is None:
+            raise RuntimeError("FeaturePipeline is not fitted")
+        st = self.state
+        df = _ensure_columns(df.copy())
+        out = pd.DataFrame(index=df.index)
+
+        with stage("numeric"):
+            eps = pd.to_numeric(df["episodes"], errors="coerce")
+            out["episodes_log"] = np.log1p(eps.fillna(st["episodes_fill"]).clip(lower=0)).astype(np.float32)
+            out["episodes_missing"] = eps.isna().astype(np.uint8)
+            year = pd.to_numeric(df["year"], errors="coerce").fillna(st["year_fill"])
+            out["year_filled"] = year.astype(int).astype(np.float32)
+
+            # --- text length features ---
+            title = df["title"].fillna("").astype(str)
+            syn = df["synopsis"].fillna("").astype(str)
+            out["title_len"] = title.str.len().clip(0, 200).astype(np.float32)
+            out["synopsis_log"] = np.log1p(syn.str.len().clip(0, 2000)).astype(np.float32)
+            out["synopsis_missing"] = (syn.str.len() == 0).astype(np.uint8)
+            # crude keyword signal: presence of "season 2"/"season 3"/"part 2"/"II"/"III"
+            out["title_suggests_sequel"] = title.str.lower().str.contains(SEQUEL_PATTERN, regex=True).astype(np.uint8)
+
+        # --- categorical one-hot against the fitted levels (unseen -> all zeros) ---
+        blocks = [out]
+        with stage("onehot"):
+            for col in CATEGORICAL_COLS:
+                levels = st["categories"].get(col, [])
+                codes = pd.Index(levels).get_indexer(df[col].fillna("unknown").astype(str).to_numpy())
+                onehot = np.zeros((len(df), len(levels)), dtype=np.uint8)
+                hit = codes >= 0
+                onehot[np.flatnonzero(hit), codes[hit]] = 1
+                blocks.append(pd.DataFrame(onehot, index=df.index, columns=[f"{col}_{lvl}" for lvl in levels]))
+
+        # --- multi-hot list columns against the fitted top-N vocabularies ---
+        with stage("multihot"):
+            for col, prefix, key, _ in MULTIHOT_SPECS:
+                blocks.append(_multihot(df[col].rename(prefix), st[key]))
+
+        # --- hashed title/synopsis n-grams (TEXT_FEATURES=on at fit time) ---
+        if st.get("text"):
+            with stage("text"):
+                text = HashedTextFeaturizer.from_dict(st["text"])
+                blocks.append(
+                    pd.DataFrame(
+                        text.transform(text_input(df)).toarray().astype(np.float32), index=df.index, columns=text.columns
+                    )
+                )
+
+        # --- columns drawn from other titles: as-of studio/source/genre label aggregates
+        #     (aggregates.py) and the prequel graph (relations.py) ---
+        if self.history_columns:
+            with stage("history"):
+                blocks.append(self.history_features(df))
+
+        with stage("concat"):
+            base = pd.concat(blocks, axis=1)
+            # Feature hygiene
+            base = base.replace([np.inf, -np.inf], np.nan).fillna(0)
+            return base.reindex(columns=st["feature_columns"], fill_value=np.uint8(0))
+
+    def aggregate_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Rolling aggregate columns from the persisted index (built by ``build``)."""
+        index = AggregateIndex.load()
+        if index is None:
+            raise SystemExit("Missing features/aggregates.parquet. Run build_features first.")
+        return index.lookup(df, self.state["aggregates"]["prior_weight"])
+
+    def relation_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Franchise columns from the persisted prequel graph (built by ``build``).
+
+        Rows the graph has not seen (a season fetched after the build) are
+        joined in with their own relations first.
+        """
+        graph = RelationGraph.load()
+        if graph is None:
+            raise SystemExit("Missing features/relations.npz. Run build_features first.")
+        return graph.with_rows(df).lookup(df)
+
+    @property
+    def history_columns(self) -> list[str]:
+        """Columns that depend on other rows (their labels or relations), not just the row itself."""
+        st = self.state
+        return [*(AGG_COLUMNS if st.get("aggregates") else []), *(RELATION_COLUMNS if st.get("relations") else [])]
+
+    def history_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        blocks = []
+        if self.state.get("aggregates"):
+            blocks.append(self.aggregate_features(df))
+        if self.state.get("relations"):
+            blocks.append(self.relation_features(df))
+        return pd.concat(blocks, axis=1) if blocks else pd.DataFrame(index=df.index)
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self.fit(df).transform(df)
+
+    def version(self) -> str:
+        """Hash of the fitted state that determines an already-encoded row's values.
+
+        Categorical levels are left out: a new level only adds a column that is
+        0 for every existing row, and a dropped level only removes one. Vocab
+        order is left out too, since columns are reindexed on write.
+        """
+        st = self.state
+        key = {
+            "feature_version": FEATURE_VERSION,
+            "episodes_fill": st["episodes_fill"],
+            "year_fill": st["year_fill"],
+            **{k: sorted(st[k]) for _, _, k, _ in MULTIHOT_SPECS},
+            "text": st.get("text"),  # IDF weights (if enabled) move with the corpus
+            # History columns depend on other rows; build() refreshes them for every row.
+            "aggregates": st.get("aggregates"),
+            "relations": st.get("relations"),
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.state))
+
+    @classmethod
+    def load(cls, path: Path, feature_columns_path: Optional[Path] = None) -> "FeaturePipeline":
+        """Load a saved pipeline; a pre-pipeline vocab.json needs its feature_columns.json too."""
+        state = json.loads(path.read_text())
+        if "feature_columns" not in state:
+            fc_path = feature_columns_path or path.with_name("feature_columns.json")
+            state["feature_columns"] = json.loads(fc_path.read_text())
+        if "categories" not in state:
+            state["categories"] = {
+                col: [c[len(col) + 1:] for c in state["feature_columns"] if c.startswith(f"{col}_")]
+                for col in CATEGORICAL_COLS
+            }
+        return cls(state)
+
+
+def simple_features(df: pd.DataFrame, pipeline: Optional[FeaturePipeline] = None) -> pd.DataFrame:
+    """Encode ``df`` with ``pipeline`` (fitted on ``df`` itself when omitted) plus id/label/meta columns."""
     df = _ensure_columns(df.copy())
+    if pipeline is None:
+        pipeline = FeaturePipeline().fit(df)
+        _save_pipeline(pipeline)
 
-    # --- numeric ---
-    # episodes: log1p, missing -> median of known values
-    eps = pd.to_numeric(df["episodes"], errors="coerce")
-    eps_known = eps[eps.notna() & (eps > 0)]
-    eps_fill = float(eps_known.median()) if not eps_known.empty else 12.0
-    df["episodes_log"] = np.log1p(eps.fillna(eps_fill).clip(lower=0))
-    df["episodes_missing"] = eps.isna().astype(int)
-
-    # year
-    df["year"] = pd.to_numeric(df["year"], errors="coerce")
-    year_known = df["year"].dropna()
-    year_fill = int(year_known.median()) if not year_known.empty else 2020
-    df["year_filled"] = df["year"].fillna(year_fill).astype(int)
-
-    # --- text length features ---
-    title_len = df["title"].fillna("").astype(str).str.len().clip(0, 200)
-    syn = df["synopsis"].fillna("").astype(str)
-    df["title_len"] = title_len
-    df["synopsis_len"] = syn.str.len().clip(0, 2000)
-    df["synopsis_log"] = np.log1p(df["synopsis_len"])
-    df["synopsis_missing"] = (syn.str.len() == 0).astype(int)
-    # crude keyword signal: presence of "season 2"/"season 3"/"part 2"/"II"/"III"
-    sequel_pat = r"(?:season\s*[2-9]|part\s*[2-9]|\bii\b|\biii\b|\biv\b|\bv\b|2nd|3rd|4th)"
-    df["title_suggests_sequel"] = (
-        df["title"].fillna("").astype(str).str.lower().str.contains(sequel_pat, regex=True).astype(int)
-    )
+    with stage("transform"):
+        base = pipeline.transform(df)
+    with stage("meta"):
+        return with_meta(df, base)
 
-    # --- categorical one-hot ---
-    cat_df = pd.get_dummies(
-        df[CATEGORICAL_COLS].fillna("unknown").astype(str),
-        prefix=CATEGORICAL_COLS,
-        dtype=int,
-    )
 
-    # --- multi-hot list columns (top-N by frequency) ---
-    genre_vocab = _top_value_counts(df["genres"], TOP_N_GENRES)
-    theme_vocab = _top_value_counts(df["themes"], TOP_N_THEMES)
-    studio_vocab = _top_value_counts(df["studios"], TOP_N_STUDIOS)
-    demo_vocab = _top_value_counts(df["demographics"], TOP_N_DEMOGRAPHICS)
-
-    genre_mh = _multihot(df["genres"].rename("genre"), genre_vocab)
-    theme_mh = _multihot(df["themes"].rename("theme"), theme_vocab)
-    studio_mh = _multihot(df["studios"].rename("studio"), studio_vocab)
-    demo_mh = _multihot(df["demographics"].rename("demo"), demo_vocab)
-
-    base = pd.concat(
-        [
-            df[["episodes_log", "episodes_missing", "year_filled", "title_len", "synopsis_log",
-                "synopsis_missing", "title_suggests_sequel"]],
-            cat_df,
-            genre_mh,
-            theme_mh,
-            studio_mh,
-            demo_mh,
-        ],
+def with_meta(df: pd.DataFrame, base: pd.DataFrame) -> pd.DataFrame:
+    """``mal_id`` + encoded ``base`` + label/season/display columns: one features.parquet row per ``df`` row."""
+    # Attach id/label columns for downstream training/prediction.
+    extra = {
+        "label_score": pd.to_numeric(df.get("score"), errors="coerce"),
+        "season_key": df.get("season_key"),
+        "year": pd.to_numeric(df["year"], errors="coerce").values,
+        "season": df["season"].values,
+    }
+    # Carry display/metadata forward for the prediction export step.
+    for meta_col in META_COLS:
+        if meta_col in df.columns:
+            extra[meta_col] = df[meta_col].values
+
+    return pd.concat(
+        [pd.DataFrame({"mal_id": df["mal_id"].values}, index=df.index), base, pd.DataFrame(extra, index=df.index)],
         axis=1,
     )
 
-    # Feature hygiene
-    base = base.replace([np.inf, -np.inf], np.nan).fillna(0)
 
-    # Persist the feature column list + the multi-hot vocabularies for inference.
+def _save_pipeline(pipeline: FeaturePipeline) -> None:
+    """Persist the feature column list + the fitted encoder state for training/inference."""
     FEATURES.mkdir(parents=True, exist_ok=True)
-    (FEATURES / "feature_columns.json").write_text(json.dumps(list(base.columns)))
-    (FEATURES / "vocab.json").write_text(
-        json.dumps(
-            {
-                "genres": genre_vocab,
-                "themes": theme_vocab,
-                "studios": studio_vocab,
-                "demographics": demo_vocab,
-                "episodes_fill": eps_fill,
-                "year_fill": year_fill,
-            }
-        )
-    )
-
-    # Attach id/label columns for downstream training/prediction.
-    base.insert(0, "mal_id", df["mal_id"].values)
-    base["label_score"] = pd.to_numeric(df.get("score"), errors="coerce")
-    base["season_key"] = df.get("season_key")
-    base["year"] = df["year"].values
-    base["season"] = df["season"].values
+    (FEATURES / "feature_columns.json").write_text(json.dumps(pipeline.feature_columns))
+    pipeline.save(FEATURES / "vocab.json")
 
-    # Carry display/metadata forward for the prediction export step.
-    for meta_col in ["title", "type", "source", "rating", "episodes", "synopsis",
-                     "studios", "genres", "themes", "demographics", "image_url",
-                     "images", "members", "favorites", "status", "source_api"]:
-        if meta_col in df.columns:
-            base[meta_col] = df[meta_col].values
 
-    return base
+def _cell_key(value):
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, (list, tuple, dict)):
+        return json.dumps(value, sort_keys=True, default=str)
+    return value
 
 
-def build():
-    df = load_normalized()
-    X = simple_features(df)
-    X.to_parquet(FEATURES / "features.parquet", index=False)
-    rprint(f"[green]Built features: {X.shape} -> {FEATURES / 'features.parquet'}[/green]")
-    rprint(f"[dim]  labeled rows: {X['label_score'].notna().sum()}/{len(X)}[/dim]")
-    rprint(f"[dim]  feature columns: {len(json.loads((FEATURES / 'feature_columns.json').read_text()))}[/dim]")
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """uint64 content hash of each normalized row (nested cells hashed via their JSON)."""
+    cols = sorted(df.columns)
+    frame = pd.DataFrame(
+        {c: df[c].map(_cell_key) if df[c].dtype == object else df[c] for c in cols}, index=df.index
+    )
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def _load_feature_store(version: str) -> Optional[pd.DataFrame]:
+    """Stored feature rows, if they were encoded with an identical pipeline version."""
+    if not FEATURES_PATH.exists():
+        return None
+    meta = pq.read_schema(FEATURES_PATH).metadata or {}
+    if meta.get(b"feature_version", b"").decode() != version:
+        return None
+    old = pd.read_parquet(FEATURES_PATH)
+    return old if "row_hash" in old.columns else None
+
+
+def _write_feature_store(X: pd.DataFrame, version: str) -> None:
+    table = pa.Table.from_pandas(X, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"feature_version": version.encode()})
+    tmp = FEATURES_PATH.with_suffix(".parquet.tmp")
+    pq.write_table(table, tmp)
+    os.replace(tmp, FEATURES_PATH)
+
+
+def build(full: bool = False, engine: str = FEATURE_ENGINE):
+    """
+    Refresh features.parquet, re-encoding only rows whose normalized content changed.
+
+    Each stored row carries a ``row_hash`` of its normalized input, and the file
+    records the pipeline ``version()`` it was encoded with. Rows whose hash is
+    unchanged are reused as-is; new or edited rows are encoded and titles no
+    longer in the store are dropped. A different version (new vocab sets, fill
+    values, or FEATURE_VERSION) or ``full=True`` re-encodes everything.
+
+    ``engine="duckdb"`` runs the same build as SQL over the parquet partitions
+    in bounded memory instead (always a full rebuild).
+    """
+    if engine == "duckdb":
+        from .duckdb_engine import build_duckdb
+
+        return build_duckdb()
+    with stage("load_normalized"):
+        df = _ensure_columns(load_normalized())
+    with stage("fit"):
+        pipeline = FeaturePipeline().fit(df)
+        _save_pipeline(pipeline)
+    if pipeline.state.get("aggregates"):
+        with stage("aggregates"):
+            index = AggregateIndex.load() or AggregateIndex()
+            n_seasons = index.update(df)
+            index.save()
+        rprint(f"[dim]  aggregates: {n_seasons} season(s) recomputed[/dim]")
+    if pipeline.state.get("relations"):
+        with stage("relations"):
+            graph = RelationGraph.build(df)
+            graph.save()
+        rprint(f"[dim]  relations: {len(graph.ids)} titles, {graph.n_edges} prequel links[/dim]")
+    version = pipeline.version()
+    with stage("row_hashes"):
+        hashes = row_hashes(df)
+
+    with stage("load_store"):
+        old = None if full else _load_feature_store(version)
+    if old is None:
+        with stage("encode"):
+            X = simple_features(df, pipeline)
+        n_encoded = len(X)
+    else:
+        pos = pd.Index(old["mal_id"]).get_indexer(df["mal_id"])
+        old_hashes = old["row_hash"].to_numpy()
+        reuse = (pos >= 0) & (old_hashes[np.where(pos >= 0, pos, 0)] == hashes)
+        with stage("encode"):
+            fresh = simple_features(df[~reuse], pipeline)
+        with stage("merge_reused"):
+            kept = old.iloc[pos[reuse]].drop(columns="row_hash")
+            kept.index = df.index[reuse]
+            fresh.index = df.index[~reuse]
+            X = pd.concat([kept, fresh]).loc[df.index].reindex(columns=fresh.columns)
+            # Categorical levels first seen in the fresh rows are 0 for the reused ones.
+            feat = pipeline.feature_columns
+            X[feat] = X[feat].fillna(0).astype(fresh[feat].dtypes.to_dict())
+        if pipeline.history_columns and len(X):
+            with stage("refresh_history"):
+                # Reused rows' aggregates and prequel features shift when other titles' labels change.
+                hist = pipeline.history_features(df.loc[X.index])
+                for col in pipeline.history_columns:
+                    X[col] = hist[col].to_numpy()
+        X = X.reset_index(drop=True)
+        n_encoded = len(fresh)
+
+    X = pd.concat([X, pd.Series(hashes, index=X.index, name="row_hash")], axis=1)
+    with stage("write_store"):
+        _write_feature_store(X, version)
+    with stage("write_matrix"):
+        write_matrix(X, pipeline.feature_columns)
+    _report(X.shape, n_encoded, int(X["label_score"].notna().sum()), len(pipeline.feature_columns))
+
+
+def _report(shape: tuple, n_encoded: int, n_labeled: int, n_features: int) -> None:
+    rprint(f"[green]Built features: {shape} -> {FEATURES_PATH} (+ matrix.npy)[/green]")
+    rprint(f"[dim]  encoded {n_encoded} rows, reused {shape[0] - n_encoded}[/dim]")
+    rprint(f"[dim]  labeled rows: {n_labeled}/{shape[0]}[/dim]")
+    rprint(f"[dim]  feature columns: {n_features}[/dim]")
 
 
 if __name__ == "__main__":
-    build()
+    ap = argparse.ArgumentParser(description="Build features.parquet from the normalized store.")
+    ap.add_argument("--full", action="store_true", help="Re-encode every row instead of only changed ones")
+    ap.add_argument(
+        "--engine", choices=["pandas", "duckdb"], default=FEATURE_ENGINE,
+        help="pandas: in memory, incremental; duckdb: out-of-core SQL, full rebuild",
+    )
+    ap.add_argument(
+        "--profile", nargs="?", const=str(PROFILE_PATH), default=None, metavar="JSON",
+        help=f"Time each stage (wall/CPU/memory); print a table and write a JSON report (default {PROFILE_PATH.name})",
+    )
+    args = ap.parse_args()
+    with profiling(args.profile is not None) as prof:
+        build(full=args.full, engine=args.engine)
+    if prof is not None:
+        prof.meta.update(
+            engine=args.engine, full=args.full,
+            rows=pq.ParquetFile(FEATURES_PATH).metadata.num_rows,
+            feature_columns=len(json.loads((FEATURES / "feature_columns.json").read_text())),
+        )
+        prof.print_table("build_features profile")
+        prof.save(Path(args.profile))
+        rprint(f"[green]Saved profile -> {args.profile}[/green]")
@@ -0,0 +1,364 @@
+"""DuckDB feature-build engine: the same features.parquet as ``build``, out of core.
+
+``build_features.build`` loads the whole normalized store into pandas. This
+engine instead runs the work as SQL over the parquet partitions:
+
+- the labels.parquet join (``final_score`` over the snapshot ``score``);
+- the pipeline fit: fill medians, categorical levels, top-N vocab counts;
+- the one-hot and multi-hot encoding, streamed in ``DUCKDB_BATCH_ROWS``
+  batches in store order.
+
+Per batch, the few columns whose exact float rounding or regex semantics
+come from numpy/Python (``log1p``, the sequel regex, hashed text) and the
+history lookups (aggregates, prequel graph) reuse the pandas code, so rows
+come out identical to ``simple_features``, ``row_hash`` included. The
+aggregate index and the prequel graph are built from streamed scans too
+(``update_batches`` / ``build_batches``). What stays in memory is the index
+itself plus one id/score/season and edge entry per title for the graph,
+not the list columns. Batches are
+written as parquet parts and merged into features.parquet under one schema,
+and the training matrix is filled from that file in row batches: memory is
+bounded by the batch size, and DuckDB runs on every core
+(``DUCKDB_THREADS``), spilling to ``features/.duckdb_tmp`` past
+``DUCKDB_MEMORY_LIMIT``.
+
+Usage:
+    python -m src.features.build_features --engine duckdb
+    FEATURE_ENGINE=duckdb python -m src.pipeline
+"""
+from __future__ import annotations
+import os
+import shutil
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from rich import print as rprint
+
+from ..utils.io import FEATURES
+from ..utils.normalized_store import LABELS_PATH, NormalizedStore
+from ..utils.profiling import stage
+from .aggregates import AggregateIndex
+from .build_features import (
+    CATEGORICAL_COLS,
+    FEATURES_PATH,
+    MULTIHOT_SPECS,
+    SEQUEL_PATTERN,
+    FeaturePipeline,
+    _ensure_columns,
+    _report,
+    _save_pipeline,
+    row_hashes,
+    with_meta,
+)
+from .matrix import write_matrix_from_parquet
+from .relations import RelationGraph
+from .text import TEXT_FEATURES, HashedTextFeaturizer, text_input
+
+try:  # optional: only this engine needs it
+    import duckdb  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    duckdb = None
+
+DUCKDB_BATCH_ROWS = int(os.getenv("DUCKDB_BATCH_ROWS", 50_000))
+DUCKDB_THREADS = int(os.getenv("DUCKDB_THREADS") or os.cpu_count() or 1)
+DUCKDB_MEMORY_LIMIT = os.getenv("DUCKDB_MEMORY_LIMIT", "")  # e.g. "2GB"; empty = DuckDB's default
+TMP_DIR = FEATURES / ".duckdb_tmp"
+PARTS_DIR = FEATURES / ".duckdb_parts"
+# Normalized columns the aggregate index and the prequel graph are built from.
+AGGREGATE_COLS = ["mal_id", "score", "year", "season", "studios", "source", "genres"]
+RELATION_COLS = ["mal_id", "score", "year", "season", "relations"]
+
+
+def _lit(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _conform(arr: pa.Array, typ: pa.DataType) -> pa.Array:
+    """Cast DuckDB's arrow output back to the store's types.
+
+    DuckDB has no null type (an all-null parquet column comes back as
+    INTEGER), so null-typed fields, including ones nested in structs and
+    lists, are rebuilt rather than cast.
+    """
+    if arr.type == typ:
+        return arr
+    if pa.types.is_null(typ):
+        return pa.nulls(len(arr))
+    if pa.types.is_struct(typ) and pa.types.is_struct(arr.type):
+        children = [_conform(arr.field(f.name), f.type) for f in typ]
+        return pa.StructArray.from_arrays(children, fields=list(typ), mask=arr.is_null())
+    if pa.types.is_list(typ) and pa.types.is_list(arr.type):
+        values = _conform(arr.values, typ.value_type)
+        return pa.ListArray.from_arrays(arr.offsets, values, type=typ, mask=arr.is_null())
+    return arr.cast(typ)
+
+
+class _Source:
+    """The normalized store (plus label join) as a DuckDB view ``src``, in store row order."""
+
+    def __init__(self, con, store: NormalizedStore):
+        self.con = con
+        if store.needs_migration():
+            files = [store.legacy_path]
+        else:
+            files = [store.dir / f"{key}.parquet" for key in store.partitions()]
+        if not files:
+            raise SystemExit(f"Missing {store.dir}. Run ingest first.")
+        file_list = "[" + ", ".join(_lit(f) for f in map(str, files)) + "]"
+
+        # The schema pandas would see: the permissive union of the partition schemas.
+        schema = pa.unify_schemas([pq.read_schema(f) for f in files], promote_options="permissive")
+        self.schema = schema.remove_metadata()
+
+        con.execute(
+            f"CREATE VIEW raw AS SELECT * FROM read_parquet({file_list}, union_by_name=true, "
+            f"filename=true, file_row_number=true)"
+        )
+        if LABELS_PATH.exists():
+            con.execute(
+                f"CREATE VIEW labels AS SELECT mal_id, arg_max(final_score, file_row_number) AS final_score "
+                f"FROM read_parquet({_lit(LABELS_PATH)}, file_row_number=true) "
+                f"WHERE mal_id IS NOT NULL AND final_score IS NOT NULL GROUP BY mal_id"
+            )
+            con.execute(
+                f"CREATE VIEW src AS SELECT r.* EXCLUDE (filename, file_row_number) "
+                f"REPLACE (coalesce(l.final_score, TRY_CAST(r.score AS DOUBLE)) AS score), "
+                f"list_position({file_list}, r.filename) AS _part, r.file_row_number AS _row "
+                f"FROM raw r LEFT JOIN labels l ON l.mal_id = r.mal_id"
+            )
+            idx = self.schema.get_field_index("score")
+            if idx >= 0:
+                self.schema = self.schema.set(idx, pa.field("score", pa.float64()))
+        else:
+            con.execute(
+                f"CREATE VIEW src AS SELECT * EXCLUDE (filename, file_row_number), "
+                f"list_position({file_list}, filename) AS _part, file_row_number AS _row FROM raw"
+            )
+        self.types = {name: typ for name, typ, *_ in con.execute("DESCRIBE src").fetchall()}
+
+        # pandas turns an integer column with any null into float64 for the whole frame.
+        ints = [f.name for f in self.schema if pa.types.is_integer(f.type)]
+        if ints:
+            nulls = con.execute(
+                "SELECT " + ", ".join(f"count(*) - count({_ident(c)})" for c in ints) + " FROM src"
+            ).fetchone()
+            self.float_cols = [c for c, n in zip(ints, nulls) if n]
+        else:
+            self.float_cols = []
+
+    def names_expr(self, col: str) -> str:
+        """SQL ``VARCHAR[]`` of the names in a list column (mirrors ``_explode_names``)."""
+        typ = self.types.get(col, "")
+        if typ == "VARCHAR[]":
+            expr = _ident(col)
+        elif typ.startswith("STRUCT(") and typ.endswith("[]") and "name " in typ:
+            expr = f"list_transform({_ident(col)}, x -> x.name)"
+        elif typ == "VARCHAR":
+            expr = f"CASE WHEN {_ident(col)} IS NULL THEN [] ELSE [{_ident(col)}] END"
+        else:
+            return "[]::VARCHAR[]"
+        return f"list_filter({expr}, x -> x IS NOT NULL AND x <> '')"
+
+    def scan(self, select: str, columns: list[str]) -> Iterator[tuple[pd.DataFrame, pa.RecordBatch]]:
+        """Stream ``SELECT <columns>, <select> FROM src`` in store order.
+
+        Yields the normalized ``columns`` as pandas would load them, plus the
+        raw batch for the extra ``select`` expressions.
+        """
+        have = [c for c in columns if c in self.schema.names]
+        cols = ", ".join(_ident(c) for c in have)
+        sql = f"SELECT {cols}{', ' + select if select else ''} FROM src ORDER BY _part, _row"
+        sub = pa.schema([self.schema.field(c) for c in have])
+        reader = self.con.execute(sql).to_arrow_reader(DUCKDB_BATCH_ROWS)
+        while True:
+            with stage("scan"):
+                try:
+                    batch = reader.read_next_batch()
+                except StopIteration:
+                    return
+                table = pa.Table.from_arrays([_conform(batch.column(c), sub.field(c).type) for c in have], schema=sub)
+                frame = table.to_pandas()
+                for c in self.float_cols:
+                    if c in frame.columns:
+                        frame[c] = frame[c].astype(np.float64)
+            yield frame, batch
+
+
+def _connect():
+    if duckdb is None:
+        raise SystemExit("FEATURE_ENGINE=duckdb requires the 'duckdb' package (pip install duckdb).")
+    con = duckdb.connect()
+    con.execute(f"SET threads = {max(1, DUCKDB_THREADS)}")
+    con.execute(f"SET temp_directory = {_lit(TMP_DIR)}")
+    if DUCKDB_MEMORY_LIMIT:
+        con.execute(f"SET memory_limit = {_lit(DUCKDB_MEMORY_LIMIT)}")
+    return con
+
+
+def _fit(src: _Source) -> FeaturePipeline:
+    """``FeaturePipeline.fit`` as aggregate queries (only the text IDF pass streams rows)."""
+    con = src.con
+    eps_fill, year_fill = con.execute(
+        "SELECT median(e) FILTER (WHERE e > 0), median(y) FROM "
+        "(SELECT TRY_CAST(episodes AS DOUBLE) AS e, TRY_CAST(year AS DOUBLE) AS y FROM src)"
+    ).fetchone()
+    state = {
+        "episodes_fill": float(eps_fill) if eps_fill is not None else 12.0,
+        "year_fill": int(year_fill) if year_fill is not None else 2020,
+        "categories": {
+            col: sorted(
+                v for (v,) in con.execute(
+                    f"SELECT DISTINCT coalesce(CAST({_ident(col)} AS VARCHAR), 'unknown') FROM src"
+                ).fetchall()
+            )
+            for col in CATEGORICAL_COLS
+        },
+    }
+    for col, _, key, top_n in MULTIHOT_SPECS:
+        counts = con.execute(
+            f"SELECT name, count(*) AS n FROM (SELECT unnest({src.names_expr(col)}) AS name FROM src) "
+            f"GROUP BY name"
+        ).fetchall()
+        ranked = sorted(counts, key=lambda nc: (-nc[1], nc[0]))  # same tie-break as _top_value_counts
+        state[key] = [name for name, _ in ranked[: top_n()]]
+
+    text = None
+    if TEXT_FEATURES:
+        text = HashedTextFeaturizer()
+        text.fit_batches(text_input(frame) for frame, _ in src.scan("", ["title", "synopsis"]))
+    return FeaturePipeline(FeaturePipeline.complete_state(state, text))
+
+
+def _encode_sql(src: _Source, pipeline: FeaturePipeline) -> tuple[str, list[str]]:
+    """SELECT list for the SQL-side columns, aliased ``_f0``..; returns it with their feature names."""
+    st = pipeline.state
+    eps = "TRY_CAST(episodes AS DOUBLE)"
+    syn_len = "length(coalesce(CAST(synopsis AS VARCHAR), ''))"
+    exprs = {
+        "episodes_missing": f"({eps} IS NULL)::UTINYINT",
+        "year_filled": f"CAST(trunc(coalesce(TRY_CAST(year AS DOUBLE), {float(st['year_fill'])!r})) AS FLOAT)",
+        "title_len": "CAST(least(length(coalesce(CAST(title AS VARCHAR), '')), 200) AS FLOAT)",
+        "synopsis_missing": f"({syn_len} = 0)::UTINYINT",
+        "_synopsis_len": f"least({syn_len}, 2000)",
+    }
+    for col in CATEGORICAL_COLS:
+        value = f"coalesce(CAST({_ident(col)} AS VARCHAR), 'unknown')"
+        for lvl in st["categories"][col]:
+            exprs[f"{col}_{lvl}"] = f"({value} = {_lit(lvl)})::UTINYINT"
+    for col, prefix, key, _ in MULTIHOT_SPECS:
+        names = src.names_expr(col)
+        for v in st[key]:
+            exprs[f"{prefix}_{v}"] = f"coalesce(list_contains({names}, {_lit(v)}), false)::UTINYINT"
+    names = list(exprs)
+    return ", ".join(f"{e} AS _f{i}" for i, e in enumerate(exprs.values())), names
+
+
+def _encode_batch(df: pd.DataFrame, sql_cols: pd.DataFrame, pipeline: FeaturePipeline) -> pd.DataFrame:
+    """One features.parquet batch: SQL-encoded columns + the pandas-side ones, as ``simple_features``."""
+    st = pipeline.state
+    eps = pd.to_numeric(df["episodes"], errors="coerce")
+    title = df["title"].fillna("").astype(str)
+    py_cols = pd.DataFrame({
+        "episodes_log": np.log1p(eps.fillna(st["episodes_fill"]).clip(lower=0)).astype(np.float32),
+        "synopsis_log": np.log1p(sql_cols.pop("_synopsis_len")).astype(np.float32),
+        "title_suggests_sequel": title.str.lower().str.contains(SEQUEL_PATTERN, regex=True).astype(np.uint8),
+    }, index=df.index)
+    blocks = [sql_cols, py_cols]
+    if st.get("text"):
+        text = HashedTextFeaturizer.from_dict(st["text"])
+        blocks.append(
+            pd.DataFrame(text.transform(text_input(df)).toarray().astype(np.float32), index=df.index, columns=text.columns)
+        )
+    if pipeline.history_columns:
+        blocks.append(pipeline.history_features(df))
+    base = pd.concat(blocks, axis=1)
+    base = base.replace([np.inf, -np.inf], np.nan).fillna(0)
+    return with_meta(df, base.reindex(columns=pipeline.feature_columns, fill_value=np.uint8(0)))
+
+
+def _merge_parts(parts: list[Path], version: str) -> None:
+    """Rewrite the part files as one features.parquet under their unified schema."""
+    schemas = [pq.read_schema(p) for p in parts]
+    schema = pa.unify_schemas(schemas, promote_options="permissive")
+    meta = {**(schemas[0].metadata or {}), b"feature_version": version.encode()}
+    schema = schema.with_metadata(meta)
+    tmp = FEATURES_PATH.with_suffix(".parquet.tmp")
+    with pq.ParquetWriter(tmp, schema) as writer:
+        for part in parts:
+            table = pq.read_table(part)
+            writer.write_table(
+                pa.Table.from_arrays(
+                    [_conform(table.column(f.name).combine_chunks(), f.type) for f in schema], schema=schema
+                )
+            )
+    os.replace(tmp, FEATURES_PATH)
+
+
+def build_duckdb(store: Optional[NormalizedStore] = None) -> None:
+    """Full rebuild of features.parquet, matrix and history indexes via DuckDB."""
+    store = store or NormalizedStore()
+    FEATURES.mkdir(parents=True, exist_ok=True)
+    con = _connect()
+    try:
+        with stage("source"):
+            src = _Source(con, store)
+        with stage("fit"):
+            pipeline = _fit(src)
+            _save_pipeline(pipeline)
+
+        # History indexes stream their own scan: each batch is reduced (label deltas,
+        # node/edge arrays) before the next is read, so list columns never pile up.
+        st = pipeline.state
+        if st.get("aggregates"):
+            with stage("aggregates"):
+                index = AggregateIndex.load() or AggregateIndex()
+                n_seasons = index.update_batches(f for f, _ in src.scan("", AGGREGATE_COLS))
+                index.save()
+            rprint(f"[dim]  aggregates: {n_seasons} season(s) recomputed[/dim]")
+        if st.get("relations"):
+            with stage("relations"):
+                graph = RelationGraph.build_batches(f for f, _ in src.scan("", RELATION_COLS))
+                graph.save()
+            rprint(f"[dim]  relations: {len(graph.ids)} titles, {graph.n_edges} prequel links[/dim]")
+
+        select, names = _encode_sql(src, pipeline)
+        shutil.rmtree(PARTS_DIR, ignore_errors=True)
+        PARTS_DIR.mkdir(parents=True)
+        parts: list[Path] = []
+        n_rows = n_labeled = 0
+        with stage("encode"):
+            for df, batch in src.scan(select, list(src.schema.names)):
+                with stage("batch"):
+                    sql_cols = batch.select([f"_f{i}" for i in range(len(names))]).to_pandas()
+                    sql_cols.columns = names
+                    df = _ensure_columns(df)
+                    X = _encode_batch(df, sql_cols, pipeline)
+                with stage("row_hashes"):
+                    X = pd.concat([X, pd.Series(row_hashes(df), index=X.index, name="row_hash")], axis=1)
+                with stage("write_part"):
+                    part = PARTS_DIR / f"part-{len(parts):05d}.parquet"
+                    pq.write_table(pa.Table.from_pandas(X, preserve_index=False), part)
+                parts.append(part)
+                n_rows += len(X)
+                n_labeled += int(X["label_score"].notna().sum())
+        if not parts:
+            raise SystemExit("The normalized store is empty. Run ingest first.")
+        with stage("merge_parts"):
+            _merge_parts(parts, pipeline.version())
+    finally:
+        con.close()
+        shutil.rmtree(PARTS_DIR, ignore_errors=True)
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+    with stage("write_matrix"):
+        write_matrix_from_parquet(FEATURES_PATH, pipeline.feature_columns)
+    n_cols = len(pq.read_schema(FEATURES_PATH).names)
+    _report((n_rows, n_cols), n_rows, n_labeled, len(pipeline.feature_columns))
@@ -0,0 +1,148 @@
+"""Memory-mapped float32 feature matrix for training.
+
+``build_features`` writes, next to ``features.parquet``:
+
+- ``matrix.npy``: one C-contiguous float32 array, rows x feature columns;
+- ``matrix_index.parquet``: per row ``mal_id``, ``year``, ``season``,
+  ``label_score``, with the column list in its schema metadata.
+
+Rows are ordered labeled-first, then by year and season, so "labeled rows
+from years a..b" and "labeled rows before season s" are contiguous row
+ranges: ``np.load(mmap_mode="r")`` plus a slice gives training code a
+zero-copy view instead of a per-split DataFrame copy.
+"""
+from __future__ import annotations
+import json
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ..utils.io import FEATURES
+from .aggregates import SEASON_INDEX
+
+MATRIX_PATH = FEATURES / "matrix.npy"
+MATRIX_INDEX_PATH = FEATURES / "matrix_index.parquet"
+INDEX_COLS = ["mal_id", "year", "season", "label_score"]
+# Bumped when the row order changes; older matrices are treated as stale.
+MATRIX_LAYOUT = 2
+
+
+def _season_keys(index: pd.DataFrame) -> np.ndarray:
+    """``year * 5 + season`` (unknown season = 4, i.e. after the year's four seasons); NaN year = +inf."""
+    year = pd.to_numeric(index["year"], errors="coerce").to_numpy(dtype=np.float64)
+    season = index["season"].astype(str).str.lower().map(SEASON_INDEX).fillna(len(SEASON_INDEX))
+    keys = year * 5 + season.to_numpy(dtype=np.float64)
+    return np.where(np.isnan(keys), np.inf, keys)
+
+
+def _row_order(index: pd.DataFrame) -> np.ndarray:
+    """Labeled rows first, then by year and season (NaN years last)."""
+    unlabeled = index["label_score"].isna().to_numpy()
+    return np.lexsort((_season_keys(index), unlabeled))  # last key sorts first
+
+
+def write_matrix(X: pd.DataFrame, columns: list[str]) -> None:
+    """Write ``X[columns]`` as the float32 matrix plus its row index (labeled rows first, by year)."""
+    order = _row_order(X)
+    out, tmp = _open_matrix(len(X), len(columns))
+    for start in range(0, len(order), 4096):  # fill in row blocks; never a second full copy
+        rows = order[start:start + 4096]
+        out[start:start + len(rows)] = X.iloc[rows][columns].to_numpy(dtype=np.float32)
+    out.flush()
+    del out  # unmap before the rename (required on Windows)
+    os.replace(tmp, MATRIX_PATH)
+    _write_index(X.iloc[order][INDEX_COLS], columns)
+
+
+def write_matrix_from_parquet(path: Path, columns: list[str], batch_rows: int = 65536) -> None:
+    """``write_matrix`` for a features parquet too big to load: reads it in row batches."""
+    index = pd.read_parquet(path, columns=INDEX_COLS)
+    order = _row_order(index)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))  # destination row of each source row
+    out, tmp = _open_matrix(len(index), len(columns))
+    start = 0
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows, columns=columns):
+        block = batch.to_pandas()[columns].to_numpy(dtype=np.float32)
+        out[rank[start:start + len(block)]] = block
+        start += len(block)
+    out.flush()
+    del out  # unmap before the rename (required on Windows)
+    os.replace(tmp, MATRIX_PATH)
+    _write_index(index.iloc[order], columns)
+
+
+def _open_matrix(n_rows: int, n_cols: int) -> Tuple[np.ndarray, Path]:
+    FEATURES.mkdir(parents=True, exist_ok=True)
+    tmp = MATRIX_PATH.with_suffix(".npy.tmp")
+    return np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=(n_rows, n_cols)), tmp
+
+
+def _write_index(index: pd.DataFrame, columns: list[str]) -> None:
+    index = index.reset_index(drop=True)
+    index["year"] = pd.to_numeric(index["year"], errors="coerce")
+    table = pa.Table.from_pandas(index, preserve_index=False)
+    meta = {b"columns": json.dumps(columns).encode(), b"layout": str(MATRIX_LAYOUT).encode()}
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **meta})
+    pq.write_table(table, MATRIX_INDEX_PATH)
+
+
+class FeatureMatrix:
+    """Read-only view over ``matrix.npy`` with year/season slicing on the labeled block."""
+
+    def __init__(self, values: np.ndarray, index: pd.DataFrame, columns: list[str]):
+        self.values = values
+        self.index = index
+        self.columns = columns
+        self.n_labeled = int(index["label_score"].notna().sum())
+        self._years = index["year"].to_numpy(dtype=np.float64)[: self.n_labeled]
+        self._keys = _season_keys(index.iloc[: self.n_labeled])
+
+    @classmethod
+    def open(cls, columns: Optional[list[str]] = None) -> Optional["FeatureMatrix"]:
+        """Memory-map the matrix; None if missing or built for a different column list."""
+        if not (MATRIX_PATH.exists() and MATRIX_INDEX_PATH.exists()):
+            return None
+        meta = pq.read_schema(MATRIX_INDEX_PATH).metadata or {}
+        stored = json.loads(meta.get(b"columns", b"[]"))
+        if columns is not None and stored != list(columns):
+            return None
+        if int(meta.get(b"layout", b"1")) != MATRIX_LAYOUT:
+            return None
+        values = np.load(MATRIX_PATH, mmap_mode="r")
+        index = pd.read_parquet(MATRIX_INDEX_PATH)
+        if values.shape != (len(index), len(stored)):
+            return None
+        return cls(values, index, stored)
+
+    def labeled_years(self, start: int, end: int) -> Tuple[np.ndarray, np.ndarray]:
+        """``(X, y)`` for labeled rows with ``start <= year <= end``; X is a view, not a copy."""
+        lo = int(np.searchsorted(self._years, start, side="left"))
+        hi = int(np.searchsorted(self._years, end, side="right"))
+        return self._labels(lo, hi)
+
+    def _labels(self, lo: int, hi: int) -> Tuple[np.ndarray, np.ndarray]:
+        return self.values[lo:hi], self.index["label_score"].to_numpy(dtype=np.float64)[lo:hi]
+
+    def labeled_seasons(self) -> list[tuple[int, str]]:
+        """Distinct ``(year, season)`` of labeled rows with a known season, in time order."""
+        keys = np.unique(self._keys[np.isfinite(self._keys)])
+        names = {v: k for k, v in SEASON_INDEX.items()}
+        return [(int(k // 5), names[int(k % 5)]) for k in keys if int(k % 5) in names]
+
+    def labeled_before(self, year: int, season: str) -> Tuple[np.ndarray, np.ndarray]:
+        """``(X, y)`` for labeled rows strictly before ``season`` of ``year`` (a view)."""
+        hi = int(np.searchsorted(self._keys, year * 5 + SEASON_INDEX[season], side="left"))
+        return self._labels(0, hi)
+
+    def labeled_season(self, year: int, season: str) -> Tuple[np.ndarray, np.ndarray]:
+        """``(X, y)`` for labeled rows of one season (a view)."""
+        key = year * 5 + SEASON_INDEX[season]
+        lo = int(np.searchsorted(self._keys, key, side="left"))
+        hi = int(np.searchsorted(self._keys, key, side="right"))
+        return self._labels(lo, hi)
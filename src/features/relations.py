@@ -0,0 +1,300 @@
+"""Prequel graph over ``mal_id`` for franchise features.
+
+Relations come from the normalized store's ``relations`` column and from the
+cached ``anime/{id}/full`` detail payloads in the raw store (never from the
+API at feature time). Only anime-to-anime ``Prequel``/``Sequel`` links are
+kept, as directed "title -> its prequel" edges in CSR form:
+
+- ``ids``: sorted ``mal_id`` of every node (titles outside the normalized
+  store too, e.g. a 2012 first season referenced by a 2024 sequel);
+- ``indptr`` / ``indices``: node ``i``'s prequels are
+  ``indices[indptr[i]:indptr[i + 1]]`` (node positions, not ids);
+- ``score`` / ``ordinal``: per-node label and ``year * 4 + season``.
+
+Per-node features are computed once for the whole graph with a few
+vectorized passes over the edge arrays, and rows are joined to them with a
+``searchsorted`` on ``ids``:
+
+- ``prequel_score``: score of the most recent scored prequel, walking up the
+  chain past unscored ones;
+- ``franchise_depth``: longest prequel chain below the title (0 = no prequel).
+
+A prequel only counts if it is strictly earlier than the title (or its
+season is unknown, since the relation itself says it came first), so a
+row never sees a same-season or later entry's score.
+"""
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..utils.io import FEATURES
+from ..utils.raw_store import DETAILS_ENDPOINT, default_store
+from .aggregates import season_ordinal
+
+RELATION_FEATURES = os.getenv("RELATION_FEATURES", "on").lower() not in {"0", "off", "false", "no"}
+RELATIONS_PATH = FEATURES / "relations.npz"
+RELATION_COLUMNS = ["prequel_score", "prequel_score_missing", "franchise_depth"]
+# Chains longer than this are capped (also bounds the passes on cyclic relation data).
+MAX_DEPTH = 32
+
+
+def _entry_value(obj, key: str):
+    return obj.get(key) if isinstance(obj, dict) else None
+
+
+def prequel_edges(mal_ids: Iterable, relations: Iterable) -> pd.DataFrame:
+    """``(mal_id, prequel_id)`` pairs from Jikan-style relation lists.
+
+    ``Prequel`` entries point from the title to the entry; ``Sequel`` entries
+    are the same link seen from the other side.
+    """
+    s = pd.Series(list(relations), index=pd.Index(list(mal_ids), dtype=object), dtype=object).explode().dropna()
+    rel = s.map(lambda r: str(_entry_value(r, "relation") or "").lower())
+    keep = rel.isin(["prequel", "sequel"]).to_numpy()
+    entries = pd.DataFrame({
+        "own": pd.to_numeric(pd.Series(s.index[keep]), errors="coerce").to_numpy(),
+        "relation": rel.to_numpy()[keep],
+        "entry": s[keep].map(lambda r: _entry_value(r, "entry")).to_numpy(),
+    }).explode("entry").dropna(subset=["entry"])
+    kind = entries["entry"].map(lambda e: str(_entry_value(e, "type") or "anime").lower())
+    other = pd.to_numeric(entries["entry"].map(lambda e: _entry_value(e, "mal_id")), errors="coerce")
+    entries = entries.assign(other=other)[(kind == "anime") & other.notna() & entries["own"].notna()]
+    is_prequel = (entries["relation"] == "prequel").to_numpy()
+    out = pd.DataFrame({
+        "mal_id": np.where(is_prequel, entries["own"], entries["other"]),
+        "prequel_id": np.where(is_prequel, entries["other"], entries["own"]),
+    }).astype(np.int64)
+    return out[out["mal_id"] != out["prequel_id"]].drop_duplicates().reset_index(drop=True)
+
+
+def _detail_frame(payloads: dict) -> pd.DataFrame:
+    """``mal_id``, ``score``, ``year``, ``season``, ``relations`` from cached detail payloads."""
+    rows = []
+    for payload in payloads.values():
+        d = (payload or {}).get("data") or {}
+        if d.get("mal_id") is None:
+            continue
+        rows.append({
+            "mal_id": d.get("mal_id"),
+            "score": d.get("score"),
+            "year": d.get("year"),
+            "season": d.get("season"),
+            "relations": d.get("relations") or [],
+        })
+    return pd.DataFrame(rows, columns=["mal_id", "score", "year", "season", "relations"])
+
+
+class RelationGraph:
+    """CSR prequel adjacency keyed by ``mal_id`` with per-node score and season ordinal."""
+
+    def __init__(self, ids: np.ndarray, indptr: np.ndarray, indices: np.ndarray,
+                 score: np.ndarray, ordinal: np.ndarray):
+        self.ids = ids
+        self.indptr = indptr
+        self.indices = indices
+        self.score = score
+        self.ordinal = ordinal
+        self._features: Optional[pd.DataFrame] = None
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.indices)
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_frames(cls, nodes: pd.DataFrame, edges: pd.DataFrame) -> "RelationGraph":
+        """Nodes (``mal_id``, ``score``, ``ordinal``; first row per id wins) plus prequel edges."""
+        nodes = nodes.assign(mal_id=pd.to_numeric(nodes["mal_id"], errors="coerce")).dropna(subset=["mal_id"])
+        nodes = nodes.drop_duplicates("mal_id", keep="first")
+        ids = np.unique(np.concatenate([
+            nodes["mal_id"].to_numpy(dtype=np.int64),
+            edges["mal_id"].to_numpy(dtype=np.int64),
+            edges["prequel_id"].to_numpy(dtype=np.int64),
+        ]))
+        pos = np.searchsorted(ids, nodes["mal_id"].to_numpy(dtype=np.int64))
+        score = np.full(len(ids), np.nan)
+        ordinal = np.full(len(ids), np.nan)
+        score[pos] = pd.to_numeric(nodes["score"], errors="coerce").to_numpy(dtype=np.float64)
+        ordinal[pos] = nodes["ordinal"].to_numpy(dtype=np.float64)
+
+        src = np.searchsorted(ids, edges["mal_id"].to_numpy(dtype=np.int64))
+        dst = np.searchsorted(ids, edges["prequel_id"].to_numpy(dtype=np.int64))
+        order = np.lexsort((dst, src))
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=len(ids)), out=indptr[1:])
+        return cls(ids, indptr, dst[order].astype(np.int64), score, ordinal)
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, details: Optional[dict] = None) -> "RelationGraph":
+        """Graph from normalized rows plus cached detail payloads (``None`` = read the raw store)."""
+        return cls.build_batches([df], details)
+
+    @classmethod
+    def build_batches(cls, frames: Iterable[pd.DataFrame], details: Optional[dict] = None) -> "RelationGraph":
+        """:meth:`build` from consecutive row batches.
+
+        Only each batch's node columns (id, score, ordinal) and prequel edges
+        are kept, never its relation lists.
+        """
+        node_parts, edge_parts = [], []
+        for df in frames:
+            node_parts.append(pd.DataFrame({
+                "mal_id": df["mal_id"].to_numpy(), "score": pd.to_numeric(df.get("score"), errors="coerce"),
+                "ordinal": season_ordinal(df),
+            }))
+            if "relations" in df.columns:
+                edge_parts.append(prequel_edges(df["mal_id"], df["relations"]))
+        if details is None:
+            details = default_store().get_many(DETAILS_ENDPOINT)
+        det = _detail_frame(details)
+        # Normalized rows first: their season placement and score win over the detail payload's.
+        det_ordinal = season_ordinal(det) if len(det) else np.array([])
+        nodes = pd.concat([
+            *node_parts,
+            pd.DataFrame({"mal_id": det["mal_id"].to_numpy(), "score": pd.to_numeric(det["score"], errors="coerce"),
+                          # a detail-only title with no season is "sometime before", not "after everything"
+                          "ordinal": np.where(np.isinf(det_ordinal), np.nan, det_ordinal)}),
+        ], ignore_index=True)
+        first_score = nodes.groupby("mal_id", sort=False)["score"].transform("first")  # backfill from details
+        nodes["score"] = nodes["score"].fillna(first_score)
+
+        edges = pd.concat([
+            *(edge_parts or [prequel_edges([], [])]),
+            prequel_edges(det["mal_id"], det["relations"]),
+        ], ignore_index=True).drop_duplicates()
+        return cls.from_frames(nodes, edges)
+
+    def with_rows(self, df: pd.DataFrame) -> "RelationGraph":
+        """This graph plus ``df``'s titles and their own prequel links; ``self`` if nothing is new.
+
+        A season fetched after the last build (``predict`` fetching its target)
+        is not in ``relations.npz``. Its rows carry their relations, so they
+        are joined in here rather than treated as having no prequel. Values
+        already in the graph win; the rows only fill ids, scores and seasons
+        it lacks.
+        """
+        edges = prequel_edges(df["mal_id"], df["relations"]) if "relations" in df.columns else prequel_edges([], [])
+        score = pd.to_numeric(df["score"], errors="coerce") if "score" in df.columns else pd.Series(np.nan, index=df.index)
+        score = score.to_numpy(dtype=np.float64)
+        ordinal = season_ordinal(df)
+        n = len(self.ids)
+        pos = self.position(df["mal_id"].to_numpy())
+        known = pos >= 0
+        at = np.where(known, pos, 0)
+        fill_score = known & ~np.isnan(score) & (np.isnan(self.score[at]) if n else False)
+        fill_ordinal = known & ~np.isnan(ordinal) & (np.isnan(self.ordinal[at]) if n else False)
+
+        old_src = np.repeat(np.arange(n), np.diff(self.indptr))
+        src = self.position(edges["mal_id"].to_numpy())
+        dst = self.position(edges["prequel_id"].to_numpy())
+        linked = (src >= 0) & (dst >= 0) & np.isin(src * n + dst, old_src * n + self.indices)
+        if known.all() and not fill_score.any() and not fill_ordinal.any() and linked.all():
+            return self
+
+        node_score, node_ordinal = self.score.copy(), self.ordinal.copy()
+        node_score[pos[fill_score]] = score[fill_score]
+        node_ordinal[pos[fill_ordinal]] = ordinal[fill_ordinal]
+        nodes = pd.concat([
+            pd.DataFrame({"mal_id": self.ids, "score": node_score, "ordinal": node_ordinal}),
+            pd.DataFrame({"mal_id": df["mal_id"].to_numpy()[~known], "score": score[~known], "ordinal": ordinal[~known]}),
+        ], ignore_index=True)
+        old = pd.DataFrame({"mal_id": self.ids[old_src], "prequel_id": self.ids[self.indices]})
+        return RelationGraph.from_frames(nodes, pd.concat([old, edges], ignore_index=True).drop_duplicates())
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save(self, path: Path = RELATIONS_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez(tmp, ids=self.ids, indptr=self.indptr, indices=self.indices, score=self.score, ordinal=self.ordinal)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path = RELATIONS_PATH) -> Optional["RelationGraph"]:
+        if not path.exists():
+            return None
+        with np.load(path) as z:
+            return cls(z["ids"], z["indptr"], z["indices"], z["score"], z["ordinal"])
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def position(self, mal_ids) -> np.ndarray:
+        """Node position per id, -1 where the id is not in the graph."""
+        ids = pd.to_numeric(pd.Series(mal_ids), errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+        if not len(self.ids):
+            return np.full(len(ids), -1)
+        pos = np.minimum(np.searchsorted(self.ids, ids), len(self.ids) - 1)
+        return np.where(self.ids[pos] == ids, pos, -1)
+
+    def prequels(self, mal_id: int) -> np.ndarray:
+        """Direct prequels of one title (``mal_id`` values)."""
+        pos = self.position([mal_id])[0]
+        if pos < 0:
+            return np.array([], dtype=np.int64)
+        return self.ids[self.indices[self.indptr[pos]:self.indptr[pos + 1]]]
+
+    def _edges(self) -> tuple[np.ndarray, np.ndarray]:
+        """Usable ``(title, prequel)`` position pairs: the prequel must not be the same season or later."""
+        src = np.repeat(np.arange(len(self.ids)), np.diff(self.indptr))
+        dst = self.indices
+        later = self.ordinal[dst] >= self.ordinal[src]  # NaN on either side compares False -> usable
+        return src[~later], dst[~later]
+
+    def node_features(self) -> pd.DataFrame:
+        """``prequel_score`` (NaN if none) and ``franchise_depth`` for every node, in ``ids`` order."""
+        if self._features is not None:
+            return self._features
+        n = len(self.ids)
+        src, dst = self._edges()
+
+        depth = np.zeros(n, dtype=np.int64)
+        for _ in range(MAX_DEPTH):
+            new = np.zeros(n, dtype=np.int64)
+            np.maximum.at(new, src, depth[dst] + 1)
+            new = np.minimum(new, MAX_DEPTH)
+            if np.array_equal(new, depth):
+                break
+            depth = new
+
+        # Nearest scored prequel: among a title's prequels take the latest one that has a
+        # score, either its own or (if unscored) the one propagated from further up.
+        rank = np.nan_to_num(self.ordinal[dst], nan=-np.inf)
+        order = np.lexsort((rank, src))
+        src_o, dst_o = src[order], dst[order]
+        pscore = np.full(n, np.nan)
+        for _ in range(MAX_DEPTH):
+            cand = np.where(np.isnan(self.score[dst_o]), pscore[dst_o], self.score[dst_o])
+            ok = ~np.isnan(cand)
+            s, c = src_o[ok], cand[ok]
+            last = np.r_[s[1:] != s[:-1], True] if len(s) else np.array([], dtype=bool)
+            new = np.full(n, np.nan)
+            new[s[last]] = c[last]
+            if np.array_equal(new, pscore, equal_nan=True):
+                break
+            pscore = new
+
+        self._features = pd.DataFrame({"prequel_score": pscore, "franchise_depth": depth})
+        return self._features
+
+    def lookup(self, df: pd.DataFrame) -> pd.DataFrame:
+        """``RELATION_COLUMNS`` for ``df``'s rows (same index); titles not in the graph get no prequel."""
+        feats = self.node_features()
+        pos = self.position(df["mal_id"].to_numpy())
+        hit = pos >= 0
+        pscore = np.full(len(df), np.nan)
+        depth = np.zeros(len(df))
+        pscore[hit] = feats["prequel_score"].to_numpy()[pos[hit]]
+        depth[hit] = feats["franchise_depth"].to_numpy()[pos[hit]]
+        return pd.DataFrame({
+            "prequel_score": np.nan_to_num(pscore, nan=0.0).astype(np.float32),
+            "prequel_score_missing": np.isnan(pscore).astype(np.uint8),
+            "franchise_depth": depth.astype(np.float32),
+        }, index=df.index)[RELATION_COLUMNS]
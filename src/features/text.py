@@ -0,0 +1,121 @@
+"""Hashed bag-of-n-grams features for title + synopsis.
+
+Words (or character n-grams) are hashed straight into a fixed number of
+buckets with scikit-learn's ``HashingVectorizer``, so there is no vocabulary
+to learn, store, or grow with the corpus. Documents are processed in chunks of
+``TEXT_CHUNK_ROWS``, keeping peak memory flat however many rows are encoded.
+Optional IDF weights are learned in one streaming pass (per-bucket document
+frequencies) and are the only fitted state: ``n_features`` floats.
+
+Enabled from ``FeaturePipeline`` with ``TEXT_FEATURES=on``.
+"""
+from __future__ import annotations
+import os
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+_TRUE = {"1", "on", "true", "yes"}
+
+TEXT_FEATURES = os.getenv("TEXT_FEATURES", "off").lower() in _TRUE
+TEXT_HASH_DIM = int(os.getenv("TEXT_HASH_DIM", 128))
+TEXT_ANALYZER = os.getenv("TEXT_ANALYZER", "word")  # word | char_wb
+TEXT_NGRAMS = tuple(int(n) for n in os.getenv("TEXT_NGRAMS", "1,2").split(","))
+TEXT_IDF = os.getenv("TEXT_IDF", "off").lower() in _TRUE
+TEXT_CHUNK_ROWS = int(os.getenv("TEXT_CHUNK_ROWS", 2000))
+
+
+def text_input(df: pd.DataFrame) -> pd.Series:
+    """The document encoded per row: title followed by synopsis."""
+    title = df["title"].fillna("").astype(str) if "title" in df.columns else ""
+    synopsis = df["synopsis"].fillna("").astype(str) if "synopsis" in df.columns else ""
+    return (title + " " + synopsis).str.strip()
+
+
+class HashedTextFeaturizer:
+    """Fixed-width hashed n-gram counts, optionally IDF-weighted, L2-normalized per row."""
+
+    def __init__(
+        self,
+        n_features: int = TEXT_HASH_DIM,
+        analyzer: str = TEXT_ANALYZER,
+        ngram_range: Sequence[int] = TEXT_NGRAMS,
+        use_idf: bool = TEXT_IDF,
+        chunk_size: int = TEXT_CHUNK_ROWS,
+        idf: Optional[Sequence[float]] = None,
+    ):
+        self.n_features = int(n_features)
+        self.analyzer = analyzer
+        self.ngram_range = tuple(ngram_range)
+        self.use_idf = use_idf
+        self.chunk_size = max(1, int(chunk_size))
+        self.idf = np.asarray(idf, dtype=np.float64) if idf is not None else None
+        self._hasher = HashingVectorizer(
+            n_features=self.n_features,
+            analyzer=self.analyzer,
+            ngram_range=self.ngram_range,
+            stop_words="english" if self.analyzer == "word" else None,
+            alternate_sign=False,
+            norm=None,
+            dtype=np.float64,
+        )
+
+    @property
+    def columns(self) -> list[str]:
+        return [f"txt_{i}" for i in range(self.n_features)]
+
+    def _chunks(self, texts: pd.Series):
+        for start in range(0, len(texts), self.chunk_size):
+            yield self._hasher.transform(texts.iloc[start:start + self.chunk_size].tolist())
+
+    def fit(self, texts: pd.Series) -> "HashedTextFeaturizer":
+        """One streaming pass: per-bucket document frequencies -> smoothed IDF (if enabled)."""
+        return self.fit_batches([texts])
+
+    def fit_batches(self, batches: Iterable[pd.Series]) -> "HashedTextFeaturizer":
+        """``fit`` over texts arriving in batches (e.g. from an out-of-core scan)."""
+        if not self.use_idf:
+            self.idf = None
+            return self
+        doc_freq = np.zeros(self.n_features, dtype=np.int64)
+        n_docs = 0
+        for texts in batches:
+            for counts in self._chunks(texts):
+                doc_freq += np.bincount(counts.indices, minlength=self.n_features)  # CSR: one entry per (doc, bucket)
+            n_docs += len(texts)
+        self.idf = np.log((1 + n_docs) / (1 + doc_freq)) + 1.0
+        return self
+
+    def transform(self, texts: pd.Series) -> sparse.csr_matrix:
+        """Sparse ``len(texts) x n_features`` block, built chunk by chunk."""
+        blocks = []
+        for counts in self._chunks(texts):
+            if self.idf is not None:
+                counts = counts @ sparse.diags(self.idf)
+            blocks.append(normalize(counts, norm="l2", copy=False))
+        if not blocks:
+            return sparse.csr_matrix((0, self.n_features))
+        return sparse.vstack(blocks, format="csr")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "n_features": self.n_features,
+            "analyzer": self.analyzer,
+            "ngram_range": list(self.ngram_range),
+            "use_idf": self.use_idf,
+            "idf": self.idf.round(6).tolist() if self.idf is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "HashedTextFeaturizer":
+        return cls(
+            n_features=state["n_features"],
+            analyzer=state["analyzer"],
+            ngram_range=state["ngram_range"],
+            use_idf=state["use_idf"],
+            idf=state.get("idf"),
+        )
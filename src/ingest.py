@@ -1,20 +1,32 @@
 from __future__ import annotations
 import argparse
+import asyncio
 import json
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Iterable, List, Optional
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from dotenv import load_dotenv
 from rich import print as rprint
 
-from .mal.client import JikanClient, pick_image_url
-from .utils.io import RAW, NORMALIZED, save_json, load_json
+from .mal.client import AsyncJikanClient, JikanClient
+from .utils.io import RAW, load_json
+from .utils.normalized_store import NormalizedStore
+from .utils.raw_store import SEASON_ENDPOINT, UPCOMING_ENDPOINT, default_store
 
 SEASONS = ["winter", "spring", "summer", "fall"]
 
+# Seasons run_ingest downloads concurrently (all requests still share the client's rate limiter).
+INGEST_FETCH_AHEAD = int(os.getenv("INGEST_FETCH_AHEAD", 2))
+# Processes normalizing seasons while later ones download; <= 1 normalizes on a thread instead.
+INGEST_NORMALIZE_WORKERS = int(os.getenv("INGEST_NORMALIZE_WORKERS", min(4, os.cpu_count() or 1)))
+
 
 def season_iter(start_year: int, end_year: int, seasons: Iterable[str]) -> Iterable[tuple[int, str]]:
     for y in range(start_year, end_year + 1):
@@ -56,61 +68,161 @@ def _extract_name_list(items):
     return out
 
 
-def normalize_season_payload(payload: dict, year: int | None, season: str) -> pd.DataFrame:
+LIST_COLS = ("studios", "demographics", "genres", "themes")
+
+# Arrow schema for one Jikan-shaped season item. Keys missing from an item
+# become nulls and keys not listed here are ignored, so the whole ``data`` list
+# converts in a single C-level pass.
+_NAMED = pa.list_(pa.struct([("name", pa.string())]))
+_IMAGE = pa.struct([("image_url", pa.string()), ("small_image_url", pa.string()), ("large_image_url", pa.string())])
+_RELATIONS = pa.list_(
+    pa.struct(
+        [
+            ("relation", pa.string()),
+            ("entry", pa.list_(pa.struct([
+                ("mal_id", pa.int64()), ("type", pa.string()), ("name", pa.string()), ("url", pa.string()),
+            ]))),
+        ]
+    )
+)
+ITEM_FIELDS = [
+    ("mal_id", pa.int64()),
+    ("title", pa.string()),
+    ("type", pa.string()),
+    ("episodes", pa.int64()),
+    ("duration", pa.string()),
+    ("source", pa.string()),
+    ("rating", pa.string()),
+    ("year", pa.int64()),
+    ("season", pa.string()),
+    ("synopsis", pa.string()),
+    ("members", pa.int64()),
+    ("favorites", pa.int64()),
+    ("score", pa.float64()),
+    ("status", pa.string()),
+    ("studios", _NAMED),
+    ("demographics", _NAMED),
+    ("genres", _NAMED),
+    ("themes", _NAMED),
+    ("relations", _RELATIONS),
+    ("images", pa.struct([("jpg", _IMAGE), ("webp", _IMAGE)])),
+    ("image_url", pa.string()),
+]
+_ITEM_TYPE = pa.struct(ITEM_FIELDS + [("aired", pa.struct([("from", pa.string())]))])
+_CONVERT_ERRORS = (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError, OverflowError)
+
+
+def _nonempty(arr: pa.Array) -> pa.Array:
+    """Treat empty strings as missing (the dict-based code used ``or`` chains)."""
+    return pc.if_else(pc.equal(arr, ""), pa.scalar(None, arr.type), arr)
+
+
+def _name_lists(arr: pa.Array) -> pa.Array:
+    """list<string> or list<struct<name>> -> list<string>, dropping null/empty names; null lists -> []."""
+    if pa.types.is_null(arr.type):
+        return pa.array([[] for _ in range(len(arr))], type=pa.list_(pa.string()))
+    values = arr.flatten()
+    if pa.types.is_struct(values.type):
+        values = pc.struct_field(values, "name") if values.type.get_field_index("name") >= 0 else pa.nulls(len(values), pa.string())
+    values = values.cast(pa.string())
+    keep = pc.fill_null(pc.not_equal(values, ""), False).to_numpy(zero_copy_only=False)
+    parents = pc.list_parent_indices(arr).to_numpy()
+    counts = np.bincount(parents[keep], minlength=len(arr))
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int32)
+    return pa.ListArray.from_arrays(pa.array(offsets), values.filter(pa.array(keep)))
+
+
+def _column_fallback(values: list, name: str, typ: pa.DataType) -> pa.Array:
+    """Per-column conversion for payloads that don't fit the item schema."""
+    try:
+        return pa.array(values, type=typ, from_pandas=True)
+    except _CONVERT_ERRORS:
+        pass
+    if name in LIST_COLS:
+        return pa.array([_extract_name_list(v) for v in values], type=pa.list_(pa.string()))
+    if pa.types.is_string(typ):
+        return pa.array([None if v is None else str(v) for v in values], type=typ)
+    if pa.types.is_integer(typ) or pa.types.is_floating(typ):
+        nums = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce")
+        return pa.array(nums, type=pa.float64(), from_pandas=True).cast(typ, safe=False)
+    return pa.nulls(len(values), typ)
+
+
+def _items_table(data: list) -> pa.Table:
+    try:
+        items = pa.array(data, type=_ITEM_TYPE)
+        return pa.Table.from_arrays(items.flatten(), names=[f.name for f in _ITEM_TYPE])
+    except _CONVERT_ERRORS:
+        cols = {name: _column_fallback([it.get(name) for it in data], name, typ) for name, typ in ITEM_FIELDS}
+        aired = [it.get("aired") if isinstance(it.get("aired"), dict) else None for it in data]
+        cols["aired"] = _column_fallback(aired, "aired", _ITEM_TYPE.field("aired").type)
+        return pa.table(cols)
+
+
+def normalize_season_table(payload: dict, year: int | None, season: str) -> pa.Table:
     """
-    Normalize a Jikan/AniList seasons payload (or upcoming) to a compact table.
+    Normalize a Jikan/AniList seasons payload (or upcoming) to a typed Arrow table.
 
     Captures image URLs and richer metadata (themes, demographics) so the
-    frontend can render covers without extra API calls.
+    frontend can render covers without extra API calls. List columns come out
+    as list<string> and the image URL is flattened from the ``images`` struct,
+    all with Arrow compute rather than per-row Python.
     """
-    data = payload.get("data", []) or []
-    rows = []
-    for item in data:
-        images = item.get("images")
-        image_url = item.get("image_url") or pick_image_url(images)
-        # Determine the most accurate year/season from the item itself, falling
-        # back to the requested values (upcoming payloads lack them).
-        aired = item.get("aired") or {}
-        aired_from = aired.get("from") if isinstance(aired, dict) else None
-        item_year = item.get("year")
-        if item_year is None and aired_from:
-            try:
-                item_year = int(aired_from[:4])
-            except (ValueError, TypeError):
-                item_year = year
-        if item_year is None:
-            item_year = year
-        item_season = (item.get("season") or season)
-
-        row = {
-            "mal_id": item.get("mal_id"),
-            "title": item.get("title"),
-            "type": item.get("type"),
-            "episodes": item.get("episodes"),
-            "duration": item.get("duration"),
-            "source": item.get("source"),
-            "rating": item.get("rating"),
-            "year": item_year,
-            "season": item_season,
-            "synopsis": item.get("synopsis"),
-            "members": item.get("members"),
-            "favorites": item.get("favorites"),
-            "score": item.get("score"),
-            "status": item.get("status"),
-            "studios": _extract_name_list(item.get("studios")),
-            "demographics": _extract_name_list(item.get("demographics")),
-            "genres": _extract_name_list(item.get("genres")),
-            "themes": _extract_name_list(item.get("themes")),
-            "relations": item.get("relations"),
-            "images": images,
-            "image_url": image_url,
-        }
-        rows.append(row)
-    df = pd.DataFrame(rows).drop_duplicates("mal_id")
-    return df
+    t = _items_table(payload.get("data", []) or [])
+    n = t.num_rows
+
+    # Prefer the item's own year/season, then aired.from, then the requested values
+    # (upcoming payloads lack them).
+    aired_from = pc.struct_field(t.column("aired").combine_chunks(), "from")
+    has_year = pc.fill_null(pc.match_substring_regex(aired_from, r"^\d{4}"), False)
+    aired_year = pc.if_else(has_year, pc.utf8_slice_codeunits(aired_from, 0, 4), pa.scalar(None, pa.string()))
+    year_col = pc.coalesce(t.column("year"), aired_year.cast(pa.int64()), pa.scalar(year, pa.int64()))
+    season_col = pc.coalesce(_nonempty(t.column("season")), pa.scalar(season, pa.string()))
+
+    images = t.column("images").combine_chunks()
+    candidates = [t.column("image_url")]
+    if pa.types.is_struct(images.type):
+        for fmt, key in (("webp", "large_image_url"), ("jpg", "large_image_url"), ("webp", "image_url"), ("jpg", "image_url")):
+            candidates.append(pc.struct_field(images, [fmt, key]))
+    image_url = pc.coalesce(*[_nonempty(c) for c in candidates])
+
+    cols = {}
+    for name, _ in ITEM_FIELDS:
+        if name in LIST_COLS:
+            cols[name] = _name_lists(t.column(name).combine_chunks())
+        elif name == "year":
+            cols[name] = year_col
+        elif name == "season":
+            cols[name] = season_col
+        elif name == "image_url":
+            cols[name] = image_url
+        else:
+            cols[name] = t.column(name)
+    out = pa.table(cols)
+
+    # drop_duplicates("mal_id"), keeping the first occurrence.
+    if n:
+        first = ~pd.Series(out.column("mal_id").to_numpy(zero_copy_only=False)).duplicated().to_numpy()
+        if not first.all():
+            out = out.filter(pa.array(first))
+    return out
 
 
-LIST_COLS = ("studios", "demographics", "genres", "themes")
+def normalize_season_payload(payload: dict, year: int | None, season: str) -> pd.DataFrame:
+    """DataFrame view of :func:`normalize_season_table`."""
+    return normalize_season_table(payload, year, season).to_pandas()
+
+
+def _canonical_names(series: pd.Series) -> pd.Series:
+    """Columnar list canonicalization; only mixed/odd columns pay the per-row path."""
+    try:
+        arr = pa.array(series, from_pandas=True)
+        if not (pa.types.is_null(arr.type) or pa.types.is_list(arr.type) or pa.types.is_large_list(arr.type)):
+            raise TypeError(arr.type)
+        names = _name_lists(arr)
+    except _CONVERT_ERRORS:
+        return series.apply(lambda cell: _extract_name_list(cell))
+    return pd.Series(names.to_pandas().values, index=series.index, name=series.name)
 
 
 def _canonicalize_list_cols(df: pd.DataFrame) -> pd.DataFrame:
@@ -122,97 +234,121 @@ def _canonicalize_list_cols(df: pd.DataFrame) -> pd.DataFrame:
     """
     for col in LIST_COLS:
         if col in df.columns:
-            df[col] = df[col].apply(lambda cell: _extract_name_list(cell))
+            df[col] = _canonical_names(df[col])
         else:
             df[col] = [[] for _ in range(len(df))]
     return df
 
 
-def _append_to_normalized(df_new: pd.DataFrame) -> pd.DataFrame:
-    """
-    Append df_new to data/normalized/anime.parquet, align columns, drop dups by mal_id.
-    Returns the merged DataFrame.
-    """
-    NORMALIZED.mkdir(parents=True, exist_ok=True)
-    out = NORMALIZED / "anime.parquet"
-
-    df_new = _canonicalize_list_cols(df_new)
+def _season_keys(df: pd.DataFrame) -> pd.Series:
+    """``<year>_<season>`` partition key per row (None when the year is unknown)."""
+    year = pd.to_numeric(df["year"], errors="coerce").astype("Int64")
+    keys = year.astype(str) + "_" + df["season"].astype(str).str.lower()
+    return keys.where(year.notna(), None)
 
-    if not out.exists():
-        merged = df_new.reset_index(drop=True)
-        merged.to_parquet(out, index=False)
-        return merged
 
-    base = _canonicalize_list_cols(pd.read_parquet(out))
+def _append_to_normalized(df_new: pd.DataFrame) -> dict[str, int]:
+    """
+    Upsert df_new into the season-partitioned normalized store (dedup by mal_id).
 
-    # Fast paths for empties
-    if base.empty and df_new.empty:
-        return base
-    if base.empty:
-        merged = df_new.reset_index(drop=True)
-        merged.to_parquet(out, index=False)
-        return merged
+    Only the partitions df_new touches are rewritten. A legacy single-file
+    anime.parquet is split into partitions on first use. Returns
+    ``{season_key: rows in that partition}``.
+    """
+    store = NormalizedStore()
+    if store.needs_migration():
+        n = store.migrate_legacy(_canonicalize_list_cols)
+        rprint(f"[dim]  migrated {n} rows from anime.parquet into {len(store.partitions())} season partitions[/dim]")
     if df_new.empty:
-        return base
-
-    # Align columns (union), then concat
-    all_cols = list(set(base.columns) | set(df_new.columns))
-    base_aligned = base.reindex(columns=all_cols)
-    new_aligned = df_new.reindex(columns=all_cols)
-
-    merged = (
-        pd.concat([base_aligned, new_aligned], ignore_index=True)
-        .drop_duplicates("mal_id", keep="last")
-        .reset_index(drop=True)
-    )
-    merged.to_parquet(out, index=False)
-    return merged
+        return {}
+    return store.upsert(_canonicalize_list_cols(df_new))
 
 
-def fetch_season_payload(
-    client: JikanClient, year: int, season: str, source: str
+async def fetch_season_payload_async(
+    client: AsyncJikanClient, year: int, season: str, source: str
 ) -> tuple[dict, str]:
     if source == "anilist":
-        return client.anilist_season_all(year, season), "anilist"
+        return await client.anilist_season_all(year, season), "anilist"
 
     if source == "jikan":
-        return client.season_all(year, season), "jikan"
+        return await client.season_all(year, season), "jikan"
 
     # auto: Jikan first, AniList fallback
     try:
-        return client.season_all(year, season), "jikan"
+        return await client.season_all(year, season), "jikan"
     except Exception as exc:
         rprint(f"[yellow]Jikan failed for {year} {season}: {exc}. Trying AniList fallback...[/yellow]")
-        return client.anilist_season_all(year, season), "anilist"
+        return await client.anilist_season_all(year, season), "anilist"
 
 
-def _raw_season_path(year: int, season: str, payload_source: str) -> Path:
+def fetch_season_payload(
+    client: JikanClient, year: int, season: str, source: str
+) -> tuple[dict, str]:
+    return client.run(fetch_season_payload_async(client.aio, year, season, source))
+
+
+def _legacy_season_path(year: int, season: str, payload_source: str) -> Path:
+    """Pre-raw-store location of a season payload (still read if not migrated)."""
     return RAW / f"{year}_{season}" / f"season_{payload_source}.json"
 
 
+def _save_season_payload(year: int, season: str, payload: dict, payload_source: str) -> None:
+    default_store().put(SEASON_ENDPOINT.format(source=payload_source), f"{year}_{season}", payload)
+
+
 def _load_cached_payload(year: int, season: str) -> Optional[tuple[dict, str]]:
-    """Return a cached raw payload for a season if one exists on disk."""
-    season_dir = RAW / f"{year}_{season}"
-    if not season_dir.exists():
-        return None
+    """Return a cached raw payload for a season if one exists in the raw store."""
+    store = default_store()
     # Prefer jikan cache, then anilist.
     for src in ("jikan", "anilist"):
-        p = season_dir / f"season_{src}.json"
+        payload = store.get(SEASON_ENDPOINT.format(source=src), f"{year}_{season}")
+        if payload is not None:
+            return payload, src
+    for src in ("jikan", "anilist"):
+        p = _legacy_season_path(year, season, src)
         if p.exists():
             try:
-                return load_json(p), src
+                payload = load_json(p)
             except Exception:
                 continue
+            _save_season_payload(year, season, payload, src)  # migrate on first read
+            return payload, src
     return None
 
 
+def _cached_season_source(year: int, season: str, stored: dict[str, set[str]]) -> Optional[str]:
+    """Source of a cached season payload without loading it (``stored``: source -> raw-store keys)."""
+    for src in ("jikan", "anilist"):
+        if f"{year}_{season}" in stored[src]:
+            return src
+    cached = _load_cached_payload(year, season)  # legacy JSON: migrated into the store here
+    return cached[1] if cached is not None else None
+
+
+def _normalize_season_job(year: int, season: str, payload: Optional[dict], payload_source: str) -> pd.DataFrame:
+    """
+    Normalize one season; ``payload=None`` loads it from the raw store first.
+
+    Top-level so it can run in a worker process: cache hits are shipped as a
+    (year, season, source) key instead of a pickled payload.
+    """
+    if payload is None:
+        payload = default_store().get(SEASON_ENDPOINT.format(source=payload_source), f"{year}_{season}")
+        if payload is None:
+            raise RuntimeError(f"cached {payload_source} payload for {year}_{season} disappeared")
+    df = normalize_season_payload(payload, year, season)
+    df["season_key"] = _season_keys(df)
+    df["source_api"] = payload_source
+    return df
+
+
 def ingest_one_season(
     year: int,
     season: str,
     source: str = "auto",
     use_cache: bool = True,
 ) -> pd.DataFrame:
-    """Fetch + normalize a single season and append it to anime.parquet.
+    """Fetch + normalize a single season and upsert it into the normalized store.
 
     Used by the prediction step to ensure the target season (e.g. an upcoming
     season) is present in the normalized store with image URLs. Returns the
@@ -225,41 +361,33 @@ def ingest_one_season(
     cached = _load_cached_payload(year, season) if use_cache else None
     if cached is not None:
         payload, payload_source = cached
-        rprint(f"[dim]  (cache hit: {year}_{season}/season_{payload_source}.json)[/dim]")
+        rprint(f"[dim]  (cache hit: {year}_{season} from {payload_source})[/dim]")
     else:
         payload, payload_source = fetch_season_payload(client, year, season, source)
-        season_dir = RAW / f"{year}_{season}"
-        season_dir.mkdir(parents=True, exist_ok=True)
-        save_json(payload, season_dir / f"season_{payload_source}.json")
+        _save_season_payload(year, season, payload, payload_source)
 
-    df = normalize_season_payload(payload, year, season)
-    df["season_key"] = df["year"].astype(str) + "_" + df["season"].astype(str)
-    df["source_api"] = payload_source
-    merged = _append_to_normalized(df)
+    _append_to_normalized(_normalize_season_job(year, season, payload, payload_source))
 
-    target = merged[(merged["year"] == year) & (merged["season"].astype(str).str.lower() == season)]
+    store = NormalizedStore()
+    target = store.read_season(year, season)
     rprint(
         f"[green]{year} {season}: {len(target)} rows "
-        f"(normalized store total {len(merged)})[/green]"
+        f"(normalized store total {store.count()})[/green]"
     )
     return target.reset_index(drop=True)
 
 
 def ingest_upcoming(use_cache: bool = False):
     """
-    Ingest MAL's 'upcoming' list and append it to anime.parquet.
+    Ingest MAL's 'upcoming' list into the normalized store's 'upcoming' partition.
     """
     load_dotenv()
     client = JikanClient()
 
-    cache_path = RAW / "upcoming" / "upcoming.json"
-    payload = None
-    if use_cache and cache_path.exists():
-        try:
-            payload = load_json(cache_path)
-            rprint("[cyan]Using cached upcoming payload.[/cyan]")
-        except Exception:
-            payload = None
+    store = default_store()
+    payload = store.get(UPCOMING_ENDPOINT, "upcoming") if use_cache else None
+    if payload is not None:
+        rprint("[cyan]Using cached upcoming payload.[/cyan]")
 
     if payload is None:
         rprint("[cyan]Fetching upcoming...[/cyan]")
@@ -270,14 +398,101 @@ def ingest_upcoming(use_cache: bool = False):
             payload = client.anilist_upcoming()
 
     # Save raw
-    save_json(payload, cache_path)
+    store.put(UPCOMING_ENDPOINT, "upcoming", payload)
 
     # Normalize and append
     df = normalize_season_payload(payload, year=None, season="upcoming")
     df["season_key"] = "upcoming"
-    merged = _append_to_normalized(df)
+    _append_to_normalized(df)
 
-    rprint(f"[green]Appended {len(df)} upcoming rows -> {NORMALIZED / 'anime.parquet'} (total {len(merged)})[/green]")
+    store = NormalizedStore()
+    rprint(f"[green]Upserted {len(df)} upcoming rows -> {store.dir} (total {store.count()})[/green]")
+
+
+async def _run_ingest_pipeline(
+    client: AsyncJikanClient,
+    todo: list[tuple[int, str]],
+    source: str,
+    use_cache: bool,
+    executor: Optional[ProcessPoolExecutor],
+    n_normalizers: int,
+) -> tuple[dict[tuple[int, str], pd.DataFrame], list[tuple[int, str, str]]]:
+    """
+    Fetch and normalize seasons as a two-stage pipeline.
+
+    Up to INGEST_FETCH_AHEAD seasons download at once and hand their payloads
+    to the normalizers through a bounded queue, so a slow normalize stage
+    applies back-pressure instead of buffering every payload. Cache hits skip
+    the fetch stage and are loaded + normalized inside ``executor`` (None: the
+    loop's default thread pool). A failing
+    season is recorded and the rest carry on. Returns ``(frames, failures)``.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * n_normalizers)
+    frames: dict[tuple[int, str], pd.DataFrame] = {}
+    failures: list[tuple[int, str, str]] = []
+    mode = {"source": source}
+
+    to_fetch: list[tuple[int, str]] = []
+    cached: list[tuple[int, str, str]] = []
+    if use_cache:
+        store = default_store()
+        stored = {src: store.keys(SEASON_ENDPOINT.format(source=src)) for src in ("jikan", "anilist")}
+        for year, season in todo:
+            src = _cached_season_source(year, season, stored)
+            if src is None:
+                to_fetch.append((year, season))
+            else:
+                cached.append((year, season, src))
+                rprint(f"[dim]  (cache hit: {year} {season} from {src})[/dim]")
+    else:
+        to_fetch = list(todo)
+    pending = iter(to_fetch)
+
+    async def fetcher() -> None:
+        for year, season in pending:  # shared iterator: each season is taken by one fetcher
+            rprint(f"[cyan]Fetching {year} {season}...[/cyan]")
+            try:
+                payload, payload_source = await fetch_season_payload_async(client, year, season, mode["source"])
+                if mode["source"] == "auto" and payload_source == "anilist":
+                    mode["source"] = "anilist"
+                    rprint("[yellow]Using AniList for the rest of this ingest run.[/yellow]")
+                await asyncio.to_thread(_save_season_payload, year, season, payload, payload_source)
+            except Exception as e:
+                failures.append((year, season, f"fetch: {e}"))
+                continue
+            await queue.put((year, season, payload, payload_source))
+
+    async def normalizer() -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            year, season = item[0], item[1]
+            try:
+                frames[(year, season)] = await loop.run_in_executor(executor, _normalize_season_job, *item)
+            except Exception as e:
+                failures.append((year, season, f"normalize: {e}"))
+
+    async def feed_cached() -> None:
+        for year, season, src in cached:
+            await queue.put((year, season, None, src))
+
+    normalizers = [asyncio.create_task(normalizer()) for _ in range(n_normalizers)]
+    n_fetchers = max(1, min(INGEST_FETCH_AHEAD, len(to_fetch)))
+    await asyncio.gather(feed_cached(), *(fetcher() for _ in range(n_fetchers)))
+    for _ in normalizers:
+        await queue.put(None)
+    await asyncio.gather(*normalizers)
+    return frames, failures
+
+
+def _normalize_executor(workers: int) -> Optional[ProcessPoolExecutor]:
+    """Process pool for normalization, or None (the loop's thread pool) when it would not pay off."""
+    if workers <= 1:
+        return None
+    # spawn: the parent has live threads and SQLite handles that must not be forked.
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
 
 
 def run_ingest(
@@ -286,56 +501,51 @@ def run_ingest(
     seasons: List[str],
     source: str = "auto",
     use_cache: bool = False,
+    client: Optional[JikanClient] = None,
 ):
     """
-    Ingest seasons in the given range and append to anime.parquet (no overwrite).
-
-    When ``use_cache`` is True, a season whose raw JSON already exists on disk
-    is loaded from cache instead of hitting the API. This makes re-runs fast and
-    avoids re-paying Jikan/AniList rate limits.
+    Ingest seasons in the given range and upsert them into the normalized store (no overwrite).
+
+    Downloads of later seasons overlap with normalization of finished ones
+    (see ``_run_ingest_pipeline``), so a multi-season run takes roughly the
+    longer of network and CPU time rather than their sum. When ``use_cache``
+    is True, a season whose raw payload is already stored is loaded from cache
+    instead of hitting the API. Failed seasons are listed at the end and do not
+    stop the others. ``client`` overrides the default JikanClient (e.g. one
+    backed by a replay transport).
     """
     load_dotenv()
-    client = JikanClient()
-    all_dfs: list[pd.DataFrame] = []
-    source_mode = source
-
-    for year, season in season_iter(start_year, end_year, seasons):
-        rprint(f"[cyan]Fetching {year} {season}...[/cyan]")
-
-        cached = _load_cached_payload(year, season) if use_cache else None
-        if cached is not None:
-            payload, payload_source = cached
-            rprint(f"[dim]  (cache hit: season_{payload_source}.json)[/dim]")
-            df = normalize_season_payload(payload, year, season)
-            df["season_key"] = df["year"].astype(str) + "_" + df["season"].astype(str)
-            df["source_api"] = payload_source
-            all_dfs.append(df)
-            continue
-
-        season_dir = RAW / f"{year}_{season}"
-        season_dir.mkdir(parents=True, exist_ok=True)
-        try:
-            payload, payload_source = fetch_season_payload(client, year, season, source_mode)
-            if source_mode == "auto" and payload_source == "anilist":
-                source_mode = "anilist"
-                rprint("[yellow]Using AniList for the rest of this ingest run.[/yellow]")
-            save_json(payload, season_dir / f"season_{payload_source}.json")
-            df = normalize_season_payload(payload, year, season)
-            df["season_key"] = df["year"].astype(str) + "_" + df["season"].astype(str)
-            df["source_api"] = payload_source
-            all_dfs.append(df)
-        except Exception as e:
-            rprint(f"[red]Failed {year} {season}: {e}[/red]")
-            # keep going
+    client = client or JikanClient()
+    todo = list(season_iter(start_year, end_year, seasons))
 
+    workers = max(1, min(INGEST_NORMALIZE_WORKERS, len(todo)))
+    executor = _normalize_executor(workers)
+    try:
+        frames, failures = client.run(
+            _run_ingest_pipeline(client.aio, todo, source, use_cache, executor, workers)
+        )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    for year, season, err in sorted(failures):
+        rprint(f"[red]Failed {year} {season} ({err})[/red]")
+
+    all_dfs = [frames[key] for key in todo if key in frames]  # season order: later seasons win on dedup
     if not all_dfs:
         rprint("[yellow]No data ingested. Check network or try a smaller range first.[/yellow]")
         return
 
-    # Append to normalized store (dedup by mal_id)
+    # Upsert into the normalized store (dedup by mal_id; only touched seasons are rewritten)
     full = pd.concat(all_dfs, ignore_index=True)
-    merged = _append_to_normalized(full)
-    rprint(f"[green]Wrote {len(merged)} rows -> {NORMALIZED / 'anime.parquet'}[/green]")
+    counts = _append_to_normalized(full)
+    store = NormalizedStore()
+    rprint(
+        f"[green]Wrote {len(full)} rows into {len(counts)} season partitions -> {store.dir} "
+        f"(store total {store.count()})[/green]"
+    )
+    if failures:
+        rprint(f"[yellow]{len(failures)} of {len(todo)} seasons failed; re-run to retry them.[/yellow]")
 
 
 if __name__ == "__main__":
@@ -1,28 +1,37 @@
 from __future__ import annotations
 import argparse
+import asyncio
 import json
+import os
 from pathlib import Path
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 
 import pandas as pd
 from rich import print as rprint
 
-from .mal.client import JikanClient
-from .utils.io import RAW, NORMALIZED
+from .mal.client import ANILIST_BATCH_PAGES, ANILIST_PER_PAGE, AsyncJikanClient, JikanClient
+from .utils.io import RAW
+from .utils.normalized_store import LABELS_PATH, NormalizedStore
+from .utils.raw_store import DETAILS_ENDPOINT, default_store
 
-DETAILS_DIR = RAW / "details"
+DETAILS_DIR = RAW / "details"  # legacy one-file-per-id cache (see utils.raw_store --migrate)
+
+# Concurrent detail fetches (the shared rate limiter still caps requests/s).
+DETAILS_WORKERS = int(os.getenv("DETAILS_WORKERS", 4))
+# Flush labels.parquet after this many new labels so a crash loses little work.
+CHECKPOINT_EVERY = int(os.getenv("DETAILS_CHECKPOINT_EVERY", 250))
 
 
 def load_candidates(year_min: Optional[int], year_max: Optional[int]) -> pd.DataFrame:
     """
-    Load candidate MAL IDs from anime.parquet, filter by year if provided,
+    Load candidate MAL IDs from the normalized store, filter by year if provided,
     and skip IDs we already labeled (labels.parquet).
     """
-    norm_path = NORMALIZED / "anime.parquet"
-    if not norm_path.exists():
-        raise SystemExit(f"Missing {norm_path}. Run ingest first.")
+    store = NormalizedStore()
+    if not store.exists():
+        raise SystemExit(f"Missing {store.dir}. Run ingest first.")
 
-    df = pd.read_parquet(norm_path)[["mal_id", "year", "season", "title"]].drop_duplicates()
+    df = store.read(columns=["mal_id", "year", "season", "title"]).drop_duplicates()
 
     # Year filters are best-effort (some rows may have NaN year)
     if year_min is not None:
@@ -30,10 +39,9 @@ def load_candidates(year_min: Optional[int], year_max: Optional[int]) -> pd.Data
     if year_max is not None:
         df = df[(df["year"].isna()) | (df["year"] <= year_max)]
 
-    # Skip IDs we already labeled
-    labels_path = NORMALIZED / "labels.parquet"
-    if labels_path.exists():
-        lab = pd.read_parquet(labels_path)
+    # Skip IDs we already labeled (this is what makes a restart resume from the last checkpoint)
+    if LABELS_PATH.exists():
+        lab = pd.read_parquet(LABELS_PATH)
         have = set(lab["mal_id"].astype(int)) if "mal_id" in lab.columns else set()
         df = df[~df["mal_id"].astype(int).isin(have)]
 
@@ -44,27 +52,47 @@ def cache_path(mal_id: int) -> Path:
     return DETAILS_DIR / f"{mal_id}.json"
 
 
-def fetch_detail(client: JikanClient, mal_id: int) -> dict | None:
-    """
-    Return details payload from cache if available, falling back to the API.
-    """
+def _read_cached_detail(mal_id: int) -> dict | None:
+    payload = default_store().get(DETAILS_ENDPOINT, str(mal_id))
+    if payload is not None:
+        return payload
     cp = cache_path(mal_id)
     if cp.exists():
         try:
-            return json.loads(cp.read_text(encoding="utf-8"))
+            payload = json.loads(cp.read_text(encoding="utf-8"))
         except Exception:
-            pass  # corrupt cache; re-fetch
+            return None  # corrupt cache; re-fetch
+        _write_cached_detail(mal_id, payload)  # migrate on first read
+        return payload
+    return None
+
+
+def _write_cached_detail(mal_id: int, payload: dict) -> None:
+    default_store().put(DETAILS_ENDPOINT, str(mal_id), payload)
+
+
+async def fetch_detail_async(client: AsyncJikanClient, mal_id: int) -> dict | None:
+    """
+    Return details payload from cache if available, falling back to the API.
+    """
+    cached = await asyncio.to_thread(_read_cached_detail, mal_id)
+    if cached is not None:
+        return cached
 
     try:
-        payload = client.anime(mal_id)  # JikanClient has retries/backoff/cooldown
-        DETAILS_DIR.mkdir(parents=True, exist_ok=True)
-        cp.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        payload = await client.anime(mal_id)  # rate-limited, with retries/backoff
+        await asyncio.to_thread(_write_cached_detail, mal_id, payload)
         return payload
     except Exception as e:
         rprint(f"[yellow]skip {mal_id}: {e}[/yellow]")
         return None
 
 
+def fetch_detail(client: JikanClient, mal_id: int) -> dict | None:
+    """Blocking variant of :func:`fetch_detail_async`."""
+    return client.run(fetch_detail_async(client.aio, mal_id))
+
+
 def extract_label(payload: dict) -> dict | None:
     d = payload.get("data") or {}
     mid = d.get("mal_id")
@@ -87,49 +115,154 @@ def extract_label(payload: dict) -> dict | None:
     }
 
 
-def backfill_labels(year_min: Optional[int], year_max: Optional[int]):
+def _write_labels(lab_old: pd.DataFrame | None, rows: list[dict]) -> pd.DataFrame:
+    """Merge ``rows`` into the existing labels and atomically rewrite labels.parquet."""
+    lab_new = pd.DataFrame(rows, columns=["mal_id", "final_score", "members_detail", "favorites_detail"])
+    if lab_old is not None and not lab_old.empty:
+        lab = pd.concat([lab_old, lab_new], ignore_index=True)
+    else:
+        lab = lab_new
+    lab = lab.drop_duplicates("mal_id", keep="last").reset_index(drop=True)
+
+    LABELS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = LABELS_PATH.with_suffix(".parquet.tmp")
+    lab.to_parquet(tmp, index=False)
+    os.replace(tmp, LABELS_PATH)  # never leave a half-written labels.parquet behind
+    return lab
+
+
+async def _backfill(
+    jobs: list,
+    fetch_rows: Callable[[object], Awaitable[list[dict]]],
+    lab_old: pd.DataFrame | None,
+    workers: int,
+    checkpoint_every: int,
+) -> tuple[pd.DataFrame | None, int]:
+    """Run ``fetch_rows`` over ``jobs`` with a bounded worker pool, flushing labels every ``checkpoint_every``.
+
+    A job is a single MAL id (Jikan details) or a chunk of ids (AniList bulk
+    lookup); ``fetch_rows`` turns one job into zero or more label rows.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+    total = sum(len(job) if isinstance(job, list) else 1 for job in jobs)
+
+    new_rows: list[dict] = []
+    flushed = 0
+    done = 0
+    flush_lock = asyncio.Lock()
+    lab = lab_old
+
+    async def flush() -> None:
+        nonlocal flushed, lab
+        async with flush_lock:
+            if len(new_rows) == flushed:
+                return
+            rows = list(new_rows)
+            lab = await asyncio.to_thread(_write_labels, lab_old, rows)
+            flushed = len(rows)
+            rprint(f"[dim]  checkpoint: {len(lab)} labels in {LABELS_PATH.name}[/dim]")
+
+    async def worker() -> None:
+        nonlocal done
+        while True:
+            try:
+                job = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            new_rows.extend(await fetch_rows(job))
+            size = len(job) if isinstance(job, list) else 1
+            done += size
+            if done // 200 > (done - size) // 200:
+                rprint(f"[cyan]{done}/{total} fetched...[/cyan]")
+            if len(new_rows) - flushed >= checkpoint_every:
+                await flush()
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+    finally:
+        # Also runs on Ctrl-C / errors, so everything fetched so far is kept.
+        await flush()
+    return lab, len({r["mal_id"] for r in new_rows})
+
+
+def backfill_labels(
+    year_min: Optional[int],
+    year_max: Optional[int],
+    workers: int = DETAILS_WORKERS,
+    checkpoint_every: int = CHECKPOINT_EVERY,
+    source: str = "jikan",
+    client: Optional[AsyncJikanClient] = None,
+):
+    """Fetch final scores for unlabeled titles into labels.parquet.
+
+    ``source="jikan"`` fetches ``anime/{id}/full`` per title (MAL scores).
+    ``source="anilist"`` looks up 50 ids per ``idMal_in`` alias, batching
+    several aliases per request, which takes a few dozen requests instead of
+    thousands (but yields AniList's scores, not MAL's). ``client`` overrides
+    the default AsyncJikanClient (e.g. one backed by a replay transport).
+    """
     df = load_candidates(year_min, year_max)
     if df.empty:
         rprint("[yellow]No candidates to fetch (all labeled or none match filters).[/yellow]")
         return
 
-    rprint(f"[cyan]Fetching details for {len(df)} titles...[/cyan]")
-    client = JikanClient()
-
-    new_rows = []
-    for i, row in enumerate(df.itertuples(index=False), 1):
-        mal_id = int(row.mal_id)
-        p = fetch_detail(client, mal_id)
-        if p is None:
-            continue
-        lab = extract_label(p)
-        if lab is not None:
-            new_rows.append(lab)
-
-        if i % 200 == 0:
-            rprint(f"[cyan]{i}/{len(df)} fetched...[/cyan]")
-
-    lab_new = pd.DataFrame(new_rows).drop_duplicates("mal_id")
-
-    # Merge with existing labels (resume support)
-    labels_path = NORMALIZED / "labels.parquet"
-    if labels_path.exists():
-        lab_old = pd.read_parquet(labels_path)
-        lab = (
-            pd.concat([lab_old, lab_new], ignore_index=True)
-            .drop_duplicates("mal_id", keep="last")
-            .reset_index(drop=True)
-        )
+    client = client or AsyncJikanClient(max_concurrency=workers)
+    lab_old = pd.read_parquet(LABELS_PATH) if LABELS_PATH.exists() else None
+    mal_ids = [int(m) for m in df["mal_id"]]
+    n_cached = 0
+
+    if source == "anilist":
+        chunk = ANILIST_PER_PAGE * ANILIST_BATCH_PAGES
+        jobs: list = [mal_ids[i:i + chunk] for i in range(0, len(mal_ids), chunk)]
+        rprint(f"[cyan]Looking up {len(df)} titles on AniList ({len(jobs)} batched requests)...[/cyan]")
+
+        async def fetch_rows(ids) -> list[dict]:
+            try:
+                return await client.anilist_labels(ids)
+            except Exception as e:
+                rprint(f"[yellow]skip AniList batch of {len(ids)}: {e}[/yellow]")
+                return []
     else:
-        lab = lab_new
+        # One indexed read for everything already in the raw store; only misses hit the API.
+        cached = default_store().get_many(DETAILS_ENDPOINT, [str(m) for m in mal_ids])
+        cached_rows = [r for r in (extract_label(p) for p in cached.values()) if r is not None]
+        if cached_rows:
+            lab_old = _write_labels(lab_old, cached_rows)
+            n_cached = len(cached_rows)
+            rprint(f"[dim]  {len(cached_rows)} labels from cached details[/dim]")
+        jobs = [m for m in mal_ids if str(m) not in cached]
+        rprint(f"[cyan]Fetching details for {len(jobs)} titles ({workers} workers)...[/cyan]")
 
-    lab.to_parquet(labels_path, index=False)
-    rprint(f"[green]Wrote labels -> {labels_path} ({len(lab)} rows total; +{len(lab_new)} new)[/green]")
+        async def fetch_rows(mal_id) -> list[dict]:
+            p = await fetch_detail_async(client, mal_id)
+            lab_row = extract_label(p) if p is not None else None
+            return [lab_row] if lab_row is not None else []
+
+    lab, n_new = asyncio.run(_backfill(jobs, fetch_rows, lab_old, workers, checkpoint_every))
+    if lab is None:
+        rprint("[yellow]No labels fetched.[/yellow]")
+        return
+    rprint(f"[green]Wrote labels -> {LABELS_PATH} ({len(lab)} rows total; +{n_new + n_cached} new)[/green]")
 
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--year-min", type=int, default=None, help="Only fetch anime with year >= this (if available)")
     ap.add_argument("--year-max", type=int, default=None, help="Only fetch anime with year <= this (if available)")
+    ap.add_argument("--workers", type=int, default=DETAILS_WORKERS, help="Concurrent detail fetches")
+    ap.add_argument(
+        "--checkpoint-every", type=int, default=CHECKPOINT_EVERY,
+        help="Flush labels.parquet after this many new labels",
+    )
+    ap.add_argument(
+        "--source", choices=["jikan", "anilist"], default="jikan",
+        help="jikan: one anime/{id}/full call per title (MAL scores); "
+             "anilist: batched idMal_in lookups, 50 ids per alias (AniList scores)",
+    )
     args = ap.parse_args()
-    backfill_labels(args.year_min, args.year_max)
+    backfill_labels(
+        args.year_min, args.year_max,
+        workers=args.workers, checkpoint_every=args.checkpoint_every, source=args.source,
+    )
@@ -0,0 +1,236 @@
+"""Persistent HTTP response cache for the Jikan/AniList clients.
+
+Responses are stored in a single SQLite file keyed on a hash of the request
+(method + URL + params, or the GraphQL body for AniList). Each entry keeps the
+server's ``ETag``/``Last-Modified`` validators and an expiry derived from a
+per-endpoint TTL: finished seasons rarely change, airing seasons and the
+upcoming list do. Fresh entries are served without touching the network; stale
+ones are revalidated with a conditional request, so an unchanged payload costs
+a 304 instead of a full download. Entries are evicted by age and total size.
+
+Usage:
+    python -m src.mal.cache            # show cache stats
+    python -m src.mal.cache --evict    # apply the age/size limits now
+    python -m src.mal.cache --clear    # drop every entry
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from rich import print as rprint
+
+from ..utils.io import RAW
+
+HTTP_CACHE_PATH = RAW / "http_cache.sqlite"
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE", "on").lower() not in {"0", "off", "false", "no"}
+HTTP_CACHE_MAX_MB = float(os.getenv("HTTP_CACHE_MAX_MB", 512))
+HTTP_CACHE_MAX_AGE_DAYS = float(os.getenv("HTTP_CACHE_MAX_AGE_DAYS", 90))
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+SEASON_START_MONTH = {"winter": 1, "spring": 4, "summer": 7, "fall": 10}
+_SEASON_PATH = re.compile(r"/seasons/(\d{4})/(winter|spring|summer|fall)\b")
+
+
+def season_ttl(year: int, season: str) -> float:
+    """Long TTL once a season has finished airing (~4 months after it starts)."""
+    start = date(year, SEASON_START_MONTH[season], 1)
+    if (date.today() - start).days > 120:
+        return 30 * DAY
+    return 12 * HOUR
+
+
+def ttl_for(url: str, body: Optional[Dict[str, Any]] = None) -> float:
+    """Per-endpoint time-to-live (seconds) for a cached response."""
+    if body is not None:
+        variables = body.get("variables") or {}
+        year, season = variables.get("seasonYear"), str(variables.get("season") or "").lower()
+        if year and season in SEASON_START_MONTH:
+            return season_ttl(int(year), season)
+        return DAY
+    if "/seasons/upcoming" in url:
+        return 6 * HOUR
+    m = _SEASON_PATH.search(url)
+    if m:
+        return season_ttl(int(m.group(1)), m.group(2))
+    if "/anime/" in url:
+        return 7 * DAY  # scores/members drift slowly
+    return DAY
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """Headers for a conditional request revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class ResponseCache:
+    """SQLite-backed response store with TTLs, validators, and size/age eviction."""
+
+    def __init__(
+        self,
+        path: Path = HTTP_CACHE_PATH,
+        max_bytes: float = HTTP_CACHE_MAX_MB * 1024 * 1024,
+        max_age: float = HTTP_CACHE_MAX_AGE_DAYS * DAY,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self.evict()
+
+    @staticmethod
+    def key_for(
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        blob = json.dumps([method.upper(), url, params or {}, body], sort_keys=True, default=str)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        body, etag, last_modified, expires_at = row
+        return CachedResponse(zlib.decompress(body), etag, last_modified, expires_at)
+
+    def store(
+        self,
+        key: str,
+        url: str,
+        body: bytes,
+        ttl: float,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        now = time.time()
+        packed = zlib.compress(body, 6)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, packed, etag, last_modified, now, now + ttl, now, len(packed)),
+            )
+            self._conn.commit()
+
+    def refresh(self, key: str, ttl: float) -> None:
+        """Extend an entry's expiry after the server answered 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ?, expires_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now + ttl, now, key),
+            )
+            self._conn.commit()
+
+    def evict(self) -> int:
+        """Drop entries older than ``max_age``, then least-recently-used ones over ``max_bytes``."""
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - self.max_age,))
+            removed = cur.rowcount
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+                doomed = []
+                for key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    doomed.append((key,))
+                    total -= size
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+                removed += len(doomed)
+            self._conn.commit()
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            n, size, fresh = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(expires_at > ?), 0) FROM responses",
+                (time.time(),),
+            ).fetchone()
+        return {"entries": n, "bytes": size, "fresh": fresh}
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def default_cache() -> Optional[ResponseCache]:
+    """The on-disk cache, or None when disabled via ``HTTP_CACHE=off``."""
+    return ResponseCache() if HTTP_CACHE_ENABLED else None
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Inspect or prune the HTTP response cache.")
+    ap.add_argument("--evict", action="store_true", help="Apply the age/size limits now")
+    ap.add_argument("--clear", action="store_true", help="Remove every cached response")
+    args = ap.parse_args()
+
+    cache = ResponseCache()
+    if args.clear:
+        cache.clear()
+    elif args.evict:
+        rprint(f"[green]Evicted {cache.evict()} entries.[/green]")
+    s = cache.stats()
+    rprint(
+        f"[cyan]{HTTP_CACHE_PATH}: {s['entries']} entries ({s['fresh']} fresh), "
+        f"{s['bytes'] / 1024 / 1024:.1f} MB[/cyan]"
+    )
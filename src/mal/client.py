@@ -1,14 +1,104 @@
 from __future__ import annotations
+import asyncio
 import os
 import time
-from typing import Any, Dict, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import requests
 from pydantic import BaseModel
+from requests.adapters import BaseAdapter
+
+from .cache import ResponseCache, default_cache, season_ttl, ttl_for
+from .ratelimit import RateLimiter, TokenBucket
+from .replay import Cassette, RecordingAdapter
 
 JIKAN_BASE = "https://api.jikan.moe/v4"
 ANILIST_BASE = "https://graphql.anilist.co"
+# Base unit (seconds) for retry backoff after 429/5xx responses.
 COOLDOWN = float(os.getenv("JIKAN_COOLDOWN", 1.2))
+# Jikan's published quotas. AniList allows 90/min but has been running degraded at 30/min.
+JIKAN_RATE_PER_SECOND = float(os.getenv("JIKAN_RATE_PER_SECOND", 3))
+JIKAN_RATE_PER_MINUTE = float(os.getenv("JIKAN_RATE_PER_MINUTE", 60))
+ANILIST_RATE_PER_MINUTE = float(os.getenv("ANILIST_RATE_PER_MINUTE", 30))
+# Max requests in flight at once (the limiter still decides when each may start).
+MAX_CONCURRENCY = int(os.getenv("JIKAN_CONCURRENCY", 4))
+# Append every HTTP exchange to this cassette (JSONL) for offline replay.
+JIKAN_RECORD = os.getenv("JIKAN_RECORD") or None
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Process-wide limiters so every client instance shares the same quota.
+JIKAN_LIMITER = RateLimiter(
+    TokenBucket(JIKAN_RATE_PER_SECOND),
+    TokenBucket(JIKAN_RATE_PER_MINUTE, per=60.0),
+)
+ANILIST_LIMITER = RateLimiter(
+    TokenBucket(1.0),
+    TokenBucket(ANILIST_RATE_PER_MINUTE, per=60.0),
+)
+
+# Page aliases per AniList request when batching (AniList caps query complexity).
+ANILIST_BATCH_PAGES = int(os.getenv("ANILIST_BATCH_PAGES", 3))
+ANILIST_PER_PAGE = 50
+
+ANILIST_MEDIA_FIELDS = """
+      id
+      idMal
+      title {
+        romaji
+        english
+      }
+      format
+      episodes
+      duration
+      source
+      description(asHtml: false)
+      popularity
+      favourites
+      averageScore
+      meanScore
+      status
+      season
+      seasonYear
+      coverImage { extraLarge large medium color }
+      studios(isMain: true) { nodes { name } }
+      genres
+      tags { name rank }
+      countryOfOrigin
+"""
+
+ANILIST_LABEL_FIELDS = """
+      idMal
+      averageScore
+      popularity
+      favourites
+"""
+
+ANILIST_SEASONS = {"winter", "spring", "summer", "fall"}
+
+
+def _anilist_season_page(alias: str, year: int, season: str, page: int) -> str:
+    """One aliased ``Page`` selection of a season (values are inlined; all are validated ints/enums)."""
+    if season not in ANILIST_SEASONS:
+        raise ValueError(f"Unknown season: {season!r}")
+    return (
+        f"  {alias}: Page(page: {int(page)}, perPage: {ANILIST_PER_PAGE}) {{\n"
+        f"    pageInfo {{ hasNextPage }}\n"
+        f"    media(type: ANIME, seasonYear: {int(year)}, season: {season.upper()}, sort: POPULARITY_DESC) {{"
+        f"{ANILIST_MEDIA_FIELDS}    }}\n"
+        f"  }}"
+    )
+
+
+def _anilist_ids_page(alias: str, mal_ids: List[int]) -> str:
+    """One aliased ``Page`` selection looking up up to 50 titles by MAL id."""
+    ids = ", ".join(str(int(i)) for i in mal_ids)
+    return (
+        f"  {alias}: Page(page: 1, perPage: {ANILIST_PER_PAGE}) {{\n"
+        f"    media(type: ANIME, idMal_in: [{ids}]) {{{ANILIST_LABEL_FIELDS}    }}\n"
+        f"  }}"
+    )
 
 
 def pick_image_url(images: Optional[Dict[str, Any]]) -> Optional[str]:
@@ -26,44 +116,140 @@ def pick_image_url(images: Optional[Dict[str, Any]]) -> Optional[str]:
     )
 
 
-class JikanClient:
-    """Client for Jikan (MyAnimeList) with AniList GraphQL fallback.
+def _retry_wait(response: requests.Response, wait: float) -> float:
+    """Honour a numeric ``Retry-After`` header if it asks for a longer wait."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            wait = max(wait, float(retry_after))
+        except ValueError:
+            pass
+    return wait
+
+
+@dataclass
+class ClientStats:
+    """Counters for benchmarking: requests sent, retries, and where time went."""
+
+    requests: int = 0
+    retries: int = 0
+    io_seconds: float = 0.0       # waiting on HTTP responses
+    backoff_seconds: float = 0.0  # limiter pauses requested after 429/5xx
+
+
+class AsyncJikanClient:
+    """asyncio client for Jikan (MyAnimeList) with AniList GraphQL fallback.
 
     Jikan is preferred (it is the canonical MAL source). When a Jikan season
-    request fails (MAL upstream issues, 429/5xx), we transparently fall back to
-    AniList, which also exposes cover images and the same core metadata.
+    request fails (MAL upstream issues, 429/5xx), callers fall back to AniList,
+    which also exposes cover images and the same core metadata.
+
+    Instead of sleeping a fixed cooldown after every call, each request takes a
+    slot from a shared token-bucket limiter, so pages and seasons can be in
+    flight concurrently up to the API quota. HTTP calls run on worker threads
+    through a pooled ``requests.Session``.
+
+    Responses go through a persistent :class:`ResponseCache` (pass
+    ``cache=False`` or set ``HTTP_CACHE=off`` to bypass it): fresh entries are
+    returned without a request, stale Jikan entries are revalidated with
+    ``If-None-Match``/``If-Modified-Since``.
+
+    ``transport`` mounts a custom requests adapter (e.g. a
+    :class:`~src.mal.replay.ReplayAdapter`); ``record`` (or ``JIKAN_RECORD``)
+    appends every exchange to a cassette and bypasses the response cache so
+    the cassette is complete.
     """
 
-    def __init__(self, base: str = JIKAN_BASE, cooldown: float = COOLDOWN):
+    def __init__(
+        self,
+        base: str = JIKAN_BASE,
+        cooldown: float = COOLDOWN,
+        max_concurrency: int = MAX_CONCURRENCY,
+        jikan_limiter: RateLimiter | None = None,
+        anilist_limiter: RateLimiter | None = None,
+        cache: ResponseCache | bool = True,
+        transport: BaseAdapter | None = None,
+        record: str | os.PathLike | None = JIKAN_RECORD,
+    ):
         self.base = base.rstrip("/")
         self.cooldown = cooldown
+        self.max_concurrency = max(1, max_concurrency)
+        self.jikan_limiter = jikan_limiter or JIKAN_LIMITER
+        self.anilist_limiter = anilist_limiter or ANILIST_LIMITER
         self.session = requests.Session()
+        pool_size = max(10, self.max_concurrency)
+        if transport is not None:
+            adapter = transport
+        elif record:
+            adapter = RecordingAdapter(Cassette(record), pool_maxsize=pool_size)
+            cache = False
+        else:
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update(
             {"User-Agent": "mal-anime-score-predictor/1.0 (+https://github.com/yoonalexander/mal-anime-score-predictor)"}
         )
+        self.cache: ResponseCache | None = default_cache() if cache is True else (cache or None)
+        self.stats = ClientStats()
+        self._slots: tuple[asyncio.AbstractEventLoop, asyncio.Semaphore] | None = None
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # One semaphore per event loop, so the client can be reused across asyncio.run() calls.
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots[0] is not loop:
+            self._slots = (loop, asyncio.Semaphore(self.max_concurrency))
+        return self._slots[1]
+
+    def _backoff(self, limiter: RateLimiter, wait: float) -> None:
+        # Pausing the shared limiter holds back every other in-flight caller too.
+        self.stats.retries += 1
+        self.stats.backoff_seconds += wait
+        limiter.pause(wait)
+
+    async def _send(self, limiter: RateLimiter, method: str, url: str, **kwargs) -> requests.Response:
+        async with self._semaphore():
+            await limiter.acquire()
+            started = time.perf_counter()
+            try:
+                return await asyncio.to_thread(self.session.request, method, url, timeout=30, **kwargs)
+            finally:
+                self.stats.requests += 1
+                self.stats.io_seconds += time.perf_counter() - started
 
-    def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         url = f"{self.base}/{path.lstrip('/')}"
+        key = ResponseCache.key_for("GET", url, params) if self.cache else None
+        cached = self.cache.lookup(key) if key else None
+        if cached is not None and cached.fresh:
+            return cached.json()
+        headers = cached.validators() if cached is not None else {}
+        ttl = ttl_for(url)
+
         last_error: requests.HTTPError | None = None
-        for attempt in range(4):
-            r = self.session.get(url, params=params, timeout=30)
-            if r.status_code not in {429, 500, 502, 503, 504}:
+        attempts = 4
+        for attempt in range(attempts):
+            r = await self._send(self.jikan_limiter, "GET", url, params=params, headers=headers)
+            if r.status_code == 304 and cached is not None:
+                self.cache.refresh(key, ttl)
+                return cached.json()
+            if r.status_code not in RETRY_STATUSES:
                 r.raise_for_status()
-                time.sleep(self.cooldown)
+                if key:
+                    self.cache.store(
+                        key, url, r.content, ttl,
+                        etag=r.headers.get("ETag"), last_modified=r.headers.get("Last-Modified"),
+                    )
                 return r.json()
 
             last_error = requests.HTTPError(f"{r.status_code} Server Error for url: {r.url}", response=r)
+            if attempt == attempts - 1:
+                break  # out of retries: raise now rather than pause every other caller first
             # 504 from Jikan usually means MAL is unreachable upstream; back off harder.
             wait = self.cooldown * (2 ** attempt)
             if r.status_code in {502, 503, 504}:
                 wait = max(wait, 5.0 * (attempt + 1))
-            retry_after = r.headers.get("Retry-After")
-            if retry_after:
-                try:
-                    wait = max(wait, float(retry_after))
-                except ValueError:
-                    pass
-            time.sleep(wait)
+            self._backoff(self.jikan_limiter, _retry_wait(r, wait))
 
         if last_error is not None:
             raise last_error
@@ -72,93 +258,154 @@ class JikanClient:
     # ------------------------------------------------------------------
     # Seasons (historical + upcoming)
     # ------------------------------------------------------------------
-    def season(self, year: int, season: str) -> Dict[str, Any]:
-        return self.get(f"seasons/{year}/{season}")
+    async def season(self, year: int, season: str) -> Dict[str, Any]:
+        return await self.get(f"seasons/{year}/{season}")
 
-    def season_all(self, year: int, season: str) -> Dict[str, Any]:
-        """Fetch every page of a Jikan season response."""
-        first = self.season(year, season)
+    async def season_all(self, year: int, season: str) -> Dict[str, Any]:
+        """Fetch every page of a Jikan season response (pages 2..N concurrently)."""
+        first = await self.season(year, season)
         data = list(first.get("data") or [])
         last_page = int((first.get("pagination") or {}).get("last_visible_page") or 1)
 
-        for page in range(2, last_page + 1):
-            payload = self.get(f"seasons/{year}/{season}", params={"page": page})
+        pages = await asyncio.gather(
+            *(self.get(f"seasons/{year}/{season}", params={"page": page}) for page in range(2, last_page + 1))
+        )
+        for payload in pages:
             data.extend(payload.get("data") or [])
 
         first["data"] = data
         return first
 
-    def anilist_season_all(self, year: int, season: str) -> Dict[str, Any]:
+    async def anilist_season_all(self, year: int, season: str) -> Dict[str, Any]:
         """Fetch an entire season from AniList, paginated, with cover images."""
-        query = """
-        query ($seasonYear: Int!, $season: MediaSeason!, $page: Int!) {
-          Page(page: $page, perPage: 50) {
-            pageInfo {
-              hasNextPage
-            }
-            media(type: ANIME, seasonYear: $seasonYear, season: $season, sort: POPULARITY_DESC) {
-              id
-              idMal
-              title {
-                romaji
-                english
-              }
-              format
-              episodes
-              duration
-              source
-              description(asHtml: false)
-              popularity
-              favourites
-              averageScore
-              meanScore
-              status
-              season
-              seasonYear
-              coverImage { extraLarge large medium color }
-              studios(isMain: true) { nodes { name } }
-              genres
-              tags { name rank }
-              countryOfOrigin
-            }
-          }
-        }
+        return (await self.anilist_seasons_all([(year, season)]))[(year, season.lower())]
+
+    async def anilist_seasons_all(
+        self,
+        seasons: Iterable[Tuple[int, str]],
+        pages_per_request: int = ANILIST_BATCH_PAGES,
+    ) -> Dict[Tuple[int, str], Dict[str, Any]]:
+        """Fetch several AniList seasons, batching pages into aliased GraphQL requests.
+
+        Each request carries up to ``pages_per_request`` ``Page`` aliases, which
+        may belong to different seasons. Pages are requested speculatively in
+        rounds until every season reports ``hasNextPage: false``; pages past the
+        end just come back empty. Returns ``{(year, season): payload}`` with
+        Jikan-shaped items, like :meth:`anilist_season_all`.
         """
-        variables = {"seasonYear": year, "season": season.upper(), "page": 1}
-        data: list[dict[str, Any]] = []
+        wanted = list(dict.fromkeys((int(y), s.lower()) for y, s in seasons))
+        pages: Dict[Tuple[int, str], Dict[int, list]] = {key: {} for key in wanted}
+        last_page: Dict[Tuple[int, str], int] = {}
+        per_request = max(1, pages_per_request)
 
         while True:
-            response = self._post_anilist({"query": query, "variables": variables})
-            payload = response.json()["data"]["Page"]
-            data.extend(self._anilist_to_jikan_item(item, year, season) for item in payload["media"])
-
-            if not payload["pageInfo"]["hasNextPage"]:
+            todo = []
+            for key in wanted:
+                if key in last_page:
+                    continue
+                nxt = max(pages[key], default=0) + 1
+                # With few seasons outstanding, look further ahead in each one.
+                ahead = max(1, -(-per_request // max(1, len(wanted) - len(last_page))))
+                todo.extend((key, page) for page in range(nxt, nxt + ahead))
+            if not todo:
                 break
 
-            variables["page"] += 1
-            time.sleep(max(self.cooldown, 2.0))
-
-        return {"data": data, "pagination": {"source": "anilist"}}
+            batches = [todo[i:i + per_request] for i in range(0, len(todo), per_request)]
+            # Seasons are inlined into the query text, so the TTL comes from the batch's
+            # seasons: the shortest one, so an airing season is never served stale.
+            responses = await asyncio.gather(*(self._post_anilist_batch(
+                {f"p{i}": _anilist_season_page(f"p{i}", y, s, page) for i, ((y, s), page) in enumerate(batch)},
+                ttl=min(season_ttl(y, s) for (y, s), _ in batch),
+            ) for batch in batches))
+
+            for batch, response in zip(batches, responses):
+                for i, (key, page) in enumerate(batch):
+                    node = response[f"p{i}"]
+                    pages[key][page] = node["media"]
+                    if not node["pageInfo"]["hasNextPage"]:
+                        last_page[key] = min(last_page.get(key, page), page)
+
+        out: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        for (year, season) in wanted:
+            data: list[dict[str, Any]] = []
+            for page in sorted(p for p in pages[(year, season)] if p <= last_page[(year, season)]):
+                data.extend(self._anilist_to_jikan_item(item, year, season) for item in pages[(year, season)][page])
+            out[(year, season)] = {"data": data, "pagination": {"source": "anilist"}}
+        return out
+
+    async def anilist_labels(
+        self,
+        mal_ids: Iterable[int],
+        pages_per_request: int = ANILIST_BATCH_PAGES,
+    ) -> List[Dict[str, Any]]:
+        """Bulk score lookup via ``idMal_in``: 50 MAL ids per alias, several aliases per request.
+
+        Returns rows shaped like ``ingest_details.extract_label`` output. Ids
+        AniList does not know are simply absent from the result. Note these are
+        AniList scores/popularity, not MAL's.
+        """
+        ids = list(dict.fromkeys(int(i) for i in mal_ids))
+        chunks = [ids[i:i + ANILIST_PER_PAGE] for i in range(0, len(ids), ANILIST_PER_PAGE)]
+        per_request = max(1, pages_per_request)
+        batches = [chunks[i:i + per_request] for i in range(0, len(chunks), per_request)]
+        responses = await asyncio.gather(*(self._post_anilist_batch(
+            {f"ids{i}": _anilist_ids_page(f"ids{i}", chunk) for i, chunk in enumerate(batch)}
+        ) for batch in batches))
+
+        rows: Dict[int, Dict[str, Any]] = {}
+        for response in responses:
+            for node in response.values():
+                for item in node["media"]:
+                    mid = item.get("idMal")
+                    if mid is None:
+                        continue
+                    score = item.get("averageScore")
+                    rows[int(mid)] = {
+                        "mal_id": int(mid),
+                        "final_score": score / 10 if score is not None else None,
+                        "members_detail": item.get("popularity"),
+                        "favorites_detail": item.get("favourites"),
+                    }
+        return list(rows.values())
+
+    async def _post_anilist_batch(self, selections: Dict[str, str], ttl: Optional[float] = None) -> Dict[str, Any]:
+        """Send aliased selections as one query and return ``data`` keyed by alias."""
+        query = "query {\n" + "\n".join(selections.values()) + "\n}"
+        response = await self._post_anilist({"query": query}, ttl=ttl)
+        data = response.get("data") or {}
+        missing = [alias for alias in selections if data.get(alias) is None]
+        if missing:
+            errors = response.get("errors") or []
+            detail = errors[0].get("message") if errors else "no data"
+            raise RuntimeError(f"AniList batch query failed for {len(missing)} alias(es): {detail}")
+        return data
+
+    async def _post_anilist(self, body: Dict[str, Any], ttl: Optional[float] = None) -> Dict[str, Any]:
+        """POST a GraphQL body to AniList and return the decoded JSON.
+
+        AniList does not support conditional requests, so cached entries are
+        served purely on TTL (keyed on a hash of the query + variables). ``ttl``
+        overrides the one ``ttl_for`` derives from the body's variables.
+        """
+        key = ResponseCache.key_for("POST", ANILIST_BASE, body=body) if self.cache else None
+        cached = self.cache.lookup(key) if key else None
+        if cached is not None and cached.fresh:
+            return cached.json()
 
-    def _post_anilist(self, body: Dict[str, Any]) -> requests.Response:
         last_error: requests.HTTPError | None = None
-
-        for attempt in range(6):
-            response = self.session.post(ANILIST_BASE, json=body, timeout=30)
+        attempts = 6
+        for attempt in range(attempts):
+            response = await self._send(self.anilist_limiter, "POST", ANILIST_BASE, json=body)
             if response.status_code != 429:
                 response.raise_for_status()
-                time.sleep(max(self.cooldown, 2.0))
-                return response
+                if key:
+                    self.cache.store(key, ANILIST_BASE, response.content, ttl if ttl is not None else ttl_for(ANILIST_BASE, body))
+                return response.json()
 
             last_error = requests.HTTPError(f"429 Client Error for url: {response.url}", response=response)
-            retry_after = response.headers.get("Retry-After")
-            wait = 30.0 * (attempt + 1)
-            if retry_after:
-                try:
-                    wait = max(wait, float(retry_after))
-                except ValueError:
-                    pass
-            time.sleep(wait)
+            if attempt == attempts - 1:
+                break
+            self._backoff(self.anilist_limiter, _retry_wait(response, 30.0 * (attempt + 1)))
 
         if last_error is not None:
             raise last_error
@@ -211,10 +458,10 @@ class JikanClient:
     # ------------------------------------------------------------------
     # Upcoming season list
     # ------------------------------------------------------------------
-    def seasons_upcoming(self) -> Dict[str, Any]:
-        return self.get("seasons/upcoming")
+    async def seasons_upcoming(self) -> Dict[str, Any]:
+        return await self.get("seasons/upcoming")
 
-    def anilist_upcoming(self) -> Dict[str, Any]:
+    async def anilist_upcoming(self) -> Dict[str, Any]:
         """Best-effort AniList fallback for the 'upcoming' schedule.
 
         AniList has no single 'upcoming' endpoint, so we query the next two
@@ -231,12 +478,13 @@ class JikanClient:
         y2 = y1 + (1 if (idx + 1) >= 4 else 0)
 
         data: list[dict[str, Any]] = []
-        for y, s in [(y1, s1), (y2, s2)]:
-            try:
-                payload = self.anilist_season_all(y, s)
+        # Each season on its own, so one failing season does not lose the other.
+        payloads = await asyncio.gather(
+            self.anilist_season_all(y1, s1), self.anilist_season_all(y2, s2), return_exceptions=True,
+        )
+        for payload in payloads:
+            if not isinstance(payload, BaseException):
                 data.extend(payload.get("data") or [])
-            except Exception:
-                continue
         # Dedup by mal_id
         seen = set()
         unique = []
@@ -251,8 +499,71 @@ class JikanClient:
     # ------------------------------------------------------------------
     # Anime details (used for label backfill)
     # ------------------------------------------------------------------
+    async def anime(self, mal_id: int) -> Dict[str, Any]:
+        return await self.get(f"anime/{mal_id}/full")
+
+
+class JikanClient:
+    """Synchronous facade over :class:`AsyncJikanClient`.
+
+    Keeps the original blocking API for scripts like ``ingest.py``. Each call
+    runs the async implementation to completion on a private event loop, so
+    the token-bucket limiter (shared process-wide) still applies. Use
+    :meth:`run` to drive several coroutines of ``self.aio`` concurrently.
+    """
+
+    def __init__(self, base: str = JIKAN_BASE, cooldown: float = COOLDOWN, **kwargs):
+        self.aio = AsyncJikanClient(base, cooldown, **kwargs)
+        self._loop = asyncio.new_event_loop()
+
+    @property
+    def base(self) -> str:
+        return self.aio.base
+
+    @property
+    def cooldown(self) -> float:
+        return self.aio.cooldown
+
+    @property
+    def session(self) -> requests.Session:
+        return self.aio.session
+
+    def run(self, coro):
+        """Run a coroutine (typically built from ``self.aio``) to completion."""
+        return self._loop.run_until_complete(coro)
+
+    def close(self) -> None:
+        self._loop.close()
+        self.aio.session.close()
+
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return self.run(self.aio.get(path, params))
+
+    def season(self, year: int, season: str) -> Dict[str, Any]:
+        return self.run(self.aio.season(year, season))
+
+    def season_all(self, year: int, season: str) -> Dict[str, Any]:
+        return self.run(self.aio.season_all(year, season))
+
+    def anilist_season_all(self, year: int, season: str) -> Dict[str, Any]:
+        return self.run(self.aio.anilist_season_all(year, season))
+
+    def anilist_seasons_all(self, seasons: Iterable[Tuple[int, str]]) -> Dict[Tuple[int, str], Dict[str, Any]]:
+        return self.run(self.aio.anilist_seasons_all(seasons))
+
+    def anilist_labels(self, mal_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        return self.run(self.aio.anilist_labels(mal_ids))
+
+    def seasons_upcoming(self) -> Dict[str, Any]:
+        return self.run(self.aio.seasons_upcoming())
+
+    def anilist_upcoming(self) -> Dict[str, Any]:
+        return self.run(self.aio.anilist_upcoming())
+
     def anime(self, mal_id: int) -> Dict[str, Any]:
-        return self.get(f"anime/{mal_id}/full")
+        return self.run(self.aio.anime(mal_id))
+
+    _anilist_to_jikan_item = staticmethod(AsyncJikanClient._anilist_to_jikan_item)
 
 
 # Simple pydantic models (subset) for validation/normalization
@@ -0,0 +1,76 @@
+"""Token-bucket rate limiting shared by the Jikan/AniList clients.
+
+Jikan publishes two quotas (3 requests/second and 60 requests/minute), so a
+limiter is a set of buckets and a request may only go out once *every* bucket
+has a token. Slots are handed out by reservation: ``reserve()`` books the
+earliest instant all buckets allow and returns how long the caller has to wait,
+so concurrent callers queue up behind each other instead of all waking at once.
+
+The bookkeeping is guarded by a ``threading.Lock`` (not an asyncio lock), which
+keeps a limiter usable from several event loops/threads in the same process.
+"""
+from __future__ import annotations
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """``rate`` tokens every ``per`` seconds, holding at most ``capacity``."""
+
+    def __init__(self, rate: float, per: float = 1.0, capacity: float | None = None):
+        if rate <= 0 or per <= 0:
+            raise ValueError("rate and per must be positive")
+        self.rate = rate / per  # tokens per second
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self.stamp = time.monotonic()
+
+    def _level(self, t: float) -> float:
+        return min(self.capacity, self.tokens + (t - self.stamp) * self.rate)
+
+    def ready_at(self, now: float) -> float:
+        """Earliest monotonic time at which one token is available."""
+        t = max(now, self.stamp)
+        level = self._level(t)
+        if level >= 1.0:
+            return t
+        return t + (1.0 - level) / self.rate
+
+    def take(self, t: float) -> None:
+        """Consume one token at time ``t`` (``t`` must be >= ``ready_at``)."""
+        t = max(t, self.stamp)
+        self.tokens = self._level(t) - 1.0
+        self.stamp = t
+
+
+class RateLimiter:
+    """A group of token buckets that must all admit a request."""
+
+    def __init__(self, *buckets: TokenBucket):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        # Total seconds callers were told to wait (useful for benchmarking).
+        self.waited = 0.0
+
+    def reserve(self) -> float:
+        """Book the next free slot and return the delay (seconds) until it."""
+        with self._lock:
+            now = time.monotonic()
+            t = max([now, self._paused_until] + [b.ready_at(now) for b in self.buckets])
+            for b in self.buckets:
+                b.take(t)
+            delay = t - now
+            self.waited += delay
+            return delay
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request not yet reserved for ``seconds`` (e.g. a 429)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
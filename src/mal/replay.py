@@ -0,0 +1,171 @@
+"""Record/replay transports for benchmarking ingest without the live APIs.
+
+A cassette is a JSONL file with one request/response pair per line: method,
+URL (with query string), a hash of the request body (AniList POSTs), status
+code, the headers that matter to the client (``Retry-After``, ``ETag``,
+``Last-Modified``, ``Content-Type``), and the response body.
+
+- :class:`RecordingAdapter` is a normal ``HTTPAdapter`` that appends every
+  exchange to a cassette. ``AsyncJikanClient`` mounts it when
+  ``JIKAN_RECORD=<path>`` is set (or ``record=`` is passed).
+- :class:`ReplayAdapter` serves a cassette back in-process, with configurable
+  latency and injected 429/5xx failures, so throughput and retry behaviour can
+  be measured offline (see ``src/bench_ingest.py``).
+"""
+from __future__ import annotations
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+KEPT_HEADERS = ("Retry-After", "ETag", "Last-Modified", "Content-Type")
+_SEASON_URL = re.compile(r"/seasons/(\d{4})/(winter|spring|summer|fall)\b")
+
+
+def _body_hash(body) -> Optional[str]:
+    if body is None:
+        return None
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return hashlib.sha256(body).hexdigest()
+
+
+def _key(method: str, url: str, body_sha: Optional[str]) -> Tuple[str, str, Optional[str]]:
+    return method.upper(), url, body_sha
+
+
+class Cassette:
+    """Ordered request/response pairs persisted as JSONL."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.interactions: Dict[Tuple[str, str, Optional[str]], List[dict]] = defaultdict(list)
+        if self.path.exists():
+            with self.path.open(encoding="utf-8") as fh:
+                for line in fh:
+                    if line.strip():
+                        rec = json.loads(line)
+                        self.interactions[_key(rec["method"], rec["url"], rec.get("body_sha"))].append(rec)
+
+    def append(self, request: requests.PreparedRequest, response: requests.Response) -> None:
+        rec = {
+            "method": request.method,
+            "url": request.url,
+            "body_sha": _body_hash(request.body),
+            "status": response.status_code,
+            "headers": {h: response.headers[h] for h in KEPT_HEADERS if h in response.headers},
+            "body": response.content.decode(response.encoding or "utf-8", errors="replace"),
+            "elapsed": response.elapsed.total_seconds() if response.elapsed else None,
+        }
+        with self._lock:
+            self.interactions[_key(rec["method"], rec["url"], rec["body_sha"])].append(rec)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+    def seasons(self) -> List[Tuple[int, str]]:
+        """(year, season) pairs whose Jikan season pages were recorded."""
+        found = set()
+        for _, url, _ in self.interactions:
+            m = _SEASON_URL.search(url)
+            if m:
+                found.add((int(m.group(1)), m.group(2)))
+        return sorted(found)
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self.interactions.values())
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Pass-through adapter that appends every exchange to a cassette."""
+
+    def __init__(self, cassette: Cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        self.cassette.append(request, response)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Serve a cassette back with simulated latency and injected failures.
+
+    Repeated requests for the same key replay the recorded responses in order
+    (e.g. a recorded 429 followed by the 200), then keep serving the last one.
+    Unknown requests get a 404 so gaps in the cassette surface as errors.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        fail_rate: float = 0.0,
+        fail_status: int = 429,
+        retry_after: Optional[float] = 1.0,
+        seed: Optional[int] = 0,
+    ):
+        super().__init__()
+        self.cassette = cassette
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._cursor: Dict[Tuple[str, str, Optional[str]], int] = defaultdict(int)
+        self.requests = 0
+        self.injected_failures = 0
+        self.misses = 0
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.requests += 1
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            fail = self._rng.random() < self.fail_rate
+            key = _key(request.method, request.url, _body_hash(request.body))
+            recs = self.cassette.interactions.get(key)
+            rec = None
+            if not fail and recs:
+                rec = recs[min(self._cursor[key], len(recs) - 1)]
+                self._cursor[key] += 1
+            if fail:
+                self.injected_failures += 1
+            elif rec is None:
+                self.misses += 1
+        time.sleep(delay)
+
+        if fail:
+            headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else {}
+            return self._response(request, self.fail_status, headers, '{"error": "injected failure"}')
+        if rec is None:
+            return self._response(request, 404, {}, '{"error": "not in cassette"}')
+        return self._response(request, rec["status"], rec.get("headers") or {}, rec.get("body") or "")
+
+    @staticmethod
+    def _response(request, status: int, headers: dict, body: str) -> requests.Response:
+        r = requests.Response()
+        r.status_code = status
+        r.headers = CaseInsensitiveDict(headers)
+        r._content = body.encode("utf-8")
+        r.encoding = "utf-8"
+        r.url = request.url
+        r.request = request
+        r.reason = "Replay"
+        return r
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,131 @@
+"""Model artifact: one joblib file plus a small versioned manifest.
+
+``save_model`` writes ``model.joblib`` once (to a temp file, then renamed)
+and records in ``model.json``:
+
+- the artifact format and library versions;
+- the model class, compression and size;
+- whatever the caller passes in ``extra`` (train stores the conformal band table).
+
+The legacy name ``rf_model.joblib`` is a symlink to it, or a hardlink where
+symlinks are not allowed, never a second copy.
+
+``MODEL_COMPRESS`` trades size for load time. With the default (``0``,
+uncompressed), ``load_model`` memory-maps the numpy arrays inside the pickle.
+HistGradientBoosting's predictor node arrays, for example, stay file-backed
+and are shared between processes. sklearn's ``Tree`` (random forest) copies
+its nodes into its own buffers while unpickling, so there the mapping only
+saves the intermediate read buffer. Compressed files (``3``, ``zlib:3``,
+``lz4``, ...) are always read in full.
+"""
+from __future__ import annotations
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import joblib
+import sklearn
+from rich import print as rprint
+
+from ..utils.io import MODELS
+
+MODEL_PATH = MODELS / "model.joblib"
+MODEL_MANIFEST_PATH = MODELS / "model.json"
+LEGACY_MODEL_PATH = MODELS / "rf_model.joblib"
+# Bumped when the file layout or manifest fields change incompatibly.
+ARTIFACT_FORMAT = 1
+
+MODEL_COMPRESS = os.getenv("MODEL_COMPRESS", "0")
+MODEL_MMAP = os.getenv("MODEL_MMAP", "on").lower() not in {"0", "off", "false", "no"}
+
+
+def _compress_arg(spec: str) -> Union[int, str, tuple]:
+    """``"0"``/``"3"`` -> level, ``"zlib:3"`` -> (method, level), ``"lz4"`` -> method."""
+    spec = (spec or "0").strip().lower()
+    if spec.isdigit():
+        return int(spec)
+    if ":" in spec:
+        method, level = spec.split(":", 1)
+        return method, int(level)
+    return spec
+
+
+def _versions() -> Dict[str, str]:
+    out = {"sklearn": sklearn.__version__, "joblib": joblib.__version__}
+    try:
+        import lightgbm  # type: ignore
+
+        out["lightgbm"] = lightgbm.__version__
+    except ImportError:
+        pass
+    return out
+
+
+def _link_alias(target: Path, alias: Path) -> str:
+    """Point ``alias`` at ``target`` without copying; returns the link kind used."""
+    alias.unlink(missing_ok=True)
+    try:
+        alias.symlink_to(target.name)  # relative, so the models dir can move
+        return "symlink"
+    except OSError:
+        pass
+    try:
+        os.link(target, alias)  # re-created on every save: a hardlink keeps the old inode otherwise
+        return "hardlink"
+    except OSError:
+        return "none"
+
+
+def save_model(model, path: Path = MODEL_PATH, compress: str = MODEL_COMPRESS,
+               extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Write ``model`` + manifest and refresh the legacy alias; returns the manifest."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".joblib.tmp")
+    start = time.perf_counter()
+    joblib.dump(model, tmp, compress=_compress_arg(compress))
+    os.replace(tmp, path)
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "file": path.name,
+        "model_class": f"{type(model).__module__}.{type(model).__name__}",
+        "compress": str(compress),
+        "bytes": path.stat().st_size,
+        "save_seconds": time.perf_counter() - start,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "versions": _versions(),
+        **(extra or {}),
+    }
+    if path == MODEL_PATH:
+        manifest["alias"] = {LEGACY_MODEL_PATH.name: _link_alias(path, LEGACY_MODEL_PATH)}
+    path.with_suffix(".json").write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def read_manifest(path: Path = MODEL_PATH) -> Optional[Dict[str, Any]]:
+    manifest = path.resolve().with_suffix(".json")  # through the legacy alias to the real file
+    return json.loads(manifest.read_text()) if manifest.exists() else None
+
+
+def load_model(path: Path = MODEL_PATH, mmap: bool = MODEL_MMAP):
+    """Load a saved model (falls back to the legacy ``rf_model.joblib``); mmap when uncompressed."""
+    if not path.exists() and path == MODEL_PATH and LEGACY_MODEL_PATH.exists():
+        path = LEGACY_MODEL_PATH
+    if not path.exists():
+        raise SystemExit("Missing trained model. Run `python -m src.models.train` first.")
+    manifest = read_manifest(path) or {}
+    if manifest.get("format", ARTIFACT_FORMAT) > ARTIFACT_FORMAT:
+        raise SystemExit(f"{path.name} uses artifact format {manifest['format']}; update the code to load it.")
+    saved = manifest.get("versions", {}).get("sklearn")
+    if saved and saved != sklearn.__version__:
+        rprint(f"[yellow]{path.name} was saved with scikit-learn {saved}, loading with {sklearn.__version__}.[/yellow]")
+    compressed = _compress_arg(manifest.get("compress", "0")) not in (0, None)
+    return joblib.load(path, mmap_mode="r" if mmap and not compressed else None)
+
+
+def timed_load(path: Path = MODEL_PATH, mmap: bool = MODEL_MMAP) -> float:
+    """Seconds ``load_model`` takes for ``path`` (the figure recorded in metrics.json)."""
+    start = time.perf_counter()
+    load_model(path, mmap)
+    return time.perf_counter() - start
@@ -0,0 +1,216 @@
+"""Rolling-origin backtest: how the model would have scored each past season live.
+
+For every labeled season (the "origin"), a model is trained on the labeled
+rows strictly before it and then scores that season's labels. Both sets are
+zero-copy slices of the cached ``matrix.npy``, whose rows are ordered by year
+and season, so nothing is re-encoded per origin.
+
+LightGBM is warm-started: each origin's booster continues the previous
+origin's with ``BACKTEST_WARM_ROUNDS`` more rounds on the larger training set,
+instead of being refit from scratch. It is refit from scratch at every
+``BACKTEST_REFIT_EVERY``-th origin (counting from the first one in range), so
+old trees do not pile up. A warm origin is therefore scored with more trees
+than production trains (``n_estimators`` plus the added rounds); each row
+records its tree count. Other models (RF, HistGBR, Ridge) are refit at every
+origin, because sklearn's warm start assumes the training data does not change.
+
+Origins are split into contiguous chains, one per worker (``parallel.run_jobs``).
+Chains are only cut at refit points, so every origin gets the same model
+whatever the number of workers.
+
+Feature encoders (vocabularies, medians) come from the full feature build, as
+they do for ``run_train``. The rolling aggregates and prequel features are
+as-of, so they only ever use earlier seasons.
+
+Usage:
+    python -m src.models.backtest                      # best model from metrics.json
+    python -m src.models.backtest --model lightgbm --start-year 2020
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from rich import print as rprint
+from rich.table import Table
+from sklearn.base import clone
+
+from ..features.matrix import FeatureMatrix
+from ..utils.io import MODELS
+from .parallel import Job, n_workers, run_jobs
+
+BACKTEST_PATH = MODELS / "backtest.json"
+# Labeled rows an origin needs before it to be backtested at all.
+BACKTEST_MIN_TRAIN = int(os.getenv("BACKTEST_MIN_TRAIN", 200))
+BACKTEST_WARM_ROUNDS = int(os.getenv("BACKTEST_WARM_ROUNDS", 100))
+BACKTEST_REFIT_EVERY = int(os.getenv("BACKTEST_REFIT_EVERY", 8))
+
+_MATRIX: Optional[FeatureMatrix] = None
+
+
+def _matrix() -> FeatureMatrix:
+    """The memory-mapped matrix, opened once per process."""
+    global _MATRIX
+    if _MATRIX is None:
+        from .train import load_feature_columns
+
+        _MATRIX = FeatureMatrix.open(load_feature_columns())
+        if _MATRIX is None:
+            raise SystemExit("matrix.npy missing or stale. Run build_features first.")
+    return _MATRIX
+
+
+def _is_lightgbm(model) -> bool:
+    return type(model).__name__ == "LGBMRegressor"
+
+
+def _refits(k: int) -> bool:
+    """Whether the ``k``-th origin in range is fitted from scratch (fixed for the whole run)."""
+    return k % max(1, BACKTEST_REFIT_EVERY) == 0
+
+
+def _tree_count(model) -> Optional[int]:
+    if _is_lightgbm(model):
+        return int(model.booster_.current_iteration())
+    if hasattr(model, "estimators_"):
+        return len(model.estimators_)
+    if hasattr(model, "n_iter_"):
+        return int(model.n_iter_)
+    return None
+
+
+def _run_chain(base, origins: List[tuple], first: int, threads: int = 1) -> List[Dict[str, Any]]:
+    """Backtest consecutive ``origins`` (``first`` = index of the first one in range) with one model.
+
+    LightGBM is warm-started along the chain except at refit points; chains
+    start at one, so ``prev`` is always set when it is needed.
+    """
+    mat = _matrix()
+    rows = []
+    prev = None
+    for k, (year, season) in enumerate(origins, start=first):
+        Xtr, ytr = mat.labeled_before(year, season)
+        Xte, yte = mat.labeled_season(year, season)
+        model = clone(base)
+        if "n_jobs" in model.get_params():
+            model.set_params(n_jobs=threads)
+        warm = prev is not None and _is_lightgbm(model) and not _refits(k)
+        start = time.perf_counter()
+        if warm:
+            model.set_params(n_estimators=BACKTEST_WARM_ROUNDS)
+            model.fit(Xtr, ytr, init_model=prev.booster_)
+        else:
+            model.fit(Xtr, ytr)
+        fit_s = time.perf_counter() - start
+        start = time.perf_counter()
+        pred = model.predict(Xte)
+        predict_s = time.perf_counter() - start
+        err = pred - yte
+        rows.append({
+            "year": year, "season": season, "n_train": len(ytr), "n_test": len(yte),
+            "mae": float(np.mean(np.abs(err))), "rmse": float(np.sqrt(np.mean(err ** 2))),
+            "n_trees": _tree_count(model), "fit_seconds": fit_s, "predict_seconds": predict_s, "warm_start": warm,
+        })
+        prev = model
+    return rows
+
+
+def _chains(origins: List[tuple], costs: np.ndarray, n: int) -> List[tuple]:
+    """Split ``origins`` into up to ``n`` contiguous ``(first index, chain)`` of roughly equal cost.
+
+    Cuts fall only on refit points, so the split never changes which origins
+    are warm-started.
+    """
+    starts = [k for k in range(len(origins)) if _refits(k)]
+    if n <= 1 or len(starts) <= 1:
+        return [(0, origins)]
+    cum = np.cumsum(costs, dtype=np.float64)
+    before = np.array([cum[k - 1] if k else 0.0 for k in starts])  # cost ahead of each refit point
+    picks = np.searchsorted(before, cum[-1] * np.arange(1, n) / n, side="left")
+    bounds = [0, *sorted(set(starts[int(i)] for i in picks if 0 < i < len(starts))), len(origins)]
+    return [(a, origins[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def _base_model(name: Optional[str]):
+    """``name`` (default: the trained best model) from ``_candidate_models``, with tuned params if any."""
+    from .train import _candidate_models
+
+    metrics_path = MODELS / "metrics.json"
+    metrics = json.loads(metrics_path.read_text()) if metrics_path.exists() else {}
+    name = name or metrics.get("best_model") or "lightgbm"
+    models = _candidate_models()
+    if name not in models:
+        raise SystemExit(f"Unknown or unavailable model {name!r}; choose from {sorted(models)}.")
+    model = models[name]
+    search = (metrics.get("search") or {}).get(name)
+    if search:
+        model.set_params(**search["best_params"])
+    return name, model
+
+
+def run_backtest(model_name: Optional[str] = None, start_year: Optional[int] = None,
+                 end_year: Optional[int] = None) -> pd.DataFrame:
+    """Backtest every labeled season in range; prints a table and writes ``backtest.json``."""
+    name, base = _base_model(model_name)
+    mat = _matrix()
+    origins = []
+    for year, season in mat.labeled_seasons():
+        if (start_year is not None and year < start_year) or (end_year is not None and year > end_year):
+            continue
+        if len(mat.labeled_before(year, season)[1]) >= BACKTEST_MIN_TRAIN:
+            origins.append((year, season))
+    if not origins:
+        raise SystemExit(f"No season in range has {BACKTEST_MIN_TRAIN}+ labeled rows before it (BACKTEST_MIN_TRAIN).")
+
+    costs = np.array([len(mat.labeled_before(y, s)[1]) for y, s in origins])
+    chains = _chains(origins, costs, n_workers(len(origins)))
+    rprint(f"[cyan]Backtesting {name} on {len(origins)} seasons "
+           f"({origins[0][0]} {origins[0][1]} .. {origins[-1][0]} {origins[-1][1]}) in {len(chains)} chain(s)[/cyan]")
+    jobs = [Job(f"chain{i}", _run_chain, (base, chain, first), float(costs[first:first + len(chain)].sum()))
+            for i, (first, chain) in enumerate(chains)]
+    started = time.perf_counter()
+    rows: List[Dict[str, Any]] = []
+    for done in run_jobs(jobs):
+        rows += done.value
+        rprint(f"[dim]  {done.name}: {len(done.value)} season(s) in {done.seconds:.1f}s[/dim]")
+    wall = time.perf_counter() - started
+
+    out = pd.DataFrame(rows)
+    out["_order"] = [origins.index((y, s)) for y, s in zip(out["year"], out["season"])]
+    out = out.sort_values("_order").drop(columns="_order").reset_index(drop=True)
+    weights = out["n_test"].to_numpy(dtype=np.float64)
+    summary = {
+        "model": name,
+        "seasons": len(out),
+        "mae": float(np.average(out["mae"], weights=weights)),
+        "rmse": float(np.sqrt(np.average(out["rmse"] ** 2, weights=weights))),
+        "wall_seconds": wall,
+        "fit_seconds": float(out["fit_seconds"].sum()),
+    }
+    MODELS.mkdir(parents=True, exist_ok=True)
+    BACKTEST_PATH.write_text(json.dumps({**summary, "per_season": out.to_dict(orient="records")}, indent=2, default=float))
+
+    t = Table(title=f"Rolling-origin backtest ({name})", show_header=True, header_style="bold")
+    for col in ["Season", "Train", "Test", "MAE", "RMSE", "Trees", "Fit s", "Warm"]:
+        t.add_column(col, justify="left" if col == "Season" else "right")
+    for r in out.itertuples():
+        t.add_row(f"{r.year} {r.season}", str(r.n_train), str(r.n_test), f"{r.mae:.3f}", f"{r.rmse:.3f}",
+                  "" if pd.isna(r.n_trees) else str(int(r.n_trees)), f"{r.fit_seconds:.2f}", "yes" if r.warm_start else "")
+    rprint(t)
+    rprint(f"[green]Overall MAE={summary['mae']:.3f} RMSE={summary['rmse']:.3f} over {summary['seasons']} seasons; "
+           f"{wall:.1f}s wall ({summary['fit_seconds']:.1f}s fitting)[/green]")
+    rprint(f"[green]Saved backtest -> {BACKTEST_PATH}[/green]")
+    return out
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Rolling-origin backtest over historical seasons")
+    ap.add_argument("--model", default=None, help="Candidate model name (default: best model in metrics.json)")
+    ap.add_argument("--start-year", type=int, default=None)
+    ap.add_argument("--end-year", type=int, default=None)
+    args = ap.parse_args()
+    run_backtest(args.model, args.start_year, args.end_year)
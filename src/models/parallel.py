@@ -0,0 +1,104 @@
+"""Run CPU-bound model jobs concurrently under one machine-wide thread budget.
+
+Each job runs in its own worker process with a fixed number of threads: the
+job receives it as ``threads=`` (for estimators that take ``n_jobs``) and runs
+inside ``threadpool_limits(threads)``, which caps the OpenMP/BLAS pools used
+by HistGradientBoosting, LightGBM and Ridge. Budgets add up to
+``TRAIN_THREADS``, so concurrent jobs neither oversubscribe the cores nor
+leave them idle. Heavier jobs (by weight) get more threads and start first,
+and results come back as each job finishes. The whole run then takes about
+as long as the slowest job, not the sum of all of them.
+
+With fewer than two workers (one core, or ``TRAIN_WORKERS=1``), jobs run one
+after another in this process, each with the full budget.
+"""
+from __future__ import annotations
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from threadpoolctl import threadpool_limits
+
+# Total threads shared by concurrent jobs, and the most jobs running at once.
+TRAIN_THREADS = int(os.getenv("TRAIN_THREADS") or os.cpu_count() or 1)
+TRAIN_WORKERS = int(os.getenv("TRAIN_WORKERS") or os.cpu_count() or 1)
+
+
+@dataclass
+class Job:
+    """``fn(*args, threads=n)`` as one schedulable unit; ``weight`` is its relative CPU cost."""
+
+    name: str
+    fn: Callable[..., Any]  # module-level, so spawn workers can import it
+    args: Tuple[Any, ...] = field(default_factory=tuple)
+    weight: float = 1.0
+
+
+@dataclass
+class JobResult:
+    name: str
+    value: Any
+    threads: int
+    seconds: float
+
+
+def thread_budgets(weights: Dict[str, float], total: int) -> Dict[str, int]:
+    """Split ``total`` threads across jobs in proportion to ``weights`` (at least one each).
+
+    Largest-remainder rounding, so the budgets sum to ``total`` whenever
+    there are at least as many threads as jobs.
+    """
+    names = list(weights)
+    if total <= len(names):
+        return {n: 1 for n in names}
+    spare = total - len(names)
+    weight_sum = sum(weights.values()) or float(len(names))
+    shares = {n: spare * (weights[n] or 0.0) / weight_sum for n in names}
+    budgets = {n: 1 + int(shares[n]) for n in names}
+    leftover = total - sum(budgets.values())
+    for n in sorted(names, key=lambda n: shares[n] - int(shares[n]), reverse=True)[:leftover]:
+        budgets[n] += 1
+    return budgets
+
+
+def n_workers(n_jobs: int, workers: int = TRAIN_WORKERS, threads: int = TRAIN_THREADS) -> int:
+    """Processes ``run_jobs`` will use for ``n_jobs`` jobs (1 = in this process)."""
+    return max(1, min(workers, n_jobs, threads))
+
+
+def _run_job(fn: Callable[..., Any], args: tuple, threads: int) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    with threadpool_limits(limits=threads):
+        value = fn(*args, threads=threads)
+    return value, time.perf_counter() - start
+
+
+def run_jobs(jobs: List[Job], workers: int = TRAIN_WORKERS, threads: int = TRAIN_THREADS) -> Iterator[JobResult]:
+    """Yield a :class:`JobResult` per job, in completion order.
+
+    All jobs run at once when ``workers`` allows, sharing ``threads`` by
+    weight. Otherwise each of the ``workers`` slots gets an equal share and
+    jobs queue heaviest first.
+    """
+    jobs = sorted(jobs, key=lambda j: j.weight, reverse=True)
+    workers = n_workers(len(jobs), workers, threads)
+    if workers <= 1:
+        for job in jobs:
+            value, seconds = _run_job(job.fn, job.args, threads)
+            yield JobResult(job.name, value, threads, seconds)
+        return
+
+    if workers >= len(jobs):
+        budgets = thread_budgets({j.name: j.weight for j in jobs}, threads)
+    else:
+        budgets = {j.name: max(1, threads // workers) for j in jobs}
+    # spawn: fork would copy the parent's already-initialised OpenMP/BLAS thread pools.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(_run_job, j.fn, j.args, budgets[j.name]): j for j in jobs}
+        for fut in as_completed(futures):
+            job = futures[fut]
+            value, seconds = fut.result()
+            yield JobResult(job.name, value, budgets[job.name], seconds)
@@ -4,14 +4,19 @@ import json
 import os
 from pathlib import Path
 
-import joblib
 import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 from rich import print as rprint
 
-from ..utils.io import NORMALIZED, FEATURES, MODELS, PREDICTIONS
+from ..features.build_features import FeaturePipeline
+from ..utils.io import FEATURES, PREDICTIONS
+from ..utils.normalized_store import NormalizedStore
 from ..ingest import ingest_one_season
+from .artifacts import load_model, read_manifest
+from .conformal import half_widths
+from .tree_engine import TREE_ENGINE, compile_model
+from .train import FEATURE_PIPELINE_PATH
 
 SEASON_ORDER = ["winter", "spring", "summer", "fall"]
 
@@ -39,6 +44,15 @@ def load_feature_columns() -> list[str]:
     return json.loads((FEATURES / "feature_columns.json").read_text())
 
 
+def load_feature_pipeline() -> FeaturePipeline:
+    """The encoder saved with the model; falls back to features/vocab.json for older models."""
+    if FEATURE_PIPELINE_PATH.exists():
+        return FeaturePipeline.load(FEATURE_PIPELINE_PATH)
+    if (FEATURES / "vocab.json").exists():
+        return FeaturePipeline.load(FEATURES / "vocab.json")
+    raise SystemExit("Missing feature pipeline. Run `python -m src.models.train` first.")
+
+
 def _studio_name(cell) -> str:
     if cell is None:
         return ""
@@ -89,12 +103,10 @@ def _list_to_names(cell) -> list[str]:
 
 def _ensure_target_season(year: int, season: str) -> None:
     """Make sure the target season exists in the normalized store with images."""
-    norm = NORMALIZED / "anime.parquet"
-    if not norm.exists():
-        raise SystemExit(f"Missing {norm}. Run ingest first.")
-    df = pd.read_parquet(norm)
-    target = df[(df["year"] == year) & (df["season"].astype(str).str.lower() == season.lower())]
-    if not target.empty:
+    store = NormalizedStore()
+    if not store.exists():
+        raise SystemExit(f"Missing {store.dir}. Run ingest first.")
+    if not store.read_season(year, season, columns=["mal_id"]).empty:
         return
     rprint(f"[cyan]Target season {year} {season} not in normalized data; fetching it...[/cyan]")
     ingest_one_season(year, season, source=os.getenv("INGEST_SOURCE", "auto"), use_cache=True)
@@ -106,49 +118,30 @@ def predict_for_season(year: int, season: str, fetch_if_missing: bool = True):
     if fetch_if_missing:
         _ensure_target_season(year, season)
 
-    df = pd.read_parquet(NORMALIZED / "anime.parquet")
-    target = df[(df["year"] == year) & (df["season"].astype(str).str.lower() == season)].copy()
+    target = NormalizedStore().read_season(year, season)
     if target.empty:
         rprint(f"[yellow]No rows for {year} {season} in normalized data. Run ingest first.[/yellow]")
         return None
 
-    # Build features using the same transformation used during training.
-    X_all = pd.read_parquet(FEATURES / "features.parquet")
-    cols = load_feature_columns()
+    # Encode just the target rows with the encoder fitted at training time.
+    # Same float32 layout the model was trained on (see features/matrix.py).
+    features = load_feature_pipeline().transform(target).to_numpy(dtype=np.float32)
 
-    features = (
-        X_all.merge(target[["mal_id"]], on="mal_id", how="right")
-        .set_index("mal_id")
-        .reindex(columns=cols)
-        .fillna(0)
-    )
+    model = load_model()
+    # Tree ensembles run through the flattened engine: same predictions, no per-tree call overhead.
+    engine = compile_model(model) if TREE_ENGINE else None
+    preds = engine.predict(features) if engine is not None else model.predict(features)
 
-    model_path = MODELS / "model.joblib"
-    if not model_path.exists():
-        model_path = MODELS / "rf_model.joblib"
-    if not model_path.exists():
-        raise SystemExit("Missing trained model. Run `python -m src.models.train` first.")
-    model = joblib.load(model_path)
-    preds = model.predict(features)
-
-    # Uncertainty estimate:
-    # - Tree ensembles (RF / GBR / LightGBM) expose per-tree predictions.
-    # - Ridge has no trees; fall back to a fixed band from validation MAE.
-    pred_std = np.zeros(len(preds))
-    if hasattr(model, "estimators_") and len(getattr(model, "estimators_", [])) > 1:
-        # RandomForest: list of trees
-        tree_preds = np.stack([t.predict(features) for t in model.estimators_])
-        pred_std = tree_preds.std(axis=0)
-    elif hasattr(model, "_predictors") and getattr(model, "_predictors", None):
-        # HistGradientBoosting keeps raw predictors; use loss-based fallback instead.
-        pred_std = np.full(len(preds), 0.25)
-    else:
-        pred_std = np.full(len(preds), 0.25)
+    # Uncertainty band: split-conformal half-widths calibrated on the val year at
+    # training time (see conformal.py), looked up per type/source bucket.
+    # Models saved before the table existed get a fixed +/-0.49 (1.96 * 0.25).
+    table = (read_manifest() or {}).get("conformal")
+    half = half_widths(table, target) if table else np.full(len(preds), 1.96 * 0.25)
 
     out_df = target[["mal_id", "title", "year", "season"]].copy()
     out_df["pred_score"] = np.round(preds, 3)
-    out_df["pred_low"] = np.round(preds - 1.96 * pred_std, 3)
-    out_df["pred_high"] = np.round(preds + 1.96 * pred_std, 3)
+    out_df["pred_low"] = np.round(preds - half, 3)
+    out_df["pred_high"] = np.round(preds + half, 3)
 
     # Carry rich metadata for the frontend.
     for col in META_COLS:
@@ -176,7 +169,7 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     load_dotenv()
-    df_norm = pd.read_parquet(NORMALIZED / "anime.parquet")
+    df_norm = NormalizedStore().read(columns=["year", "season"])
 
     if args.season == "auto":
         y, s = detect_next_season(df_norm)
@@ -0,0 +1,192 @@
+"""Hyperparameter search per model family: rolling chronological CV + successive halving.
+
+Folds roll forward through the training years, and each one is a
+``TrainConfig``. Fold ``k`` trains on ``train_start_year .. v - 1`` and
+validates on year ``v``, for the last ``SEARCH_FOLDS`` years of the training
+range. The real validation and test years stay untouched until the final
+comparison in ``run_train``.
+
+For each family, ``SEARCH_CANDIDATES`` configurations are sampled from its
+space, always including the hand-picked defaults from ``_candidate_models``.
+They then go through successive halving on the family's size parameter
+(trees or boosting iterations):
+
+- every configuration is fitted with a small budget on every fold;
+- the best ``1 / SEARCH_ETA`` by mean fold MAE move up to ``SEARCH_ETA``
+  times the budget, up to the default size.
+
+Promoted configurations are not refit from scratch. Their fitted fold models
+are kept between rungs and grown, using warm-start for the random forest and
+HistGradientBoosting, and ``init_model`` for LightGBM. Fold matrices are
+memory-mapped slices loaded once per process. Fits within a rung run in
+parallel through ``parallel.run_jobs``.
+"""
+from __future__ import annotations
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from rich import print as rprint
+from sklearn.base import clone
+from sklearn.model_selection import ParameterSampler
+
+from .parallel import Job, run_jobs
+
+SEARCH_FOLDS = int(os.getenv("SEARCH_FOLDS", 3))
+SEARCH_CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", 12))
+SEARCH_ETA = int(os.getenv("SEARCH_ETA", 3))
+# Smallest tree/iteration count a configuration is scored at.
+SEARCH_MIN_RESOURCE = int(os.getenv("SEARCH_MIN_RESOURCE", 25))
+
+SEARCH_SPACES: Dict[str, Dict[str, list]] = {
+    "random_forest": {
+        "min_samples_leaf": [1, 3, 5, 10],
+        "max_features": [1.0, 0.5, 0.33],
+        "max_depth": [None, 12, 24],
+    },
+    "hist_gbr": {
+        "learning_rate": [0.03, 0.05, 0.1],
+        "min_samples_leaf": [10, 20, 40],
+        "l2_regularization": [0.0, 1.0, 5.0],
+        "max_leaf_nodes": [15, 31, 63],
+    },
+    "lightgbm": {
+        "learning_rate": [0.02, 0.03, 0.05, 0.1],
+        "num_leaves": [15, 31, 63],
+        "min_child_samples": [10, 20, 40],
+        "reg_lambda": [0.0, 1.0, 5.0],
+    },
+    "ridge": {"alpha": [0.1, 1.0, 3.0, 10.0, 30.0, 100.0]},
+}
+# Size parameter halved over; families without one are scored once at their only size.
+RESOURCE_PARAMS = {"random_forest": "n_estimators", "hist_gbr": "max_iter", "lightgbm": "n_estimators"}
+
+
+def fold_configs(cfg, n_folds: int = SEARCH_FOLDS) -> list:
+    """Rolling-origin folds inside ``cfg``'s training years (never its val/test years)."""
+    from .train import TrainConfig
+
+    first = max(cfg.train_start_year + 1, cfg.train_end_year - n_folds + 1)
+    return [
+        TrainConfig(train_start_year=cfg.train_start_year, train_end_year=v - 1, val_year=v, test_year=v)
+        for v in range(first, cfg.train_end_year + 1)
+    ]
+
+
+def _fold_data(fold, cols: list[str]):
+    from .train import _cached_splits
+
+    (Xtr, ytr), (Xva, yva), _ = _cached_splits(fold, cols)
+    return Xtr, ytr, Xva, yva
+
+
+def sample_configs(name: str, base, n: int = SEARCH_CANDIDATES, seed: int = 42) -> List[Dict[str, Any]]:
+    """``n`` configurations from the family's space; the first one is ``base``'s own settings."""
+    space = SEARCH_SPACES.get(name, {})
+    if not space:
+        return [{}]
+    params = base.get_params()
+    default = {k: params[k] for k in space}
+    n_grid = math.prod(len(v) for v in space.values())
+    sampled = list(ParameterSampler(space, n_iter=min(n, n_grid), random_state=seed))
+    out = [default]
+    for cand in sampled:
+        if cand not in out:
+            out.append(cand)
+    return out[:max(1, n)]
+
+
+def resource_ladder(max_resource: int, n_configs: int, eta: int = SEARCH_ETA,
+                    min_resource: int = SEARCH_MIN_RESOURCE) -> List[int]:
+    """Budgets per rung, ending at ``max_resource``; one rung per ``eta``-fold cut of the field."""
+    eta = max(2, eta)
+    n_rungs = 1 + int(math.floor(math.log(max(1, n_configs), eta) + 1e-9))
+    ladder = [max(min_resource, int(round(max_resource / eta ** (n_rungs - 1 - k)))) for k in range(n_rungs)]
+    ladder = sorted(set(min(r, max_resource) for r in ladder))
+    return ladder
+
+
+def _grow(prev, model, resource: Optional[str], n: Optional[int], X, y):
+    """Fit ``model`` at size ``n``, continuing ``prev`` (same config and fold, smaller size) if given."""
+    if resource is None:
+        return model.fit(X, y)
+    if prev is None:
+        if "warm_start" in model.get_params():
+            model.set_params(warm_start=True)
+        return model.set_params(**{resource: n}).fit(X, y)
+    if hasattr(prev, "booster_"):  # LightGBM: boost the remaining rounds on top of the cached booster
+        done = prev.booster_.current_iteration()
+        model.set_params(**{resource: n - done})
+        model.fit(X, y, init_model=prev.booster_)
+        return model.set_params(**{resource: n})
+    return prev.set_params(**{resource: n}).fit(X, y)  # warm_start: only the new trees/iterations are fitted
+
+
+def _fit_rung(model, prev, resource, n, fold, cols, threads: int = 1):
+    """One (config, fold) fit at size ``n``; returns ``(fitted, fold MAE)``."""
+    for m in (model, prev):
+        if m is not None and "n_jobs" in m.get_params():
+            m.set_params(n_jobs=threads)
+    Xtr, ytr, Xva, yva = _fold_data(fold, cols)
+    fitted = _grow(prev, model, resource, n, Xtr, ytr)
+    return fitted, float(np.mean(np.abs(fitted.predict(Xva) - yva)))
+
+
+def search_family(name: str, base, cfg, cols: list[str]) -> Dict[str, Any]:
+    """Successive halving for one family; returns best params, its CV MAE and every trial."""
+    from .train import MODEL_WEIGHTS, _cached_splits
+
+    folds = [f for f in fold_configs(cfg) if len(_cached_splits(f, cols)[1][1])]
+    if not folds:
+        raise SystemExit("Search needs labeled rows in at least two training years (see SEARCH_FOLDS).")
+    resource = RESOURCE_PARAMS.get(name)
+    configs = sample_configs(name, base)
+    ladder = resource_ladder(base.get_params()[resource], len(configs)) if resource else [None]
+
+    alive = list(range(len(configs)))
+    cache: Dict[tuple, Any] = {}  # (config, fold) -> model fitted at the previous rung
+    trials: List[Dict[str, Any]] = []
+    scores: Dict[int, float] = {}
+    for rung, n in enumerate(ladder):
+        jobs, keys = [], {}
+        for i in alive:
+            for k, fold in enumerate(folds):
+                model = clone(base).set_params(**configs[i])
+                jobs.append(Job(f"{name}[{i}]/{fold.val_year}", _fit_rung,
+                                (model, cache.pop((i, k), None), resource, n, fold, cols), MODEL_WEIGHTS.get(name, 1.0)))
+                keys[jobs[-1].name] = (i, k)
+        maes: Dict[int, List[float]] = {i: [] for i in alive}
+        for done in run_jobs(jobs):
+            (i, k), (fitted, mae) = keys[done.name], done.value
+            cache[(i, k)] = fitted
+            maes[i].append(mae)
+        scores = {i: float(np.mean(v)) for i, v in maes.items()}
+        trials += [{"rung": rung, "resource": n, "params": configs[i], "cv_mae": scores[i]} for i in alive]
+        keep = max(1, len(alive) // max(2, SEARCH_ETA)) if rung < len(ladder) - 1 else len(alive)
+        alive = sorted(alive, key=lambda i: scores[i])[:keep]
+        cache = {key: m for key, m in cache.items() if key[0] in alive}
+        rprint(f"[dim]  {name} rung {rung}: {len(maes)} config(s) x {len(folds)} fold(s)"
+               f"{f' at {resource}={n}' if resource else ''}; best CV MAE {scores[alive[0]]:.3f}[/dim]")
+
+    best = alive[0]
+    params = dict(configs[best])
+    if resource:
+        params[resource] = ladder[-1]
+    return {
+        "best_params": params,
+        "cv_mae": scores[best],
+        "folds": [f.val_year for f in folds],
+        "ladder": ladder,
+        "trials": trials,
+    }
+
+
+def search_all(models: dict, cfg, cols: list[str]) -> Dict[str, Dict[str, Any]]:
+    """Run :func:`search_family` for every candidate model; keyed by family name."""
+    out = {}
+    for name, base in models.items():
+        rprint(f"[cyan]Searching {name} ({len(sample_configs(name, base))} configs)...[/cyan]")
+        out[name] = search_family(name, base, cfg, cols)
+        rprint(f"[green]  {name}: CV MAE {out[name]['cv_mae']:.3f} with {out[name]['best_params']}[/green]")
+    return out
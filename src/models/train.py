@@ -1,6 +1,8 @@
 from __future__ import annotations
+import argparse
 import json
 import os
+import time
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -16,7 +18,18 @@ from sklearn.ensemble import (
 from sklearn.linear_model import Ridge
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
+from ..features.build_features import FeaturePipeline
+from ..features.matrix import FeatureMatrix
 from ..utils.io import FEATURES, MODELS
+from .artifacts import MODEL_PATH, save_model, timed_load
+from .conformal import calibrate
+from .parallel import TRAIN_THREADS, Job, n_workers, run_jobs
+
+FEATURE_PIPELINE_PATH = MODELS / "feature_pipeline.json"
+# Relative CPU cost of each candidate: sets its share of the thread budget.
+MODEL_WEIGHTS = {"random_forest": 4.0, "lightgbm": 3.0, "hist_gbr": 3.0, "ridge": 1.0}
+# Tune each family with chronological CV before the comparison (see search.py).
+TRAIN_SEARCH = os.getenv("TRAIN_SEARCH", "off").lower() not in {"0", "off", "false", "no"}
 
 
 @dataclass
@@ -51,32 +64,90 @@ def chronological_split(df: pd.DataFrame, cfg: TrainConfig):
     train = df[(df["year"] >= cfg.train_start_year) & (df["year"] <= cfg.train_end_year)]
     val = df[df["year"] == cfg.val_year]
     test = df[df["year"] == cfg.test_year]
+    _check_split_sizes(len(train), len(val), len(test), cfg)
+    return train, val, test
+
 
-    if train.empty:
+def _check_split_sizes(n_train: int, n_val: int, n_test: int, cfg: TrainConfig, verbose: bool = True) -> None:
+    if not n_train:
         raise SystemExit("Train split is empty. Check TRAIN_START_YEAR/TRAIN_END_YEAR and ingested data.")
-    if val.empty:
+    if not verbose:
+        return
+    if not n_val:
         rprint(f"[yellow]Warning: validation year {cfg.val_year} has no labeled rows.[/yellow]")
-    if test.empty:
+    if not n_test:
         rprint(f"[yellow]Warning: test year {cfg.test_year} has no labeled rows.[/yellow]")
 
-    return train, val, test
-
 
 def select_x_y(df: pd.DataFrame, cols: list[str]):
-    X = df[cols].copy()
+    X = df[cols].to_numpy(dtype=np.float32)
     y = df["label_score"].astype(float).values
     return X, y
 
 
+def load_splits(cfg: TrainConfig, cols: list[str], verbose: bool = True):
+    """``(X, y)`` for train/val/test.
+
+    Slices of the memory-mapped ``matrix.npy`` (zero-copy, float32) when it
+    matches ``cols``; otherwise read from features.parquet.
+    """
+    mat = FeatureMatrix.open(cols)
+    if mat is None:
+        if verbose:
+            rprint("[dim]matrix.npy missing or stale; reading features.parquet[/dim]")
+        dtrain, dval, dtest = chronological_split(load_features(), cfg)
+        return select_x_y(dtrain, cols), select_x_y(dval, cols), select_x_y(dtest, cols)
+
+    train = mat.labeled_years(cfg.train_start_year, cfg.train_end_year)
+    val = mat.labeled_years(cfg.val_year, cfg.val_year)
+    test = mat.labeled_years(cfg.test_year, cfg.test_year)
+    _check_split_sizes(len(train[1]), len(val[1]), len(test[1]), cfg, verbose)
+    return train, val, test
+
+
+# Splits already loaded in this process, keyed by config + columns (workers load once each).
+_SPLITS: dict = {}
+
+
+def _cached_splits(cfg: TrainConfig, cols: list[str], verbose: bool = False):
+    key = (tuple(cfg.__dict__.values()), tuple(cols))
+    if key not in _SPLITS:
+        _SPLITS[key] = load_splits(cfg, cols, verbose)
+    return _SPLITS[key]
+
+
 def _eval(model, X, y, name: str) -> dict:
     pred = model.predict(X)
     mae = mean_absolute_error(y, pred)
     rmse = float(np.sqrt(mean_squared_error(y, pred)))
     r2 = r2_score(y, pred) if len(y) > 1 else float("nan")
-    rprint(f"[bold]{name:<6}[/bold]  MAE={mae:.3f}  RMSE={rmse:.3f}  R2={r2:.3f}")
     return {"name": name, "mae": mae, "rmse": rmse, "r2": r2}
 
 
+def _print_eval(m: dict) -> None:
+    rprint(f"[bold]{m['name']:<6}[/bold]  MAE={m['mae']:.3f}  RMSE={m['rmse']:.3f}  R2={m['r2']:.3f}")
+
+
+def _fit_candidate(model, cfg: TrainConfig, cols: list[str], threads: int = 1):
+    """Fit one candidate on the train split with ``threads`` threads; returns ``(model, results)``.
+
+    Runs in a scheduler worker (see parallel.py), which reopens the splits itself.
+    """
+    if "n_jobs" in model.get_params():
+        model.set_params(n_jobs=threads)
+    (Xtr, ytr), (Xva, yva), (Xte, yte) = _cached_splits(cfg, cols)
+    model.fit(Xtr, ytr)
+    # Scored within the same budget: threadpool_limits does not cap joblib's threads.
+    results = {
+        "train": _eval(model, Xtr, ytr, "train"),
+        "val": _eval(model, Xva, yva, "val"),
+        "test": _eval(model, Xte, yte, "test") if len(Xte) else None,
+    }
+    if "n_jobs" in model.get_params():
+        model.set_params(n_jobs=-1)  # the saved model predicts with every core again
+    return model, results
+
+
 def _candidate_models() -> dict:
     """Models to compare. LightGBM is used if available; otherwise skipped."""
     models = {
@@ -103,7 +174,7 @@ def _candidate_models() -> dict:
     return models
 
 
-def run_train():
+def run_train(search: bool = TRAIN_SEARCH):
     load_dotenv()
     cfg = TrainConfig(
         train_start_year=int(os.getenv("TRAIN_START_YEAR", 2018)),
@@ -114,27 +185,40 @@ def run_train():
     rprint(f"[cyan]Config: train {cfg.train_start_year}-{cfg.train_end_year}, "
            f"val {cfg.val_year}, test {cfg.test_year}[/cyan]")
 
-    df = load_features()
     cols = load_feature_columns()
-    dtrain, dval, dtest = chronological_split(df, cfg)
-
-    Xtr, ytr = select_x_y(dtrain, cols)
-    Xva, yva = select_x_y(dval, cols)
-    Xte, yte = select_x_y(dtest, cols)
+    (Xtr, ytr), (Xva, yva), (Xte, yte) = _cached_splits(cfg, cols, verbose=True)
 
     rprint(f"[dim]train={len(Xtr)} val={len(Xva)} test={len(Xte)} features={len(cols)}[/dim]")
 
+    # Candidates train concurrently, each on its own share of the cores; results print as they finish.
+    candidates = _candidate_models()
+    searched = None
+    if search:
+        from .search import search_all
+
+        searched = search_all(candidates, cfg, cols)
+        for name, res in searched.items():
+            candidates[name].set_params(**res["best_params"])
+    jobs = [Job(name, _fit_candidate, (model, cfg, cols), MODEL_WEIGHTS.get(name, 1.0))
+            for name, model in candidates.items()]
+    workers = n_workers(len(jobs))
+    rprint(f"[dim]Training {len(jobs)} models: {workers} worker(s), "
+           f"{TRAIN_THREADS} thread(s)[/dim]")
     results: dict[str, dict] = {}
     fitted: dict = {}
-    for name, model in _candidate_models().items():
-        rprint(f"\n[magenta]== Training {name} ==[/magenta]")
-        model.fit(Xtr, ytr)
-        fitted[name] = model
-        results[name] = {
-            "train": _eval(model, Xtr, ytr, "train"),
-            "val": _eval(model, Xva, yva, "val"),
-            "test": _eval(model, Xte, yte, "test") if len(Xte) else None,
-        }
+    started = time.perf_counter()
+    for done in run_jobs(jobs):
+        model, res = done.value
+        rprint(f"\n[magenta]== {done.name} ({done.threads} thread(s), {done.seconds:.1f}s) ==[/magenta]")
+        for m in res.values():
+            if m is not None:
+                _print_eval(m)
+        fitted[done.name] = model
+        results[done.name] = {**res, "threads": done.threads, "train_seconds": done.seconds}
+    wall = time.perf_counter() - started
+    results = {name: results[name] for name in candidates}
+    rprint(f"[dim]Model comparison took {wall:.1f}s "
+           f"(fits summed: {sum(r['train_seconds'] for r in results.values()):.1f}s)[/dim]")
 
     # Pick best by validation MAE.
     best_name = min(
@@ -144,22 +228,37 @@ def run_train():
     best_model = fitted[best_name]
     rprint(f"\n[bold green]Best model by val MAE: {best_name}[/bold green]")
 
-    # Persist the best model + metadata.
-    import joblib
-
+    # Prediction bands: split-conformal residual quantiles on the val year, saved in the manifest.
+    conformal = calibrate(best_model, cfg, cols)
+    if conformal is None:
+        rprint(f"[yellow]No labeled rows in val year {cfg.val_year}; predictions fall back to a fixed band.[/yellow]")
+    else:
+        cov = conformal["test"]
+        rprint(f"[dim]Conformal band ({1 - conformal['alpha']:.0%}): +/-{conformal['global']['q']:.3f} "
+               f"from {conformal['global']['n']} val rows, {len(conformal['buckets'])} bucket(s)"
+               + (f"; test coverage {cov['coverage']:.1%}" if cov["n"] else "") + "[/dim]")
+
+    # Persist the best model (written once; rf_model.joblib is an alias) + metadata.
     MODELS.mkdir(parents=True, exist_ok=True)
-    joblib.dump(best_model, MODELS / "model.joblib")
-    # Keep the old filename for backward compatibility with any old scripts.
-    joblib.dump(best_model, MODELS / "rf_model.joblib")
+    artifact = save_model(best_model, extra={"conformal": conformal})
+    artifact["load_seconds"] = timed_load()
+    # The fitted encoder travels with the model so predict can transform new rows itself.
+    FeaturePipeline.load(FEATURES / "vocab.json").save(FEATURE_PIPELINE_PATH)
 
     meta = {
         "best_model": best_name,
         "feature_columns": cols,
         "config": cfg.__dict__,
         "results": results,
+        "best_params": searched[best_name]["best_params"] if searched else None,
+        "search": searched,
+        "training": {"workers": workers, "threads": TRAIN_THREADS, "wall_seconds": wall},
+        "artifact": {k: artifact[k] for k in ["file", "format", "compress", "bytes", "save_seconds", "load_seconds"]},
+        "conformal": conformal,
     }
     (MODELS / "metrics.json").write_text(json.dumps(meta, indent=2, default=float))
-    rprint(f"[green]Saved model -> {MODELS / 'model.joblib'}[/green]")
+    rprint(f"[green]Saved model -> {MODEL_PATH} ({artifact['bytes'] / 1e6:.1f} MB, loads in "
+           f"{artifact['load_seconds']:.2f}s) (+ {FEATURE_PIPELINE_PATH.name})[/green]")
     rprint(f"[green]Saved metrics -> {MODELS / 'metrics.json'}[/green]")
 
     # Pretty summary table.
@@ -177,4 +276,10 @@ def run_train():
 
 
 if __name__ == "__main__":
-    run_train()
+    ap = argparse.ArgumentParser(description="Train and compare candidate models")
+    ap.add_argument(
+        "--search", action="store_true", default=TRAIN_SEARCH,
+        help="Tune each model family with chronological CV + successive halving first",
+    )
+    args = ap.parse_args()
+    run_train(search=args.search)
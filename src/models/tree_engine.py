@@ -0,0 +1,250 @@
+"""Flattened tree-ensemble inference: every tree of a model in one set of node arrays.
+
+``compile_model`` turns a fitted RandomForestRegressor,
+HistGradientBoostingRegressor or LGBMRegressor into a :class:`FlatEnsemble`.
+The nodes of all trees are concatenated into flat arrays:
+
+- ``feature``, ``threshold``, ``left``, ``right``, ``value``;
+- the missing-value rules: ``default_left``, ``zero_missing``, ``nan_to_zero``.
+
+Leaves point at themselves. A batch is evaluated for all trees at once: one
+node position per (tree, row) pair advances a level per step, and pairs that
+reach a leaf drop out, so each step only touches unfinished paths. There is
+no per-tree Python call.
+
+Each model's own split rule is reproduced:
+
+- sklearn trees compare the float32-cast input, ``x <= threshold``, with NaN
+  following ``missing_go_to_left``;
+- HistGradientBoosting compares in float64;
+- LightGBM maps NaN to 0 unless the split learned NaN as missing, and sends
+  zeros (``missing_type == "Zero"``) or NaN to the default side.
+
+Each level is a handful of numpy gathers over all unfinished paths, so the
+gain is in dropping the per-tree call overhead. For a season-sized batch
+(tens to hundreds of rows) on a 400-tree forest, the engine gives the mean
+and spread about 10x faster than 400 ``predict`` calls. For batches of many
+thousands of rows, sklearn's compiled per-tree traversal wins again, because
+it touches memory less; see ``python -m src.bench_inference``.
+
+Per-tree outputs are accumulated in tree order, as sklearn and LightGBM do,
+so predictions match the library's exactly when it predicts on one thread.
+With several threads, sklearn's forest adds its trees in whatever order the
+threads finish, which can change the last bit.
+Categorical splits, multi-output models and non-identity links are not
+compiled (``compile_model`` returns None and callers use ``model.predict``).
+"""
+from __future__ import annotations
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+TREE_ENGINE = os.getenv("TREE_ENGINE", "on").lower() not in {"0", "off", "false", "no"}
+# Upper bound on rows x trees node positions held at once (bounds memory on large batches).
+TREE_BATCH_ELEMENTS = int(os.getenv("TREE_BATCH_ELEMENTS", 1 << 22))
+# LightGBM's kZeroThreshold: |x| at or below this counts as zero for missing_type "Zero".
+_LGBM_ZERO = 1e-35
+
+
+@dataclass
+class FlatEnsemble:
+    """All trees of one model as flat node arrays; see the module docstring."""
+
+    feature: np.ndarray       # int64, split feature (0 on leaves)
+    threshold: np.ndarray     # float64, go left if x <= threshold
+    left: np.ndarray          # int64, global node index (leaves: itself)
+    right: np.ndarray         # int64
+    value: np.ndarray         # float64, leaf output (unused on split nodes)
+    default_left: np.ndarray  # bool, side taken by missing values
+    zero_missing: np.ndarray  # bool, |x| <= 1e-35 also counts as missing (LightGBM)
+    nan_to_zero: np.ndarray   # bool, NaN is replaced by 0 before the split (LightGBM)
+    roots: np.ndarray         # int64, root node of each tree
+    max_depth: int
+    average: bool             # True: mean of trees (forest); False: baseline + sum (boosting)
+    baseline: float = 0.0
+    input_dtype: Optional[type] = None  # cast inputs first (sklearn trees predict in float32)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def tree_outputs(self, X: np.ndarray) -> np.ndarray:
+        """``(n_trees, n_rows)`` leaf value of every tree for every row."""
+        X = np.asarray(X, dtype=self.input_dtype) if self.input_dtype is not None else np.asarray(X)
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        n_rows, n_cols = X.shape
+        out = np.empty((self.n_trees, n_rows), dtype=np.float64)
+        if not n_rows:
+            return out
+        flat = X.ravel()
+        # Missing-value rules only matter with NaN in the batch or LightGBM zero-as-missing splits.
+        check_missing = bool(np.isnan(flat).any()) or bool(self.zero_missing.any())
+        children = np.stack([self.right, self.left], axis=1).ravel()  # children[2 * node + go_left]
+        is_leaf = self.left == np.arange(len(self.left))
+        step = max(1, TREE_BATCH_ELEMENTS // max(1, self.n_trees))
+        for lo in range(0, n_rows, step):
+            hi = min(n_rows, lo + step)
+            n = hi - lo
+            # One slot per (tree, row), tree-major so the result reshapes to (n_trees, n).
+            slot = np.arange(self.n_trees * n, dtype=np.int64)
+            pos = (lo + slot % n) * n_cols
+            node = np.repeat(self.roots, n)
+            res = np.empty(len(slot), dtype=np.float64)
+            for _ in range(self.max_depth + 1):
+                done = is_leaf[node]
+                n_done = int(np.count_nonzero(done))
+                if n_done == len(node):
+                    res[slot] = self.value[node]
+                    break
+                if n_done * 8 > len(node):  # retire finished paths once enough have piled up
+                    res[slot[done]] = self.value[node[done]]
+                    keep = ~done
+                    slot, pos, node = slot[keep], pos[keep], node[keep]
+                x = flat[pos + self.feature[node]]
+                if check_missing:
+                    nan = np.isnan(x)
+                    to_zero = nan & self.nan_to_zero[node]
+                    x = np.where(to_zero, 0.0, x)
+                    missing = (nan & ~to_zero) | (self.zero_missing[node] & (np.abs(x) <= _LGBM_ZERO))
+                    go_left = np.where(missing, self.default_left[node], x <= self.threshold[node])
+                else:
+                    go_left = x <= self.threshold[node]
+                node = children[2 * node + go_left]
+            out[:, lo:hi] = res.reshape(self.n_trees, n)
+        return out
+
+    def _combine(self, per_tree: np.ndarray) -> np.ndarray:
+        acc = np.full(per_tree.shape[1], self.baseline, dtype=np.float64)
+        for row in per_tree:  # tree order, like the libraries (not numpy's pairwise sum)
+            acc += row
+        return acc / self.n_trees if self.average else acc
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self._combine(self.tree_outputs(X))
+
+    def predict_with_spread(self, X: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Prediction plus the per-tree standard deviation (forests only; None for boosting).
+
+        Boosted trees are additive corrections, not samples of the answer, so
+        their spread says nothing about uncertainty.
+        """
+        per_tree = self.tree_outputs(X)
+        spread = per_tree.std(axis=0) if self.average and self.n_trees > 1 else None
+        return self._combine(per_tree), spread
+
+
+def _concat(trees: List[dict], average: bool, baseline: float = 0.0,
+            input_dtype: Optional[type] = None) -> FlatEnsemble:
+    """Join per-tree arrays (local child indices, -1 on leaves) into one FlatEnsemble."""
+    sizes = np.array([len(t["feature"]) for t in trees], dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    cat = {k: np.concatenate([np.asarray(t[k]) for t in trees]) for k in trees[0] if k != "depth"}
+    own = np.arange(int(sizes.sum()), dtype=np.int64)
+    offset = np.repeat(starts, sizes)
+    leaf = cat["left"] < 0
+    left = np.where(leaf, own, cat["left"].astype(np.int64) + offset)
+    right = np.where(leaf, own, cat["right"].astype(np.int64) + offset)
+    n = len(own)
+    return FlatEnsemble(
+        feature=np.where(leaf, 0, cat["feature"]).astype(np.int64),
+        threshold=cat["threshold"].astype(np.float64),
+        left=left,
+        right=right,
+        value=cat["value"].astype(np.float64),
+        default_left=cat.get("default_left", np.zeros(n, dtype=bool)).astype(bool),
+        zero_missing=cat.get("zero_missing", np.zeros(n, dtype=bool)).astype(bool),
+        nan_to_zero=cat.get("nan_to_zero", np.zeros(n, dtype=bool)).astype(bool),
+        roots=starts,
+        max_depth=max(int(t["depth"]) for t in trees),
+        average=average,
+        baseline=baseline,
+        input_dtype=input_dtype,
+    )
+
+
+def _sklearn_tree(tree) -> dict:
+    """Arrays of one sklearn ``tree_`` (children are -1 on leaves)."""
+    if tree.n_outputs != 1 or tree.value.shape[2] != 1:
+        raise NotImplementedError("multi-output trees")
+    state = tree.__getstate__()["nodes"]
+    default_left = state["missing_go_to_left"] if "missing_go_to_left" in state.dtype.names else np.zeros(len(state))
+    return {
+        "feature": tree.feature, "threshold": tree.threshold,
+        "left": tree.children_left, "right": tree.children_right,
+        "value": tree.value[:, 0, 0], "default_left": default_left, "depth": tree.max_depth,
+    }
+
+
+def _hgb_predictor(predictor) -> dict:
+    nodes = predictor.nodes
+    if nodes["is_categorical"].any():
+        raise NotImplementedError("categorical splits")
+    leaf = nodes["is_leaf"].astype(bool)
+    return {
+        "feature": nodes["feature_idx"], "threshold": nodes["num_threshold"],
+        "left": np.where(leaf, -1, nodes["left"].astype(np.int64)),
+        "right": np.where(leaf, -1, nodes["right"].astype(np.int64)),
+        "value": nodes["value"], "default_left": nodes["missing_go_to_left"],
+        "depth": int(nodes["depth"].max()),
+    }
+
+
+def _lgbm_tree(structure: dict) -> dict:
+    """Arrays of one LightGBM ``tree_structure`` (nested dicts), nodes in pre-order."""
+    cols = {k: [] for k in ["feature", "threshold", "left", "right", "value", "default_left",
+                            "zero_missing", "nan_to_zero"]}
+    depth = 0
+    stack = [(structure, -1, "", 0)]
+    while stack:
+        node, parent, side, d = stack.pop()
+        i = len(cols["feature"])
+        if parent >= 0:
+            cols[side][parent] = i
+        depth = max(depth, d)
+        if "leaf_value" in node:
+            for k, v in zip(cols, [0, 0.0, -1, -1, node["leaf_value"], False, False, False]):
+                cols[k].append(v)
+            continue
+        if node.get("decision_type", "<=") != "<=":
+            raise NotImplementedError("categorical splits")
+        missing = node.get("missing_type", "None")
+        for k, v in zip(cols, [node["split_feature"], float(node["threshold"]), -1, -1, 0.0,
+                               bool(node.get("default_left", False)), missing == "Zero", missing != "NaN"]):
+            cols[k].append(v)
+        stack.append((node["right_child"], i, "right", d + 1))
+        stack.append((node["left_child"], i, "left", d + 1))
+    out = {k: np.asarray(v) for k, v in cols.items()}
+    out["depth"] = depth
+    return out
+
+
+def compile_model(model) -> Optional[FlatEnsemble]:
+    """A FlatEnsemble for ``model``, or None if it is not a supported tree ensemble."""
+    kind = type(model).__name__
+    try:
+        if kind == "RandomForestRegressor":
+            trees = [_sklearn_tree(est.tree_) for est in model.estimators_]
+            return _concat(trees, average=True, input_dtype=np.float32)
+        if kind == "HistGradientBoostingRegressor":
+            if model.n_trees_per_iteration_ != 1 or model.loss != "squared_error":
+                return None
+            if getattr(model, "_preprocessor", None) is not None:  # categorical columns from dtypes
+                return None
+            trees = [_hgb_predictor(it[0]) for it in model._predictors]
+            baseline = float(np.asarray(model._baseline_prediction).ravel()[0])
+            return _concat(trees, average=False, baseline=baseline)
+        if kind == "LGBMRegressor":
+            dump = model.booster_.dump_model()
+            if dump.get("num_tree_per_iteration", 1) != 1 or not dump["tree_info"]:
+                return None
+            if str(dump.get("objective", "")).split()[0] not in {"regression", "regression_l1", "huber", "fair", "quantile"}:
+                return None
+            if any(t.get("num_cat", 0) for t in dump["tree_info"]):
+                return None
+            trees = [_lgbm_tree(t["tree_structure"]) for t in dump["tree_info"]]
+            return _concat(trees, average=bool(dump.get("average_output")))
+    except NotImplementedError:
+        return None
+    return None
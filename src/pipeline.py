@@ -0,0 +1,348 @@
+"""Incremental pipeline runner: ingest -> features -> train -> predict -> export.
+
+Each stage declares the files it reads and writes, the source files that
+implement it, and the config it depends on. A stage's fingerprint is a sha256
+over those inputs, code, and config; it is recorded in
+``data/pipeline_manifest.json`` together with hashes of the outputs. On the
+next run a stage is skipped when its fingerprint is unchanged and its outputs
+are still on disk as written, so only the stages downstream of an actual change
+re-run. File hashes are cached by size + mtime, so checking an up-to-date tree
+costs a few ``stat`` calls.
+
+The ingest stage talks to the network, so its fingerprint is just its code and
+config (year range, seasons, source, prediction targets). Use ``--force ingest``
+to pull fresh data for an unchanged range.
+
+Usage:
+    python -m src.pipeline                                  # run stale stages
+    python -m src.pipeline --dry-run                        # show what would run and why
+    python -m src.pipeline --force ingest                   # re-fetch, then rebuild what changed
+    python -m src.pipeline --use-cache --predict 2026:summer 2025:fall
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from rich import print as rprint
+
+from .utils.io import DATA, FEATURES, MODELS, NORMALIZED, PREDICTIONS, ROOT
+from .utils.normalized_store import LABELS_PATH
+from .utils.raw_store import DETAILS_ENDPOINT, RAW_STORE_PATH, default_store
+
+MANIFEST_PATH = DATA / "pipeline_manifest.json"
+DEFAULT_TARGETS = ["2026:summer", "2025:fall"]
+TRAIN_ENV = [
+    "TRAIN_START_YEAR", "TRAIN_END_YEAR", "VAL_YEAR", "TEST_YEAR",
+    "TRAIN_SEARCH", "SEARCH_FOLDS", "SEARCH_CANDIDATES", "SEARCH_ETA", "SEARCH_MIN_RESOURCE",
+    "CONFORMAL_ALPHA", "CONFORMAL_BY", "CONFORMAL_MIN_BUCKET",
+]
+
+
+def _files(paths: Iterable[Path]) -> List[Path]:
+    """Expand directories into the files beneath them; missing paths are skipped."""
+    out: List[Path] = []
+    for p in paths:
+        if p.is_dir():
+            out.extend(sorted(f for f in p.rglob("*") if f.is_file()))
+        elif p.exists():
+            out.append(p)
+    return out
+
+
+def _rel(path: Path) -> str:
+    for base in (DATA, ROOT):
+        try:
+            return path.resolve().relative_to(base.resolve()).as_posix()
+        except ValueError:
+            continue
+    return path.as_posix()
+
+
+class Manifest:
+    """Stage fingerprints, output hashes, and a (size, mtime) -> sha256 file-hash cache."""
+
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.path = path
+        data = json.loads(path.read_text()) if path.exists() else {}
+        self.stages: Dict[str, Dict[str, Any]] = data.get("stages", {})
+        self._hashes: Dict[str, List[Any]] = data.get("files", {})
+
+    def file_hash(self, path: Path) -> str:
+        st = path.stat()
+        key = str(path.resolve())
+        hit = self._hashes.get(key)
+        if hit and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+            return hit[2]
+        h = hashlib.sha256()
+        with path.open("rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        self._hashes[key] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def hash_files(self, paths: Iterable[Path]) -> Dict[str, str]:
+        return {_rel(f): self.file_hash(f) for f in _files(paths)}
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({"stages": self.stages, "files": self._hashes}, indent=1, sort_keys=True))
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class Stage:
+    """One pipeline step with declared inputs/outputs.
+
+    ``inputs``/``outputs`` are callables so paths that only exist after an
+    upstream stage ran are resolved lazily. ``digest`` optionally hashes a
+    logical view of an input (e.g. only the rows a stage consumes) instead of
+    the whole file.
+    """
+
+    name: str
+    run: Callable[[], None]
+    code: List[str]
+    inputs: Callable[[], List[Path]] = lambda: []
+    outputs: Callable[[], List[Path]] = lambda: []
+    config: Dict[str, Any] = field(default_factory=dict)
+    deps: List[str] = field(default_factory=list)
+    digest: Optional[Callable[[], str]] = None
+
+    def fingerprint(self, manifest: Manifest) -> str:
+        h = hashlib.sha256()
+        code = manifest.hash_files(f for pattern in self.code for f in sorted(ROOT.glob(pattern)))
+        parts = {
+            "code": code,
+            "inputs": manifest.hash_files(self.inputs()),
+            "config": self.config,
+            "digest": self.digest() if self.digest else None,
+        }
+        h.update(json.dumps(parts, sort_keys=True, default=str).encode("utf-8"))
+        return h.hexdigest()
+
+
+def _parse_target(value: str) -> Tuple[int, str]:
+    if ":" not in value:
+        raise SystemExit(f"--predict takes 'YEAR:SEASON', got {value!r}")
+    y, s = value.split(":", 1)
+    return int(y), s.lower()
+
+
+def _labeled_rows_digest() -> str:
+    """Hash of what training actually reads: the labeled rows of the feature columns.
+
+    Adding an unaired season appends unlabeled rows to features.parquet; that
+    must not trigger a retrain.
+    """
+    import pandas as pd
+
+    path = FEATURES / "features.parquet"
+    if not path.exists():
+        return "missing"
+    cols = json.loads((FEATURES / "feature_columns.json").read_text())
+    df = pd.read_parquet(path, columns=["mal_id", "year", "label_score", *cols])
+    df = df[df["label_score"].notna()].sort_values("mal_id", kind="stable")
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha256(row_hashes.tobytes() + json.dumps(cols).encode("utf-8")).hexdigest()
+
+
+def _details_digest() -> str:
+    """Hash of the cached detail payloads build_features reads (the prequel relations).
+
+    Keys and content digests of the details endpoint only: season payloads
+    and SQLite checkpoints (WAL -> main file) do not touch it.
+    """
+    if not RAW_STORE_PATH.exists():
+        return "missing"
+    return default_store().endpoint_digest(DETAILS_ENDPOINT)
+
+
+def build_stages(
+    start_year: int,
+    end_year: int,
+    seasons: List[str],
+    source: str,
+    use_cache: bool,
+    targets: List[Tuple[int, str]],
+) -> List[Stage]:
+    """The DAG, in a valid execution order."""
+    from .export_predictions import FRONTEND_PRED_DIR, export_all
+    from .features.build_features import build
+    from .ingest import ingest_one_season, run_ingest
+    from .models.predict import predict_for_season
+    from .models.train import run_train
+
+    in_range = {(y, s) for y in range(start_year, end_year + 1) for s in seasons}
+
+    def ingest() -> None:
+        run_ingest(start_year, end_year, seasons, source, use_cache=use_cache)
+        # Prediction targets outside the range are fetched here rather than by
+        # predict, so predict never writes into an upstream stage's outputs.
+        for y, s in targets:
+            if (y, s) not in in_range:
+                ingest_one_season(y, s, source=source, use_cache=True)
+
+    feature_files = [
+        FEATURES / "features.parquet", FEATURES / "feature_columns.json", FEATURES / "vocab.json",
+        FEATURES / "matrix.npy", FEATURES / "matrix_index.parquet", FEATURES / "aggregates.parquet",
+        FEATURES / "relations.npz",
+    ]
+    model_files = [
+        MODELS / "model.joblib", MODELS / "model.json", MODELS / "metrics.json", MODELS / "feature_pipeline.json",
+    ]
+
+    stages = [
+        Stage(
+            name="ingest",
+            run=ingest,
+            code=["src/ingest.py", "src/mal/*.py", "src/utils/raw_store.py", "src/utils/normalized_store.py"],
+            outputs=lambda: [NORMALIZED / "anime", NORMALIZED / "anime_index.parquet"],
+            config={
+                "start_year": start_year, "end_year": end_year, "seasons": seasons,
+                "source": source, "targets": sorted(targets),
+            },
+        ),
+        Stage(
+            name="build_features",
+            run=build,
+            code=["src/features/*.py", "src/utils/normalized_store.py"],
+            inputs=lambda: [NORMALIZED / "anime", LABELS_PATH],
+            outputs=lambda: feature_files,
+            deps=["ingest"],
+            # cached detail payloads carry the relations behind the prequel features
+            digest=_details_digest,
+        ),
+        Stage(
+            name="train",
+            run=run_train,
+            code=["src/models/train.py", "src/models/parallel.py", "src/models/search.py", "src/models/artifacts.py",
+                  "src/models/conformal.py"],
+            outputs=lambda: model_files,
+            config={k: os.getenv(k) for k in TRAIN_ENV},
+            deps=["build_features"],
+            digest=_labeled_rows_digest,
+        ),
+    ]
+    for y, s in targets:
+        stages.append(
+            Stage(
+                name=f"predict:{y}_{s}",
+                run=lambda y=y, s=s: predict_for_season(y, s, fetch_if_missing=False),
+                code=["src/models/predict.py", "src/models/artifacts.py", "src/models/tree_engine.py",
+                      "src/models/conformal.py", "src/features/*.py"],
+                # predict encodes the season itself with the pipeline saved next to the model
+                # (plus the rolling aggregate index and the prequel graph); model.json holds the band table
+                inputs=lambda y=y, s=s: [
+                    MODELS / "model.joblib", MODELS / "model.json", MODELS / "feature_pipeline.json",
+                    FEATURES / "aggregates.parquet", FEATURES / "relations.npz",
+                    NORMALIZED / "anime" / f"{y}_{s}.parquet",
+                ],
+                outputs=lambda y=y, s=s: [PREDICTIONS / f"predictions_{y}_{s}.parquet"],
+                deps=["train"],
+            )
+        )
+    stages.append(
+        Stage(
+            name="export",
+            run=export_all,
+            code=["src/export_predictions.py"],
+            inputs=lambda: sorted(PREDICTIONS.glob("predictions_*.parquet")),
+            outputs=lambda: [FRONTEND_PRED_DIR],
+            deps=[st.name for st in stages if st.name.startswith("predict:")],
+        )
+    )
+    return stages
+
+
+def _stale_reason(stage: Stage, manifest: Manifest, fingerprint: str) -> Optional[str]:
+    rec = manifest.stages.get(stage.name)
+    if rec is None:
+        return "never run"
+    if rec.get("fingerprint") != fingerprint:
+        return "inputs, code or config changed"
+    recorded = rec.get("outputs") or {}
+    current = manifest.hash_files(stage.outputs())
+    if not current or any(current.get(k) != v for k, v in recorded.items()):
+        return "outputs missing or modified"
+    return None
+
+
+def run_pipeline(stages: List[Stage], force: Iterable[str] = (), dry_run: bool = False) -> List[str]:
+    """Run stale stages in order, recording fingerprints as each one finishes. Returns the names run."""
+    manifest = Manifest()
+    force = set(force)
+    unknown = force - {st.name for st in stages}
+    if unknown:
+        raise SystemExit(f"Unknown stage(s) for --force: {sorted(unknown)}")
+
+    seen: set[str] = set()
+    for stage in stages:
+        missing = set(stage.deps) - seen
+        if missing:
+            raise ValueError(f"Stage {stage.name} runs before its dependencies {sorted(missing)}")
+        seen.add(stage.name)
+
+    ran: List[str] = []
+    for stage in stages:
+        fingerprint = stage.fingerprint(manifest)
+        reason = "forced" if stage.name in force else _stale_reason(stage, manifest, fingerprint)
+        if reason is None:
+            rprint(f"[dim]= {stage.name}: up to date[/dim]")
+            continue
+        if dry_run:
+            rprint(f"[yellow]> {stage.name}: would run ({reason})[/yellow]")
+            continue
+
+        rprint(f"[bold cyan]> {stage.name}[/bold cyan] [dim]({reason})[/dim]")
+        started = time.perf_counter()
+        stage.run()
+        manifest.stages[stage.name] = {
+            "fingerprint": fingerprint,
+            "outputs": manifest.hash_files(stage.outputs()),
+            "seconds": round(time.perf_counter() - started, 2),
+            "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        manifest.save()
+        ran.append(stage.name)
+    return ran
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Run the pipeline, skipping stages whose inputs are unchanged.")
+    ap.add_argument("--start-year", type=int, default=2018)
+    ap.add_argument("--end-year", type=int, default=2025)
+    ap.add_argument(
+        "--seasons",
+        nargs="*",
+        default=os.getenv("DEFAULT_SEASONS", "winter,spring,summer,fall").split(","),
+    )
+    ap.add_argument("--source", choices=["auto", "jikan", "anilist"], default=os.getenv("INGEST_SOURCE", "auto"))
+    ap.add_argument("--use-cache", action="store_true", help="Let ingest reuse cached raw payloads")
+    ap.add_argument("--predict", nargs="*", default=DEFAULT_TARGETS, help="Target seasons as YEAR:SEASON")
+    # extend: repeated --force flags accumulate (reproduce.sh adds its own before the user's)
+    ap.add_argument("--force", nargs="*", action="extend", default=[],
+                    help="Stage names to run regardless of fingerprints")
+    ap.add_argument("--dry-run", action="store_true", help="Only report which stages are stale")
+    args = ap.parse_args()
+
+    load_dotenv()
+    started = time.perf_counter()
+    stages = build_stages(
+        args.start_year, args.end_year, [s.lower() for s in args.seasons], args.source,
+        args.use_cache, [_parse_target(t) for t in args.predict],
+    )
+    ran = run_pipeline(stages, force=args.force, dry_run=args.dry_run)
+    if not args.dry_run:
+        rprint(
+            f"[green]Pipeline done in {time.perf_counter() - started:.1f}s: "
+            f"{len(ran)} of {len(stages)} stages ran.[/green]"
+        )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 import json
+import os
 import time
 from pathlib import Path
 from typing import Any
@@ -7,7 +8,8 @@ from typing import Any
 from rich import print as rprint
 
 ROOT = Path(__file__).resolve().parents[2]
-DATA = ROOT / "data"
+# MAL_DATA_DIR relocates every artifact (used by the offline ingest benchmark).
+DATA = Path(os.getenv("MAL_DATA_DIR") or ROOT / "data")
 RAW = DATA / "raw"
 NORMALIZED = DATA / "normalized"
 FEATURES = DATA / "features"
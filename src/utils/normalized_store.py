@@ -0,0 +1,178 @@
+"""Season-partitioned normalized anime store.
+
+Replaces the single ``data/normalized/anime.parquet`` (which every ingest read,
+deduplicated, and rewrote in full) with:
+
+- ``data/normalized/anime/<season_key>.parquet``: one file per season
+  (``2024_fall``, ``upcoming``, ...);
+- ``data/normalized/anime_index.parquet``: a compact ``mal_id -> season_key``
+  index, so an upsert knows which other partitions a title must leave.
+
+Upserting a season rewrites only that partition (plus any partition a title
+moved out of), and readers can load one season without touching the rest.
+A legacy ``anime.parquet`` is still readable until the first upsert migrates it.
+"""
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .io import NORMALIZED, safe_stem
+
+UNKNOWN_PARTITION = "unknown"
+# Final scores fetched per title by ingest_details; joined over the season snapshot's score.
+LABELS_PATH = NORMALIZED / "labels.parquet"
+
+
+def _write_atomic(df: pd.DataFrame, path: Path) -> None:
+    tmp = path.with_suffix(".parquet.tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+class NormalizedStore:
+    """Per-season parquet partitions with a ``mal_id -> season_key`` index."""
+
+    def __init__(self, root: Path = NORMALIZED):
+        self.root = Path(root)
+        self.dir = self.root / "anime"
+        self.index_path = self.root / "anime_index.parquet"
+        self.legacy_path = self.root / "anime.parquet"
+
+    # ------------------------------------------------------------------
+    # Layout
+    # ------------------------------------------------------------------
+    def _partition_path(self, season_key: str) -> Path:
+        return self.dir / f"{safe_stem(season_key)}.parquet"
+
+    def partitions(self) -> list[str]:
+        if not self.dir.exists():
+            return []
+        return sorted(p.stem for p in self.dir.glob("*.parquet"))
+
+    def needs_migration(self) -> bool:
+        return self.legacy_path.exists() and not self.partitions()
+
+    def exists(self) -> bool:
+        return bool(self.partitions()) or self.legacy_path.exists()
+
+    def index(self) -> pd.DataFrame:
+        if self.index_path.exists():
+            return pd.read_parquet(self.index_path)
+        return pd.DataFrame({"mal_id": pd.Series(dtype="int64"), "season_key": pd.Series(dtype="str")})
+
+    def count(self) -> int:
+        if self.needs_migration():
+            return pq.ParquetFile(self.legacy_path).metadata.num_rows
+        return len(self.index())
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def read(
+        self,
+        season_keys: Optional[Iterable[str]] = None,
+        columns: Optional[list[str]] = None,
+    ) -> pd.DataFrame:
+        """Load the given partitions (default: all), optionally only some columns."""
+        if self.needs_migration():
+            df = pd.read_parquet(self.legacy_path)
+            if season_keys is not None and "season_key" in df.columns:
+                df = df[df["season_key"].isin(list(season_keys))]
+            if columns is not None:
+                df = df[[c for c in columns if c in df.columns]]
+            return df.reset_index(drop=True)
+
+        keys = self.partitions() if season_keys is None else [k for k in season_keys if self._partition_path(k).exists()]
+        tables = []
+        for key in keys:
+            path = self._partition_path(key)
+            if columns is None:
+                tables.append(pq.read_table(path))
+            else:
+                have = set(pq.read_schema(path).names)
+                tables.append(pq.read_table(path, columns=[c for c in columns if c in have]))
+        if not tables:
+            return pd.DataFrame(columns=columns or [])
+        table = pa.concat_tables(tables, promote_options="permissive")
+        return table.to_pandas()
+
+    def read_season(self, year: int, season: str, columns: Optional[list[str]] = None) -> pd.DataFrame:
+        """Rows of one season: a single partition read (a filtered scan on a legacy file)."""
+        season = season.lower()
+        if self.needs_migration():
+            df = pd.read_parquet(self.legacy_path)
+            df = df[(df["year"] == year) & (df["season"].astype(str).str.lower() == season)]
+            return (df if columns is None else df[[c for c in columns if c in df.columns]]).reset_index(drop=True)
+        return self.read([f"{int(year)}_{season}"], columns=columns)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def upsert(self, df_new: pd.DataFrame) -> dict[str, int]:
+        """Insert or replace rows by ``mal_id``; returns ``{season_key: rows in partition}``.
+
+        Only the partitions named by ``df_new['season_key']`` are rewritten,
+        plus any partition a title moved out of. Rows without a ``mal_id``
+        cannot be keyed and are dropped.
+        """
+        if df_new.empty:
+            return {}
+        self.dir.mkdir(parents=True, exist_ok=True)
+        df_new = df_new[df_new["mal_id"].notna()].copy()
+        df_new["season_key"] = df_new["season_key"].fillna(UNKNOWN_PARTITION).astype(str)
+        df_new = df_new.drop_duplicates("mal_id", keep="last")
+
+        index = self.index()
+        new_keys = df_new[["mal_id", "season_key"]].astype({"mal_id": "int64"})
+        prior = index.merge(new_keys, on="mal_id", how="inner", suffixes=("_old", ""))
+        moved = prior[prior["season_key_old"] != prior["season_key"]]
+
+        # Remove titles that moved from their old partitions.
+        for old_key, ids in moved.groupby("season_key_old")["mal_id"]:
+            path = self._partition_path(old_key)
+            if path.exists():
+                part = pd.read_parquet(path)
+                part = part[~part["mal_id"].isin(ids)]
+                if part.empty:
+                    path.unlink()
+                else:
+                    _write_atomic(part, path)
+
+        counts: dict[str, int] = {}
+        for key, rows in df_new.groupby("season_key", sort=False):
+            path = self._partition_path(key)
+            if path.exists():
+                base = pd.read_parquet(path)
+                base = base[~base["mal_id"].isin(rows["mal_id"])]
+                cols = list(dict.fromkeys(list(base.columns) + list(rows.columns)))
+                part = pd.concat([base.reindex(columns=cols), rows.reindex(columns=cols)], ignore_index=True)
+            else:
+                part = rows.reset_index(drop=True)
+            _write_atomic(part, path)
+            counts[key] = len(part)
+
+        index = pd.concat(
+            [index[~index["mal_id"].isin(new_keys["mal_id"])], new_keys], ignore_index=True
+        )
+        _write_atomic(index, self.index_path)
+        return counts
+
+    def migrate_legacy(self, canonicalize: Callable[[pd.DataFrame], pd.DataFrame]) -> int:
+        """Split a legacy ``anime.parquet`` into partitions (kept as ``anime.legacy.parquet``)."""
+        if not self.needs_migration():
+            return 0
+        df = canonicalize(pd.read_parquet(self.legacy_path))
+        if "season_key" not in df.columns:
+            df["season_key"] = None
+        self.upsert(df)
+        os.replace(self.legacy_path, self.legacy_path.with_name("anime.legacy.parquet"))
+        return len(df)
+
+
+def default_store() -> NormalizedStore:
+    return NormalizedStore()
@@ -0,0 +1,174 @@
+"""Lightweight per-stage profiler (wall time, CPU time, Python and process memory).
+
+Code marks its stages with ``with stage("name"):``. Outside a
+``profiling()`` block that is a no-op, so the markers cost nothing in normal
+runs. Inside one, each stage records:
+
+- ``wall_s`` / ``cpu_s``: ``perf_counter`` and ``process_time`` deltas (CPU
+  time above wall time means native code ran on several threads);
+- ``py_peak_mb``: peak traced allocation above the stage's starting point
+  (tracemalloc, which also sees numpy buffers);
+- ``rss_peak_mb``: the process's peak resident set size when the stage
+  ended (lifetime high-water mark; unavailable on Windows).
+
+Stages nest ("encode/multihot"), and a stage entered repeatedly (once per
+batch) is summed into one row with a ``calls`` count. tracemalloc slows
+allocation-heavy code, so compare profiled runs with profiled runs.
+"""
+from __future__ import annotations
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from rich import print as rprint
+from rich.table import Table
+
+try:  # POSIX only
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+_MB = 1024 * 1024
+
+
+def _rss_peak_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / _MB if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB on Linux
+
+
+@dataclass
+class _Frame:
+    path: str
+    wall: float
+    cpu: float
+    traced_start: int
+    child_peak: int = 0
+
+
+@dataclass
+class StageProfiler:
+    """Collects stage measurements while active; see :func:`profiling`."""
+
+    stats: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    meta: Dict[str, Any] = field(default_factory=dict)
+    _stack: List[_Frame] = field(default_factory=list)
+    _started: float = field(default_factory=time.perf_counter)
+    _ended: Optional[float] = None
+
+    @property
+    def total_wall(self) -> float:
+        return (self._ended or time.perf_counter()) - self._started
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        path = f"{self._stack[-1].path}/{name}" if self._stack else name
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:  # keep the parent's peak so far before resetting for this stage
+            self._stack[-1].child_peak = max(self._stack[-1].child_peak, peak)
+        tracemalloc.reset_peak()
+        row = self.stats.setdefault(  # created on entry so parents list before their children
+            path, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "py_peak_mb": 0.0, "rss_peak_mb": None}
+        )
+        frame = _Frame(path, time.perf_counter(), time.process_time(), current)
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - frame.wall
+            cpu = time.process_time() - frame.cpu
+            self._stack.pop()
+            peak = max(frame.child_peak, tracemalloc.get_traced_memory()[1])
+            if self._stack:
+                self._stack[-1].child_peak = max(self._stack[-1].child_peak, peak)
+            tracemalloc.reset_peak()
+
+            row["calls"] += 1
+            row["wall_s"] += wall
+            row["cpu_s"] += cpu
+            row["py_peak_mb"] = max(row["py_peak_mb"], (peak - frame.traced_start) / _MB)
+            row["rss_peak_mb"] = _rss_peak_mb()
+
+    def report(self) -> Dict[str, Any]:
+        """JSON-ready report: run metadata plus one entry per stage path, in first-entered order."""
+        return {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "total_wall_s": round(self.total_wall, 4),
+            **self.meta,
+            "stages": [
+                {"stage": path, **{k: round(v, 4) if isinstance(v, float) else v for k, v in row.items()}}
+                for path, row in self.stats.items()
+            ],
+        }
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2))
+
+    def print_table(self, title: str = "Stage profile") -> None:
+        total = self.total_wall
+        t = Table(title=title, show_header=True, header_style="bold")
+        t.add_column("Stage")
+        t.add_column("Calls", justify="right")
+        t.add_column("Wall s", justify="right")
+        t.add_column("% wall", justify="right")
+        t.add_column("CPU s", justify="right")
+        t.add_column("Py peak MB", justify="right")
+        t.add_column("RSS peak MB", justify="right")
+        for path, row in self.stats.items():
+            depth = path.count("/")
+            rss = row["rss_peak_mb"]
+            t.add_row(
+                "  " * depth + path.rsplit("/", 1)[-1],
+                str(row["calls"]),
+                f"{row['wall_s']:.3f}",
+                f"{100 * row['wall_s'] / total:.1f}" if total > 0 else "-",
+                f"{row['cpu_s']:.3f}",
+                f"{row['py_peak_mb']:.1f}",
+                f"{rss:.0f}" if rss is not None else "-",
+            )
+        rprint(t)
+
+
+_active: Optional[StageProfiler] = None
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Measure the enclosed block if a profiler is active; otherwise do nothing."""
+    if _active is None:
+        yield
+        return
+    with _active.stage(name):
+        yield
+
+
+@contextmanager
+def profiling(enabled: bool = True) -> Iterator[Optional[StageProfiler]]:
+    """Activate a profiler (and tracemalloc) for the block; yields None when disabled."""
+    global _active
+    if not enabled:
+        yield None
+        return
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    _active = StageProfiler()
+    try:
+        yield _active
+    finally:
+        _active._ended = time.perf_counter()
+        _active = None
+        if started_tracing:
+            tracemalloc.stop()
@@ -0,0 +1,251 @@
+"""Compressed, content-addressed store for raw API payloads.
+
+Replaces the one-pretty-printed-JSON-file-per-payload layout under
+``data/raw/`` with a single SQLite file:
+
+- ``blobs``:   sha256 of the compact JSON -> compressed bytes (zstd when the
+  optional ``zstandard`` package is installed, gzip otherwise). Identical
+  payloads are stored once.
+- ``entries``: ``(endpoint, key) -> digest``, e.g. ``("season:jikan", "2024_fall")``
+  or ``("details", "52991")``.
+
+Reading a season or thousands of detail payloads is one indexed query instead
+of one ``open()`` per file.
+
+Usage:
+    python -m src.utils.raw_store                        # show store stats
+    python -m src.utils.raw_store --migrate              # import legacy data/raw JSON files
+    python -m src.utils.raw_store --migrate --delete-legacy
+"""
+from __future__ import annotations
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from rich import print as rprint
+
+from .io import RAW, load_json
+
+try:  # optional: better ratio and much faster decompression than gzip
+    import zstandard  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+RAW_STORE_PATH = RAW / "store.sqlite"
+RAW_STORE_CODEC = os.getenv("RAW_STORE_CODEC", "zstd" if zstandard is not None else "gzip")
+
+SEASON_ENDPOINT = "season:{source}"
+UPCOMING_ENDPOINT = "upcoming"
+DETAILS_ENDPOINT = "details"
+
+
+def _compress(raw: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("RAW_STORE_CODEC=zstd requires the 'zstandard' package")
+        return zstandard.ZstdCompressor(level=10).compress(raw)
+    return gzip.compress(raw, compresslevel=6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Blob is zstd-compressed; install 'zstandard' to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class RawStore:
+    """``(endpoint, key) -> JSON payload`` over deduplicated, compressed blobs."""
+
+    def __init__(self, path: Path = RAW_STORE_PATH, codec: str = RAW_STORE_CODEC):
+        self.path = Path(path)
+        self.codec = codec
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                data BLOB NOT NULL,
+                raw_size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                endpoint TEXT NOT NULL,
+                key TEXT NOT NULL,
+                digest TEXT NOT NULL REFERENCES blobs(digest),
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (endpoint, key)
+            );
+            """
+        )
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def _pack(self, obj: Any) -> tuple[str, bytes, int]:
+        raw = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return hashlib.sha256(raw).hexdigest(), _compress(raw, self.codec), len(raw)
+
+    def put(self, endpoint: str, key: str, obj: Any) -> str:
+        return self.put_many(endpoint, {key: obj})[key]
+
+    def put_many(self, endpoint: str, items: Dict[str, Any]) -> Dict[str, str]:
+        """Store several payloads in one transaction; returns ``key -> digest``."""
+        packed = {str(k): self._pack(v) for k, v in items.items()}
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?)",
+                [(digest, self.codec, data, size) for digest, data, size in packed.values()],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                [(endpoint, k, digest, now) for k, (digest, _, _) in packed.items()],
+            )
+            self._conn.commit()
+        return {k: digest for k, (digest, _, _) in packed.items()}
+
+    def gc(self) -> int:
+        """Delete blobs no entry points to any more."""
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM blobs WHERE digest NOT IN (SELECT digest FROM entries)")
+            self._conn.commit()
+        return cur.rowcount
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def get(self, endpoint: str, key: str) -> Optional[Any]:
+        return self.get_many(endpoint, [key]).get(str(key))
+
+    def get_many(self, endpoint: str, keys: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Load payloads for ``keys`` (or the whole endpoint) in one indexed query."""
+        sql = (
+            "SELECT e.key, b.codec, b.data FROM entries e JOIN blobs b ON b.digest = e.digest "
+            "WHERE e.endpoint = ?"
+        )
+        with self._lock:
+            if keys is None:
+                rows = self._conn.execute(sql, (endpoint,)).fetchall()
+            else:
+                self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (key TEXT PRIMARY KEY)")
+                self._conn.execute("DELETE FROM wanted")
+                self._conn.executemany("INSERT OR IGNORE INTO wanted VALUES (?)", [(str(k),) for k in keys])
+                rows = self._conn.execute(sql + " AND e.key IN (SELECT key FROM wanted)", (endpoint,)).fetchall()
+        return {key: json.loads(_decompress(data, codec)) for key, codec, data in rows}
+
+    def keys(self, endpoint: str) -> set[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key FROM entries WHERE endpoint = ?", (endpoint,)).fetchall()
+        return {r[0] for r in rows}
+
+    def endpoint_digest(self, endpoint: str) -> str:
+        """Hash of an endpoint's ``(key, content digest)`` pairs: changes iff its payloads do.
+
+        Read through the connection, so writes still in the WAL count and
+        other endpoints do not.
+        """
+        h = hashlib.sha256()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, digest FROM entries WHERE endpoint = ? ORDER BY key", (endpoint,)
+            ).fetchall()
+        for key, digest in rows:
+            h.update(f"{key}\t{digest}\n".encode("utf-8"))
+        return h.hexdigest()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            per_endpoint = dict(
+                self._conn.execute("SELECT endpoint, COUNT(*) FROM entries GROUP BY endpoint").fetchall()
+            )
+            n_blobs, stored, raw = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0), COALESCE(SUM(raw_size), 0) FROM blobs"
+            ).fetchone()
+        return {"entries": per_endpoint, "blobs": n_blobs, "stored_bytes": stored, "raw_bytes": raw}
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Migration from the legacy JSON-file layout
+    # ------------------------------------------------------------------
+    def migrate_legacy(self, raw_dir: Path = RAW, delete: bool = False) -> Dict[str, int]:
+        """Import ``<year>_<season>/season_<src>.json``, ``upcoming/upcoming.json`` and ``details/*.json``."""
+        counts: Dict[str, int] = {}
+        imported: list[Path] = []
+
+        def _take(endpoint: str, batch: Dict[str, Path]) -> None:
+            items = {}
+            for key, path in batch.items():
+                try:
+                    items[key] = load_json(path)
+                except Exception as exc:
+                    rprint(f"[yellow]skip {path}: {exc}[/yellow]")
+                    continue
+                imported.append(path)
+            if items:
+                self.put_many(endpoint, items)
+                counts[endpoint] = counts.get(endpoint, 0) + len(items)
+
+        for path in sorted(raw_dir.glob("*_*/season_*.json")):
+            src = path.stem.split("_", 1)[1]
+            _take(SEASON_ENDPOINT.format(source=src), {path.parent.name: path})
+
+        upcoming = raw_dir / "upcoming" / "upcoming.json"
+        if upcoming.exists():
+            _take(UPCOMING_ENDPOINT, {"upcoming": upcoming})
+
+        details = sorted((raw_dir / "details").glob("*.json"))
+        for i in range(0, len(details), 1000):
+            _take(DETAILS_ENDPOINT, {p.stem: p for p in details[i:i + 1000]})
+
+        if delete:
+            for path in imported:
+                path.unlink(missing_ok=True)
+        return counts
+
+
+_default: Optional[RawStore] = None
+_default_lock = threading.Lock()
+
+
+def default_store() -> RawStore:
+    """Process-wide store at ``data/raw/store.sqlite``."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = RawStore()
+        return _default
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Inspect the raw payload store or migrate legacy JSON caches into it.")
+    ap.add_argument("--migrate", action="store_true", help="Import legacy data/raw JSON files")
+    ap.add_argument("--delete-legacy", action="store_true", help="With --migrate, delete imported JSON files")
+    args = ap.parse_args()
+
+    store = default_store()
+    if args.migrate:
+        counts = store.migrate_legacy(delete=args.delete_legacy)
+        store.gc()
+        rprint(f"[green]Migrated: {counts or 'nothing to import'}[/green]")
+    s = store.stats()
+    rprint(f"[cyan]{store.path}: {s['blobs']} blobs, {s['entries']}[/cyan]")
+    if s["raw_bytes"]:
+        rprint(
+            f"[dim]  {s['stored_bytes'] / 1024 / 1024:.1f} MB stored "
+            f"({s['raw_bytes'] / 1024 / 1024:.1f} MB uncompressed, codec={store.codec})[/dim]"
+        )
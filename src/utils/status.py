@@ -7,6 +7,7 @@ from rich import print as rprint
 from rich.table import Table
 
 from .io import NORMALIZED, FEATURES, MODELS, PREDICTIONS
+from .normalized_store import NormalizedStore
 
 def exists(p: Path) -> bool:
     try:
@@ -53,16 +54,18 @@ def main():
     season_year, season_name = parse_season_arg(args.season)
 
     # Files
-    f_norm = NORMALIZED / "anime.parquet"
+    norm_store = NormalizedStore()
     f_labels = NORMALIZED / "labels.parquet"
     f_feat = FEATURES / "features.parquet"
-    f_model = MODELS / "rf_model.joblib"
+    f_model = MODELS / "model.joblib"
+    f_manifest = MODELS / "model.json"  # written next to the model by src.models.artifacts
 
     # Read what exists
-    df_norm = safe_read_parquet(f_norm) if exists(f_norm) else pd.DataFrame()
+    df_norm = norm_store.read(columns=["mal_id", "year", "season"]) if norm_store.exists() else pd.DataFrame()
     df_labels = safe_read_parquet(f_labels) if exists(f_labels) else pd.DataFrame()
     df_feat = safe_read_parquet(f_feat) if exists(f_feat) else pd.DataFrame()
-    model_exists = exists(f_model)
+    model_exists = exists(f_model) or exists(MODELS / "rf_model.joblib")  # legacy name from older runs
+    manifest = json.loads(f_manifest.read_text()) if exists(f_manifest) else {}
 
     # Stats
     norm_rows = len(df_norm)
@@ -88,9 +91,9 @@ def main():
     t.add_column("Details")
 
     t.add_row(
-        "Normalized (anime.parquet)",
+        "Normalized (anime/*.parquet)",
         "✅" if norm_rows else "❌",
-        f"{norm_rows} rows" if norm_rows else "missing → run ingest",
+        f"{norm_rows} rows in {len(norm_store.partitions())} seasons" if norm_rows else "missing → run ingest",
     )
     t.add_row(
         "Labels (labels.parquet)",
@@ -102,10 +105,16 @@ def main():
         "✅" if not df_feat.empty else "❌",
         f"{len(df_feat)} rows; labeled={labeled}" if not df_feat.empty else "missing → run build_features",
     )
+    model_details = "missing → run train"
+    if model_exists:
+        model_details = "ready"
+        if manifest:
+            model_details = (f"ready: {manifest['model_class'].rsplit('.', 1)[-1]}, "
+                             f"{manifest['bytes'] / 1e6:.1f} MB, compress={manifest['compress']}")
     t.add_row(
-        "Model (rf_model.joblib)",
+        "Model (model.joblib)",
         "✅" if model_exists else "❌",
-        "ready" if model_exists else "missing → run train",
+        model_details,
     )
 
     if season_year and season_name: